@@ -102,12 +102,171 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     "EXCEPTION_HANDLER": "pinit_api.lib.utils.handle_unauthorized_exception",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "pinit_api.lib.pagination.EstimatedCountPagination",
     "PAGE_SIZE": 50,
 }
 
+# Paginated responses use the query planner's estimate rather than an exact
+# count when it's above this number of rows:
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = 10_000
+
+# Paginations with capped counts (e.g. search results) count at most this
+# number of items, e.g. "10000+" (see `pinit_api/lib/pagination.py`):
+PAGINATION_MAX_COUNT = 10_000
+
 # AWS
 S3_PINS_BUCKET_UPLOADER_ACCESS_KEY_ID = config("S3_PINS_BUCKET_UPLOADER_ACCESS_KEY_ID")
 S3_PINS_BUCKET_UPLOADER_SECRET_ACCESS_KEY = config(
     "S3_PINS_BUCKET_UPLOADER_SECRET_ACCESS_KEY"
 )
+
+# Cache
+# The local-memory cache is private to each process: deployments running several
+# processes should configure a shared backend (e.g. Redis or Memcached) instead.
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Home feed
+# Maximum number of pins kept in each account's materialized feed:
+HOME_FEED_MAX_ITEMS_PER_ACCOUNT = 1000
+# Pins are only pushed to the feeds read in the last HOME_FEED_ACTIVE_DAYS days
+# (other feeds are rebuilt when they're read again):
+HOME_FEED_ACTIVE_DAYS = 30
+# Number of pins a feed is (re)built with, for new or returning accounts (it
+# then grows up to HOME_FEED_MAX_ITEMS_PER_ACCOUNT as pins are pushed to it):
+HOME_FEED_SEED_MAX_ITEMS = 200
+# Serialized pin suggestion pages are cached until the feed changes,
+# or for at most this number of seconds:
+PIN_SUGGESTIONS_PAGE_CACHE_TIMEOUT = 300
+# Maximum number of new pins returned when polling the feed (`?since=`):
+PIN_SUGGESTIONS_SINCE_MAX_RESULTS = 50
+# Pin suggestions (except cursor-paginated ones) are ranked among the
+# CANDIDATE_WINDOW most recently surfaced pins of the feed, by
+# recency (halved every RECENCY_HALF_LIFE_HOURS) and number of saves.
+# The score of each additional pin by the same author is multiplied by
+# AUTHOR_DIVERSITY_DECAY (see `pinit_api/lib/feed_ranking.py`).
+PIN_SUGGESTIONS_RANKING = {
+    "ENABLED": True,
+    "CANDIDATE_WINDOW": 1000,
+    "RECENCY_WEIGHT": 1.0,
+    "RECENCY_HALF_LIFE_HOURS": 48,
+    "SAVES_WEIGHT": 0.25,
+    "AUTHOR_DIVERSITY_DECAY": 0.7,
+}
+
+# Search
+# Class of the search backend (see `pinit_api/lib/search_backends/`):
+SEARCH_BACKEND = "pinit_api.lib.search_backends.PostgresSearchBackend"
+
+# Settings of `InMemorySearchBackend` (BM25 parameters, weight of title
+# occurrences relative to description ones, maximum number of results, and
+# whether the index is built in the background, searches being served by
+# `PostgresSearchBackend` until the first one is ready):
+SEARCH_IN_MEMORY_INDEX = {
+    "K1": 1.2,
+    "B": 0.75,
+    "TITLE_WEIGHT": 2,
+    "MAX_RESULTS": 1000,
+    "BACKGROUND_REBUILDS": True,
+}
+
+# Search results (IDs of the pins of each page) are cached until a pin is
+# created, edited or deleted, or for at most this number of seconds:
+SEARCH_RESULTS_CACHE_TIMEOUT = 600
+
+# When the full-text search doesn't match any pin (e.g. misspelled or partial
+# words), pins whose title contains a word similar enough to the search term
+# are returned instead (trigram "word similarity", between 0 and 1):
+SEARCH_FUZZY_SIMILARITY_THRESHOLD = 0.5
+
+# Size of the snippets optionally returned with search results (words for the
+# Postgres backend, characters for the others):
+SEARCH_SNIPPET_MAX_WORDS = 20
+SEARCH_SNIPPET_MAX_LENGTH = 160
+
+# Searches whose ranking query runs for longer than this (e.g. very common
+# words) are cancelled, and the most recent matches (at most
+# `SEARCH_DEGRADED_MAX_RESULTS`) are returned instead, flagged as `degraded`:
+SEARCH_STATEMENT_TIMEOUT_MS = 500
+SEARCH_DEGRADED_MAX_RESULTS = 50
+
+# Searches returning results are logged (on their first page), for search
+# suggestions: their popularity decays with a half-life of `HALF_LIFE_DAYS`.
+# Logged searches are buffered in each process, and written to the database
+# in batches, every `FLUSH_INTERVAL_SECONDS` or once `FLUSH_MAX_QUERIES`
+# distinct search terms are buffered (`None` disables either trigger).
+# Search terms are suggested once searched `MIN_SEARCHES` times (after decay),
+# and deleted by the `prune_search_queries` command below `PRUNE_MAX_SEARCHES`:
+SEARCH_QUERY_LOG = {
+    "HALF_LIFE_DAYS": 7,
+    "FLUSH_INTERVAL_SECONDS": 30,
+    "FLUSH_MAX_QUERIES": 1000,
+    "MIN_SEARCHES": 3,
+    "PRUNE_MAX_SEARCHES": 0.1,
+}
+
+# Search suggestions
+# Maximum number of popular searches suggested (before word completions):
+SEARCH_SUGGESTIONS_MAX_POPULAR_QUERIES = 4
+
+# Search suggestions are cached by search term until a pin is created, edited
+# or deleted, or for at most this number of seconds (popular searches may
+# take that long to appear). Clients and shared caches may reuse them for
+# `SEARCH_SUGGESTIONS_MAX_AGE` seconds (then revalidate them with their ETag):
+SEARCH_SUGGESTIONS_CACHE_TIMEOUT = 60
+SEARCH_SUGGESTIONS_MAX_AGE = 30
+
+# Class of the search suggestions backend (see
+# `pinit_api/lib/suggestion_backends/`). By default, suggestions are served by
+# the search backend:
+SEARCH_SUGGESTIONS_BACKEND = (
+    "pinit_api.lib.suggestion_backends.SearchBackendSuggestionBackend"
+)
+
+# Settings of `TrieSuggestionBackend`: number of completions precomputed for
+# each prefix (i.e. maximum number of suggestions), and refreshes of the trie.
+# A background thread checks every `REFRESH_INTERVAL_SECONDS` whether pins
+# changed (`None` disables it), and rebuilds the trie if so, or if it's older
+# than `MAX_AGE_SECONDS` (pins may be changed by other processes):
+SEARCH_SUGGESTIONS_TRIE = {
+    "COMPLETIONS_PER_NODE": 12,
+    "REFRESH_INTERVAL_SECONDS": 10,
+    "MAX_AGE_SECONDS": 300,
+}
+
+# Settings of `TypoTolerantTrieSuggestionBackend` (a `TrieSuggestionBackend`
+# also completing mistyped prefixes): prefixes are matched within an edit
+# distance of 1 from `MIN_LENGTH_DISTANCE_1` characters, and of 2 from
+# `MIN_LENGTH_DISTANCE_2` characters, on their first `MAX_PREFIX_LENGTH`
+# characters. Only the prefixes of the `MAX_WORDS` most frequent words are
+# indexed (`None` indexes all of them), which bounds the memory used (about
+# 600 bytes per word):
+SEARCH_SUGGESTIONS_TYPO_TOLERANCE = {
+    "MIN_LENGTH_DISTANCE_1": 4,
+    "MIN_LENGTH_DISTANCE_2": 7,
+    "MAX_PREFIX_LENGTH": 8,
+    "MAX_WORDS": 50_000,
+}
+
+# Settings of `MemoryMappedSuggestionBackend`: path of the index file (built
+# by the `build_search_suggestions_index` command), and interval between
+# checks of whether it was replaced by a new build:
+SEARCH_SUGGESTIONS_MEMORY_MAPPED_INDEX = {
+    "PATH": config(
+        "SEARCH_SUGGESTIONS_INDEX_PATH",
+        default=str(BASE_DIR.parent / "search_suggestions.idx"),
+    ),
+    "RELOAD_CHECK_INTERVAL_SECONDS": 10,
+}
+
+# Number of results of each type (pins, accounts, boards) returned by the
+# unified search:
+UNIFIED_SEARCH_RESULTS_PER_TYPE = 5
+
+# Threads (per process) running independent queries concurrently, e.g. the
+# sub-queries of the unified search (see `pinit_api/lib/concurrency.py`):
+CONCURRENT_QUERIES_MAX_THREADS = 8
@@ -5,3 +5,6 @@ class PinitApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pinit_api"
     label = "pinit_api"
+
+    def ready(self):
+        from . import signals  # registers the signal receivers
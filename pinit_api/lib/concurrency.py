@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+
+# Shared by all requests, so that the number of extra database connections
+# is bounded by the number of threads (in each process):
+executor = ThreadPoolExecutor(
+    max_workers=settings.CONCURRENT_QUERIES_MAX_THREADS,
+    thread_name_prefix="concurrent-queries",
+)
+
+
+def run_concurrently(*functions):
+    """
+    Calls the functions (which take no arguments) in parallel threads, and
+    returns their results, in order. Each thread uses its own database
+    connection, so the functions don't see the uncommitted changes of the
+    calling thread's transaction.
+    """
+    futures = [
+        executor.submit(run_with_database_connection, function)
+        for function in functions
+    ]
+
+    return [future.result() for future in futures]
+
+
+def run_with_database_connection(function):
+    # Same handling of the thread's database connections as around requests
+    # (closing them if they are unusable or obsolete, per `CONN_MAX_AGE`):
+    close_old_connections()
+
+    try:
+        return function()
+    finally:
+        close_old_connections()
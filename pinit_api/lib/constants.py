@@ -8,3 +8,10 @@ ERROR_CODE_BOARD_NOT_FOUND = "board_not_found"
 ERROR_CODE_ACCOUNT_NOT_FOUND = "account_not_found"
 ERROR_CODE_PIN_CREATION_FAILED = "pin_creation_failed"
 ERROR_CODE_MISSING_PIN_IMAGE_FILE = "missing_pin_image_file"
+ERROR_CODE_INVALID_CURSOR = "invalid_cursor"
+ERROR_CODE_INVALID_SINCE_PARAMETER = "invalid_since_parameter"
+ERROR_CODE_INVALID_SEARCH_FILTER = "invalid_search_filter"
+
+# Cache versions
+CACHE_VERSION_PIN_FEED = "pin_feed"
+CACHE_VERSION_SEARCH_INDEX = "search_index"
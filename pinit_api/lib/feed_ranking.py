@@ -0,0 +1,133 @@
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models import PinInBoard
+
+SECONDS_PER_HOUR = 3600
+
+
+def get_ranked_pin_ids(feed_pins=None):
+    """
+    Ranks a bounded window of the most recently surfaced pins of the feed
+    (`feed_pins` must be annotated with `surfaced_at`), and returns their IDs,
+    best-ranked first.
+    """
+    ranking_settings = settings.PIN_SUGGESTIONS_RANKING
+
+    candidates = list(
+        feed_pins.order_by("-surfaced_at", "-id").values_list(
+            "id", "surfaced_at", "author_id"
+        )[: ranking_settings["CANDIDATE_WINDOW"]]
+    )
+
+    if not candidates:
+        return []
+
+    pin_ids, surfaced_at_dates, author_ids = zip(*candidates)
+
+    number_saves_by_pin_id = get_number_saves_by_pin_id(pin_ids=pin_ids)
+
+    ranking = rank_candidates(
+        surfaced_at_timestamps=np.fromiter(
+            (date.timestamp() for date in surfaced_at_dates),
+            dtype=np.float64,
+            count=len(candidates),
+        ),
+        numbers_saves=np.fromiter(
+            (number_saves_by_pin_id.get(pin_id, 0) for pin_id in pin_ids),
+            dtype=np.float64,
+            count=len(candidates),
+        ),
+        author_ids=np.array(author_ids, dtype=np.int64),
+        now_timestamp=timezone.now().timestamp(),
+        ranking_settings=ranking_settings,
+    )
+
+    return np.array(pin_ids, dtype=np.int64)[ranking].tolist()
+
+
+def get_number_saves_by_pin_id(pin_ids=None):
+    numbers_saves = (
+        PinInBoard.objects.filter(pin_id__in=pin_ids)
+        .values("pin_id")
+        .annotate(number_saves=Count("id"))
+        .values_list("pin_id", "number_saves")
+    )
+
+    return dict(numbers_saves)
+
+
+def rank_candidates(
+    surfaced_at_timestamps=None,
+    numbers_saves=None,
+    author_ids=None,
+    now_timestamp=0.0,
+    ranking_settings=None,
+):
+    """
+    Scores all candidates at once, and returns the indices of the candidates
+    sorted by decreasing score. Candidates must be passed most recent first,
+    since ties are resolved by keeping the original order.
+
+    The base score of a candidate is:
+    `RECENCY_WEIGHT * 0.5 ** (age / RECENCY_HALF_LIFE_HOURS)
+     + SAVES_WEIGHT * log(1 + number of saves)`
+    Then, to diversify the feed, the base score of the n-th best pin of a given
+    author is multiplied by `AUTHOR_DIVERSITY_DECAY ** (n - 1)`.
+    """
+    recency_weight = ranking_settings["RECENCY_WEIGHT"]
+    recency_half_life_hours = ranking_settings["RECENCY_HALF_LIFE_HOURS"]
+    saves_weight = ranking_settings["SAVES_WEIGHT"]
+
+    ages_in_hours = (
+        np.maximum(now_timestamp - surfaced_at_timestamps, 0.0) / SECONDS_PER_HOUR
+    )
+
+    recency_scores = np.exp2(-ages_in_hours / recency_half_life_hours)
+
+    base_scores = recency_weight * recency_scores + saves_weight * np.log1p(
+        numbers_saves
+    )
+
+    ranks_within_author = compute_ranks_within_groups(
+        scores=base_scores, group_ids=author_ids
+    )
+
+    scores = base_scores * np.power(
+        ranking_settings["AUTHOR_DIVERSITY_DECAY"], ranks_within_author
+    )
+
+    # `np.argsort` with a stable sort keeps the original order for equal scores:
+    return np.argsort(-scores, kind="stable")
+
+
+def compute_ranks_within_groups(scores=None, group_ids=None):
+    """
+    Returns, for each item, the number of items of the same group having a
+    better score (ties being resolved by original order).
+    """
+    number_items = len(scores)
+
+    if number_items == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Sort by group, then by decreasing score, then by original position:
+    order = np.lexsort((np.arange(number_items), -scores, group_ids))
+
+    sorted_group_ids = group_ids[order]
+
+    is_group_start = np.empty(number_items, dtype=bool)
+    is_group_start[0] = True
+    is_group_start[1:] = sorted_group_ids[1:] != sorted_group_ids[:-1]
+
+    positions = np.arange(number_items)
+    group_start_positions = np.maximum.accumulate(
+        np.where(is_group_start, positions, 0)
+    )
+
+    ranks = np.empty(number_items, dtype=np.int64)
+    ranks[order] = positions - group_start_positions
+
+    return ranks
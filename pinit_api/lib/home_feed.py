@@ -0,0 +1,278 @@
+import logging
+import threading
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Account, FeedItem, Pin
+from .concurrency import executor, run_with_database_connection
+from .constants import CACHE_VERSION_PIN_FEED
+from .utils import bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+# IDs of the accounts whose feed is being seeded in the background by this
+# process (so that a burst of reads only seeds a feed once):
+seeding_account_ids = set()
+seeding_account_ids_lock = threading.Lock()
+
+# Each account's home feed is materialized in the `pinit_api_feeditem` table:
+# pins are pushed to the feeds when they are created or saved into a board
+# (which "re-surfaces" them at the top of the feeds). Reading a feed page is
+# then a single range read on the (account, surfaced_at, pin) index.
+# Pins are only pushed to the feeds of the accounts which read their feed in
+# the last `HOME_FEED_ACTIVE_DAYS` days: the feed of an account coming back
+# after that is rebuilt in the background when it's read (meanwhile, the
+# account gets the global feed).
+
+# `Account.home_feed_active_at` is updated at most this often when feeds are
+# read (it only needs to be accurate to within a small part of the period):
+HOME_FEED_ACTIVITY_UPDATE_INTERVAL = timedelta(days=1)
+
+# Pushes a pin (`%(pin_id)s`) to the feeds of the active accounts, or moves it
+# back to the top of the feeds where it is already present:
+SQL_QUERY_PUSH_PIN_TO_HOME_FEEDS = """
+INSERT INTO pinit_api_feeditem (account_id, pin_id, surfaced_at)
+SELECT id, %(pin_id)s, %(surfaced_at)s
+FROM pinit_api_account
+WHERE home_feed_active_at >= %(active_since)s
+ON CONFLICT (account_id, pin_id)
+DO UPDATE SET surfaced_at = GREATEST(
+    pinit_api_feeditem.surfaced_at, EXCLUDED.surfaced_at
+);
+"""
+
+# For each account (matching `{accounts_condition}`), this query looks up the
+# feed item sitting right after the `%(max_items)s` most recent ones (using
+# the feed index), and deletes it along with all older items:
+SQL_QUERY_TRIM_HOME_FEEDS = """
+DELETE FROM pinit_api_feeditem
+USING (
+    SELECT account.id AS account_id, cutoff.surfaced_at, cutoff.pin_id
+    FROM pinit_api_account account
+    CROSS JOIN LATERAL (
+        SELECT surfaced_at, pin_id
+        FROM pinit_api_feeditem
+        WHERE account_id = account.id
+        ORDER BY surfaced_at DESC, pin_id DESC
+        OFFSET %(max_items)s
+        LIMIT 1
+    ) cutoff
+    WHERE {accounts_condition}
+) cutoffs
+WHERE pinit_api_feeditem.account_id = cutoffs.account_id
+AND (pinit_api_feeditem.surfaced_at, pinit_api_feeditem.pin_id)
+    <= (cutoffs.surfaced_at, cutoffs.pin_id);
+"""
+
+# A pin is surfaced when it's created, and again whenever it's saved into a board:
+SQL_QUERY_SELECT_MOST_RECENTLY_SURFACED_PINS = """
+SELECT pin.id AS pin_id,
+    GREATEST(pin.created_at, MAX(pin_in_board.last_saved_at)) AS surfaced_at
+FROM pinit_api_pin pin
+LEFT JOIN pinit_api_pininboard pin_in_board ON pin_in_board.pin_id = pin.id
+GROUP BY pin.id
+ORDER BY surfaced_at DESC, pin.id DESC
+LIMIT %(max_items)s
+"""
+
+SQL_QUERY_SEED_HOME_FEED = f"""
+INSERT INTO pinit_api_feeditem (account_id, pin_id, surfaced_at)
+SELECT %(account_id)s, pin_id, surfaced_at
+FROM (
+{SQL_QUERY_SELECT_MOST_RECENTLY_SURFACED_PINS}
+) t
+ON CONFLICT (account_id, pin_id) DO NOTHING;
+"""
+
+SQL_QUERY_REBUILD_HOME_FEEDS = f"""
+INSERT INTO pinit_api_feeditem (account_id, pin_id, surfaced_at)
+SELECT account.id, t.pin_id, t.surfaced_at
+FROM pinit_api_account account
+CROSS JOIN (
+{SQL_QUERY_SELECT_MOST_RECENTLY_SURFACED_PINS}
+) t
+WHERE account.home_feed_active_at >= %(active_since)s;
+"""
+
+
+def get_home_feed_active_since():
+    return timezone.now() - timedelta(days=settings.HOME_FEED_ACTIVE_DAYS)
+
+
+def schedule_push_pin_to_home_feeds(pin=None, surfaced_at=None):
+    """
+    Pushes the pin to the home feeds in the background, once the current
+    transaction (if any) is committed, so that the request doesn't wait for
+    the fan-out.
+    """
+    push = partial(
+        push_pin_to_home_feeds_in_background, pin=pin, surfaced_at=surfaced_at
+    )
+
+    transaction.on_commit(lambda: executor.submit(run_with_database_connection, push))
+
+
+def push_pin_to_home_feeds_in_background(pin=None, surfaced_at=None):
+    try:
+        push_pin_to_home_feeds(pin=pin, surfaced_at=surfaced_at)
+    except Exception:
+        logger.exception("Failed to push %s to the home feeds", pin)
+
+
+def push_pin_to_home_feeds(pin=None, surfaced_at=None):
+    active_since = get_home_feed_active_since()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SQL_QUERY_PUSH_PIN_TO_HOME_FEEDS,
+                {
+                    "pin_id": pin.id,
+                    "surfaced_at": surfaced_at or pin.created_at,
+                    "active_since": active_since,
+                },
+            )
+
+        # Only the feeds which just grew can exceed the limit:
+        trim_home_feeds(active_since=active_since)
+
+    bump_cache_version(name=CACHE_VERSION_PIN_FEED)
+
+
+def trim_home_feeds(active_since=None):
+    """
+    Deletes the feed items exceeding the per-account limit, in the feeds of
+    the accounts active since `active_since` (or all of them), and returns
+    the number of deleted items.
+    """
+    if active_since is None:
+        query = SQL_QUERY_TRIM_HOME_FEEDS.format(accounts_condition="TRUE")
+    else:
+        query = SQL_QUERY_TRIM_HOME_FEEDS.format(
+            accounts_condition="account.home_feed_active_at >= %(active_since)s"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            query,
+            {
+                "max_items": settings.HOME_FEED_MAX_ITEMS_PER_ACCOUNT,
+                "active_since": active_since,
+            },
+        )
+
+        return cursor.rowcount
+
+
+def seed_home_feed(account=None):
+    """
+    (Re)builds the account's feed from the most recently surfaced pins, and
+    marks it as active, so that new pins are pushed to it.
+    """
+    with transaction.atomic():
+        # Marked first, so that the pins surfaced while the feed is seeded are
+        # either seeded or pushed to it:
+        account.home_feed_active_at = timezone.now()
+        Account.objects.filter(pk=account.pk).update(
+            home_feed_active_at=account.home_feed_active_at
+        )
+
+        FeedItem.objects.filter(account=account).delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SQL_QUERY_SEED_HOME_FEED,
+                {
+                    "account_id": account.id,
+                    "max_items": settings.HOME_FEED_SEED_MAX_ITEMS,
+                },
+            )
+
+
+def schedule_seed_home_feed(account=None):
+    """
+    Seeds the account's feed in the background (see `seed_home_feed`), once
+    the current transaction (if any) is committed, unless it's already being
+    seeded.
+    """
+    transaction.on_commit(partial(submit_seed_home_feed, account=account))
+
+
+def submit_seed_home_feed(account=None):
+    with seeding_account_ids_lock:
+        if account.id in seeding_account_ids:
+            return
+
+        seeding_account_ids.add(account.id)
+
+    seed = partial(seed_home_feed_in_background, account=account)
+
+    executor.submit(run_with_database_connection, seed)
+
+
+def seed_home_feed_in_background(account=None):
+    try:
+        seed_home_feed(account=account)
+    except Exception:
+        logger.exception("Failed to seed the home feed of %s", account)
+    finally:
+        with seeding_account_ids_lock:
+            seeding_account_ids.discard(account.id)
+
+
+def rebuild_home_feeds():
+    """
+    Rebuilds the feeds of the active accounts (the others are rebuilt when
+    they're read), and returns the number of created feed items.
+    """
+    with transaction.atomic():
+        FeedItem.objects.all().delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SQL_QUERY_REBUILD_HOME_FEEDS,
+                {
+                    "max_items": settings.HOME_FEED_MAX_ITEMS_PER_ACCOUNT,
+                    "active_since": get_home_feed_active_since(),
+                },
+            )
+
+            number_created_items = cursor.rowcount
+
+    bump_cache_version(name=CACHE_VERSION_PIN_FEED)
+
+    return number_created_items
+
+
+def get_home_feed_pins(account=None):
+    """
+    Returns the pins of the account's materialized feed, annotated with
+    `surfaced_at`, or `None` for anonymous users, and if pins weren't pushed
+    to the feed (i.e. if the account wasn't active recently): the feed is
+    then rebuilt in the background. Reading the feed marks it as active.
+    """
+    if account is None:
+        return None
+
+    now = timezone.now()
+    home_feed_active_at = account.home_feed_active_at
+
+    if (
+        home_feed_active_at is None
+        or home_feed_active_at < get_home_feed_active_since()
+    ):
+        schedule_seed_home_feed(account=account)
+        return None
+
+    if home_feed_active_at < now - HOME_FEED_ACTIVITY_UPDATE_INTERVAL:
+        account.home_feed_active_at = now
+        Account.objects.filter(pk=account.pk).update(home_feed_active_at=now)
+
+    return Pin.objects.filter(feed_items__account=account).annotate(
+        surfaced_at=F("feed_items__surfaced_at")
+    )
@@ -0,0 +1,17 @@
+from ..models import Pin
+
+
+def get_pins_in_order(pin_ids=None, serializer_class=None, annotations=None):
+    """
+    Fetches the pins with the given IDs in a single query (loading upfront the
+    relations needed by `serializer_class`, and computing `annotations` if
+    any), and returns them in the order of `pin_ids`. IDs of pins which no
+    longer exist are skipped.
+    """
+    pins = Pin.objects.filter(id__in=pin_ids).annotate(**(annotations or {}))
+
+    pins = serializer_class.setup_eager_loading(pins)
+
+    pins_by_id = {pin.id: pin for pin in pins}
+
+    return [pins_by_id[pin_id] for pin_id in pin_ids if pin_id in pins_by_id]
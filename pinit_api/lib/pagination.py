@@ -0,0 +1,399 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .constants import ERROR_CODE_INVALID_CURSOR
+
+PAGINATION_QUERY_PARAM = "pagination"
+PAGINATION_MODE_CURSOR = "cursor"
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    `DjangoJSONEncoder` keeping the microseconds of datetimes and times (which
+    it truncates to milliseconds), so that cursors hold the exact position of
+    the last item: items in the same millisecond would be skipped otherwise.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor-based ("keyset") pagination.
+
+    The cursor is an opaque token encoding the values of the `ordering` fields
+    for the last item of the current page. The next page is then fetched with a
+    `WHERE (created_at, id) < (...)` condition instead of an `OFFSET`, so that
+    it can be read straight from a matching index: page 10,000 costs the same
+    as page 1. No total count is computed.
+
+    The `ordering` fields must make the ordering total (i.e. end with a unique
+    field such as `id`).
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded_cursor = request.query_params.get(self.cursor_query_param)
+
+        if encoded_cursor:
+            position = self.decode_cursor(encoded_cursor, queryset=queryset)
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        # We fetch one extra item to know whether there is a next page:
+        items = list(queryset[: self.page_size + 1])
+
+        self.has_next = len(items) > self.page_size
+        self.page = items[: self.page_size]
+
+        return self.page
+
+    def get_position_filter(self, position):
+        """
+        Returns the condition selecting the items located strictly after
+        `position` in the ordering, i.e. for a `(-created_at, -id)` ordering:
+        `created_at <= x AND (created_at < x OR (created_at = x AND id < y))`.
+        The redundant first term lets the database use it as an index condition.
+        """
+        field_names = [field.lstrip("-") for field in self.ordering]
+
+        leading_lookup = "lte" if self.ordering[0].startswith("-") else "gte"
+        position_filter = Q(**{f"{field_names[0]}__{leading_lookup}": position[0]})
+
+        after_position = Q()
+
+        for index, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+
+            equal_previous_fields = {
+                field_names[previous_index]: position[previous_index]
+                for previous_index in range(index)
+            }
+
+            after_position |= Q(
+                **equal_previous_fields,
+                **{f"{field_names[index]}__{lookup}": position[index]},
+            )
+
+        return position_filter & after_position
+
+    def get_paginated_response(self, data):
+        return Response(
+            self.get_paginated_data(
+                page_state=self.get_page_state(), request=self.request, data=data
+            )
+        )
+
+    def get_page_state(self):
+        """
+        Returns the details of the current page which don't depend on the
+        request (e.g. to be cached): the links are built from each request, by
+        `get_paginated_data`.
+        """
+        return {"next_cursor": self.get_next_cursor()}
+
+    @classmethod
+    def get_paginated_data(cls, page_state=None, request=None, data=None):
+        return {
+            "next": cls.get_cursor_link(
+                request=request, cursor=page_state["next_cursor"]
+            ),
+            "results": data,
+        }
+
+    def get_next_link(self):
+        return self.get_cursor_link(request=self.request, cursor=self.get_next_cursor())
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+
+        last_item = self.page[-1]
+
+        position = [getattr(last_item, field.lstrip("-")) for field in self.ordering]
+
+        return self.encode_cursor(position)
+
+    @classmethod
+    def get_cursor_link(cls, request=None, cursor=None):
+        if cursor is None:
+            return None
+
+        return replace_query_param(
+            request.build_absolute_uri(), cls.cursor_query_param, cursor
+        )
+
+    def encode_cursor(self, position):
+        serialized_position = json.dumps(position, cls=CursorJSONEncoder)
+
+        return urlsafe_b64encode(serialized_position.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, encoded_cursor, queryset=None):
+        try:
+            position = json.loads(urlsafe_b64decode(encoded_cursor.encode("ascii")))
+
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+
+            return [
+                self.deserialize_position_value(
+                    value, queryset=queryset, field_name=field.lstrip("-")
+                )
+                for value, field in zip(position, self.ordering)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise ParseError({"errors": [{"code": ERROR_CODE_INVALID_CURSOR}]})
+
+    def deserialize_position_value(self, value, queryset=None, field_name=""):
+        if value is None:
+            raise ValueError
+
+        if field_name in queryset.query.annotations:
+            field = queryset.query.annotations[field_name].output_field
+        else:
+            field = queryset.model._meta.get_field(field_name)
+
+        return field.to_python(value)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator using the query planner's estimate of the number of rows
+    (`EXPLAIN`) instead of an exact `COUNT(*)`, when that estimate is above
+    `settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD`. Since the estimated
+    number of pages can be wrong, page numbers are then validated by checking
+    whether the page actually contains items.
+    """
+
+    @cached_property
+    def count_and_is_estimated(self):
+        estimated_count = self.get_estimated_count()
+
+        if (
+            estimated_count is not None
+            and estimated_count >= settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimated_count, True
+
+        return super().count, False
+
+    @property
+    def count(self):
+        count, _ = self.count_and_is_estimated
+        return count
+
+    @property
+    def count_is_estimated(self):
+        _, is_estimated = self.count_and_is_estimated
+        return is_estimated
+
+    def get_estimated_count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return None
+
+        if connections[self.object_list.db].vendor != "postgresql":
+            return None
+
+        # Querysets known to be empty (`.none()`) can't be explained:
+        if self.object_list.query.is_empty():
+            return None
+
+        query_plan = json.loads(self.object_list.order_by().explain(format="json"))
+
+        return int(query_plan[0]["Plan"]["Plan Rows"])
+
+    def validate_number(self, number):
+        if not self.count_is_estimated:
+            return super().validate_number(number)
+
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+
+        if not self.count_is_estimated:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+
+        # We fetch one extra item to know whether there is a next page:
+        items = list(self.object_list[bottom : bottom + self.per_page + 1])
+
+        if not items and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+
+        return EstimatedCountPage(
+            items[: self.per_page],
+            number,
+            self,
+            has_next=len(items) > self.per_page,
+        )
+
+
+class CappedCountPaginator(EstimatedCountPaginator):
+    """
+    Django paginator counting at most `settings.PAGINATION_MAX_COUNT + 1`
+    items, with a `LIMIT`-bounded subquery, so that counting never costs much
+    more than fetching a page. Beyond that, the count is capped (and flagged
+    as estimated, so that pages are validated like with estimated counts).
+    """
+
+    @cached_property
+    def count_and_is_estimated(self):
+        max_count = settings.PAGINATION_MAX_COUNT
+
+        capped_count = self.get_capped_count(max_count=max_count)
+
+        if capped_count > max_count:
+            return max_count, True
+
+        return capped_count, False
+
+    @property
+    def count_is_capped(self):
+        return self.count_is_estimated
+
+    def get_capped_count(self, max_count=0):
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list[: max_count + 1])
+
+        # `SELECT COUNT(*) FROM (SELECT id ... LIMIT max_count + 1)`, without
+        # sorting nor computing annotations:
+        return self.object_list.order_by().values("pk")[: max_count + 1].count()
+
+
+class EstimatedCountPage(Page):
+    def __init__(self, object_list, number, paginator, has_next=False):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CappedCountPagination(PageNumberPagination):
+    """
+    Page number pagination with counts capped at
+    `settings.PAGINATION_MAX_COUNT` (see `CappedCountPaginator`). Responses
+    include `count_is_capped`, for clients to display e.g. "10000+".
+    """
+
+    django_paginator_class = CappedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            self.get_paginated_data(
+                page_state=self.get_page_state(), request=self.request, data=data
+            )
+        )
+
+    def get_page_state(self):
+        """
+        Returns the details of the current page which don't depend on the
+        request (e.g. to be cached): the links are built from each request, by
+        `get_paginated_data`.
+        """
+        return {
+            "count": self.page.paginator.count,
+            "count_is_estimated": self.page.paginator.count_is_estimated,
+            "count_is_capped": self.page.paginator.count_is_capped,
+            "page_number": self.page.number,
+            "has_next": self.page.has_next(),
+        }
+
+    @classmethod
+    def get_paginated_data(cls, page_state=None, request=None, data=None):
+        url = request.build_absolute_uri()
+        page_number = page_state["page_number"]
+
+        if page_state["has_next"]:
+            next_link = replace_query_param(url, cls.page_query_param, page_number + 1)
+        else:
+            next_link = None
+
+        # Same links to previous pages as `PageNumberPagination`:
+        if page_number <= 1:
+            previous_link = None
+        elif page_number == 2:
+            previous_link = remove_query_param(url, cls.page_query_param)
+        else:
+            previous_link = replace_query_param(
+                url, cls.page_query_param, page_number - 1
+            )
+
+        return {
+            "count": page_state["count"],
+            "count_is_estimated": page_state["count_is_estimated"],
+            "count_is_capped": page_state["count_is_capped"],
+            "next": next_link,
+            "previous": previous_link,
+            "results": data,
+        }
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination which doesn't run an exact `COUNT(*)` over large
+    result sets (see `EstimatedCountPaginator`). Responses include
+    `count_is_estimated`.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_estimated": self.page.paginator.count_is_estimated,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+def is_cursor_pagination_requested(request=None):
+    """
+    Cursor pagination is opt-in (`?pagination=cursor`), since it doesn't
+    return the total count nor allow jumping to an arbitrary page. Links to
+    next pages only carry the cursor.
+    """
+    query_params = request.query_params
+
+    return (
+        query_params.get(PAGINATION_QUERY_PARAM) == PAGINATION_MODE_CURSOR
+        or KeysetPagination.cursor_query_param in query_params
+    )
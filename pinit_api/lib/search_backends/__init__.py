@@ -0,0 +1,3 @@
+from .base import *
+from .in_memory import *
+from .postgres import *
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from django.conf import settings
+from django.db.models import TextField, Value
+from django.db.models.functions import Coalesce, Left, Replace
+from django.utils.module_loading import import_string
+
+__all__ = ["SearchBackend", "escape_html_expression", "get_search_backend"]
+
+# Same escaping as `django.utils.html.escape()` (`&` first, so that entities
+# aren't escaped twice):
+HTML_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("'", "&#x27;"),
+)
+
+
+class SearchBackend:
+    """
+    Interface of the search backends. The backend used by the search views is
+    set with `settings.SEARCH_BACKEND`.
+    """
+
+    def search_pins(self, normalized_search_term=""):
+        """
+        Returns a queryset of the pins matching the (normalized) search term,
+        annotated with a `rank` (float, higher is better). Ordering, pagination
+        and eager loading are left to the caller. The queryset must be
+        evaluated in the transaction in which it's returned (e.g. a
+        `statement_timeout` block), since it may depend on settings local to
+        that transaction.
+        """
+        raise NotImplementedError
+
+    def search_recent_pins(self, normalized_search_term=""):
+        """
+        Returns a queryset of the pins matching the search term, without
+        ranking them, for the degraded mode of the search (where only the most
+        recent matches are returned). By default, same as `search_pins`.
+        """
+        return self.search_pins(normalized_search_term=normalized_search_term)
+
+    def get_snippet_expression(self, normalized_search_term=""):
+        """
+        Returns an expression computing a short excerpt of a pin's description
+        with the terms of the search highlighted (`<mark>...</mark>`), to be
+        annotated on the pins of a page of results. Snippets are rendered as
+        HTML by clients, so the description must be HTML-escaped (only the
+        `<mark>` tags are markup). By default, the beginning of the
+        description, without highlighting.
+        """
+        # The description is truncated before being escaped, so that entities
+        # aren't cut:
+        return Coalesce(
+            escape_html_expression(
+                Left("description", settings.SEARCH_SNIPPET_MAX_LENGTH)
+            ),
+            Value(""),
+            output_field=TextField(),
+        )
+
+    def get_suggestions(self, prefix="", limit=0):
+        """
+        Returns at most `limit` words found in pins' titles and descriptions
+        which start with `prefix` (lowercase), most frequent first.
+        """
+        raise NotImplementedError
+
+
+def escape_html_expression(expression=None):
+    """
+    Returns an expression HTML-escaping the text computed by `expression`
+    (like `django.utils.html.escape()`, but in the database).
+    """
+    for char, entity in HTML_ESCAPES:
+        expression = Replace(
+            expression, Value(char), Value(entity), output_field=TextField()
+        )
+
+    return expression
+
+
+def get_search_backend():
+    return get_search_backend_instance(backend_path=settings.SEARCH_BACKEND)
+
+
+# Backends are instantiated once per process, since some of them hold state
+# (e.g. an in-memory index):
+@lru_cache(maxsize=None)
+def get_search_backend_instance(backend_path=""):
+    return import_string(backend_path)()
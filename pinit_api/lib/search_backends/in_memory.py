@@ -0,0 +1,337 @@
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db.models import BooleanField, F, FloatField, Func, Value
+from django.db.models.functions import Cast
+
+from ...models import Pin
+from ..concurrency import run_with_database_connection
+from ..constants import CACHE_VERSION_SEARCH_INDEX
+from ..utils import get_cache_version
+from .base import SearchBackend
+from .postgres import PostgresSearchBackend
+
+__all__ = ["BM25Index", "InMemorySearchBackend", "tokenize"]
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+INDEX_BUILD_CHUNK_SIZE = 2_000
+
+
+def tokenize(text=""):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class BM25Index:
+    """
+    Inverted index of pins' titles and descriptions, scored with BM25.
+
+    Each term's posting list is a pair of NumPy arrays: the (sorted) positions
+    of the documents containing the term, and the term's frequency in each of
+    them. Occurrences in titles count `title_weight` times, so that title
+    matches rank first (as with the weights of the Postgres search vector).
+    Like the Postgres full-text search, a document must contain all the terms
+    of the query to match. Terms aren't stemmed.
+    """
+
+    def __init__(self, documents=(), k1=1.2, b=0.75, title_weight=2):
+        self.k1 = k1
+        self.b = b
+
+        pin_ids = []
+        document_lengths = []
+        postings = defaultdict(lambda: ([], []))
+        self.word_counts = Counter()
+
+        for pin_id, title, description in documents:
+            position = len(pin_ids)
+            pin_ids.append(pin_id)
+
+            title_tokens = tokenize(title)
+            description_tokens = tokenize(description)
+
+            term_frequencies = Counter(description_tokens)
+
+            for token in title_tokens:
+                term_frequencies[token] += title_weight
+
+            document_lengths.append(sum(term_frequencies.values()))
+
+            for term, frequency in term_frequencies.items():
+                positions, frequencies = postings[term]
+                positions.append(position)
+                frequencies.append(frequency)
+
+            self.word_counts.update(title_tokens)
+            self.word_counts.update(description_tokens)
+
+        self.pin_ids = np.array(pin_ids, dtype=np.int64)
+        self.document_lengths = np.array(document_lengths, dtype=np.float32)
+        self.average_document_length = (
+            float(self.document_lengths.mean()) if pin_ids else 0.0
+        )
+
+        self.postings = {
+            term: (
+                np.array(positions, dtype=np.int32),
+                np.array(frequencies, dtype=np.float32),
+            )
+            for term, (positions, frequencies) in postings.items()
+        }
+
+        # Sorted words, for prefix lookups:
+        self.vocabulary = sorted(self.word_counts)
+
+    def search(self, terms=(), limit=0):
+        """
+        Returns the IDs of the pins containing all `terms`, and their scores,
+        best first (most recently indexed first for equal scores).
+        """
+        unique_terms = list(dict.fromkeys(terms))
+
+        if not unique_terms or any(term not in self.postings for term in unique_terms):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        postings = [self.postings[term] for term in unique_terms]
+
+        # Intersecting from the shortest posting list keeps intermediate results small:
+        postings.sort(key=lambda posting: len(posting[0]))
+
+        matched_positions = postings[0][0]
+
+        for positions, _ in postings[1:]:
+            matched_positions = np.intersect1d(
+                matched_positions, positions, assume_unique=True
+            )
+
+        number_documents = len(self.pin_ids)
+
+        length_normalization = self.k1 * (
+            1
+            - self.b
+            + self.b
+            * self.document_lengths[matched_positions]
+            / self.average_document_length
+        )
+
+        scores = np.zeros(len(matched_positions), dtype=np.float64)
+
+        for positions, frequencies in postings:
+            document_frequency = len(positions)
+            inverse_document_frequency = np.log1p(
+                (number_documents - document_frequency + 0.5)
+                / (document_frequency + 0.5)
+            )
+
+            term_frequencies = frequencies[
+                np.searchsorted(positions, matched_positions)
+            ]
+
+            scores += (
+                inverse_document_frequency
+                * term_frequencies
+                * (self.k1 + 1)
+                / (term_frequencies + length_normalization)
+            )
+
+        order = np.lexsort((-matched_positions, -scores))[:limit]
+
+        return self.pin_ids[matched_positions[order]], scores[order]
+
+    def get_suggestions(self, prefix="", limit=0):
+        words = []
+
+        for word_index in range(
+            bisect_left(self.vocabulary, prefix), len(self.vocabulary)
+        ):
+            word = self.vocabulary[word_index]
+
+            if not word.startswith(prefix):
+                break
+
+            words.append(word)
+
+        return heapq.nsmallest(
+            limit, words, key=lambda word: (-self.word_counts[word], word)
+        )
+
+
+# Compiling `id__in=...` or one `When` expression per pin would take longer
+# than the search itself, and so would binding thousands of parameters: pin IDs
+# and scores are numbers coming from the index, so the two expressions below
+# inline them in the SQL (after conversion to `int` and `float`).
+
+
+class PinIdIn(Func):
+    """
+    `id IN (<pin ID>, ...)`.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, pin_ids=()):
+        super().__init__(F("id"))
+        self.pin_ids = pin_ids
+
+    def as_sql(self, compiler, connection, **extra_context):
+        id_sql, id_params = compiler.compile(self.source_expressions[0])
+
+        pin_ids_sql = ", ".join(str(int(pin_id)) for pin_id in self.pin_ids)
+
+        return f"{id_sql} IN ({pin_ids_sql})", id_params
+
+
+class ScoreByPinId(Func):
+    """
+    `CASE id WHEN <pin ID> THEN <score> ... ELSE 0 END`.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, pin_ids=(), scores=()):
+        super().__init__(F("id"))
+        self.pin_ids = pin_ids
+        self.scores = scores
+
+    def as_sql(self, compiler, connection, **extra_context):
+        id_sql, id_params = compiler.compile(self.source_expressions[0])
+
+        when_clauses = " ".join(
+            f"WHEN {int(pin_id)} THEN {float(score)!r}"
+            for pin_id, score in zip(self.pin_ids, self.scores)
+        )
+
+        return f"CASE {id_sql} {when_clauses} ELSE 0 END", id_params
+
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    Serves the search from a `BM25Index` held in the memory of the process.
+
+    The index is built from the database in a background thread, on first
+    use, and again when a pin is created, edited or deleted (i.e. when the
+    search index cache version moves). Searches keep using the previous index
+    until the new one is built, and are served by `PostgresSearchBackend`
+    until the first one is (unless `BACKGROUND_REBUILDS` is disabled, in which
+    case the index is built during the search). Only the `MAX_RESULTS` best
+    matches are returned, and there is no fuzzy fallback.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.index_version = None
+        self.rebuild_thread = None
+        self.lock = threading.Lock()
+        self.fallback_backend = PostgresSearchBackend()
+
+    def search_pins(self, normalized_search_term=""):
+        index = self.get_index()
+
+        if index is None:
+            return self.fallback_backend.search_pins(
+                normalized_search_term=normalized_search_term
+            )
+
+        pin_ids, scores = index.search(
+            terms=tokenize(normalized_search_term),
+            limit=settings.SEARCH_IN_MEMORY_INDEX["MAX_RESULTS"],
+        )
+
+        if not len(pin_ids):
+            return Pin.objects.none().annotate(rank=Value(0.0))
+
+        pin_ids = pin_ids.tolist()
+
+        # Scores are passed to the database, so that results can be ordered
+        # and paginated like any other queryset:
+        rank = Cast(ScoreByPinId(pin_ids=pin_ids, scores=scores.tolist()), FloatField())
+
+        return Pin.objects.filter(PinIdIn(pin_ids=pin_ids)).annotate(rank=rank)
+
+    def search_recent_pins(self, normalized_search_term=""):
+        if self.index is None:
+            return self.fallback_backend.search_recent_pins(
+                normalized_search_term=normalized_search_term
+            )
+
+        return self.search_pins(normalized_search_term=normalized_search_term)
+
+    def get_suggestions(self, prefix="", limit=0):
+        index = self.get_index()
+
+        if index is None:
+            return self.fallback_backend.get_suggestions(prefix=prefix, limit=limit)
+
+        return index.get_suggestions(prefix=prefix, limit=limit)
+
+    def get_index(self):
+        """
+        Returns the current index, or `None` while the first one is being
+        built in the background (the build runs outside of the search's
+        transaction and `statement_timeout`).
+        """
+        if self.is_stale():
+            if settings.SEARCH_IN_MEMORY_INDEX["BACKGROUND_REBUILDS"]:
+                self.start_background_rebuild()
+            else:
+                with self.lock:
+                    if self.is_stale():
+                        self.rebuild()
+
+        return self.index
+
+    def rebuild(self):
+        # The version is read first, so that pins changed during the build
+        # trigger another rebuild:
+        index_version = get_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
+
+        self.index = self.build_index()
+        self.index_version = index_version
+
+    def is_stale(self):
+        return get_cache_version(name=CACHE_VERSION_SEARCH_INDEX) != self.index_version
+
+    def start_background_rebuild(self):
+        with self.lock:
+            # At most one rebuild at a time:
+            if self.rebuild_thread is not None and self.rebuild_thread.is_alive():
+                return
+
+            self.rebuild_thread = threading.Thread(
+                target=self.rebuild_in_background,
+                name="search-in-memory-index-rebuild",
+                daemon=True,
+            )
+            self.rebuild_thread.start()
+
+    def rebuild_in_background(self):
+        try:
+            run_with_database_connection(self.rebuild)
+        except Exception:
+            # The previous index keeps being served, until the next search
+            # starts another rebuild:
+            logger.exception("Failed to rebuild the in-memory search index")
+
+    def build_index(self):
+        index_settings = settings.SEARCH_IN_MEMORY_INDEX
+
+        documents = (
+            Pin.objects.order_by("id")
+            .values_list("id", "title", "description")
+            .iterator(chunk_size=INDEX_BUILD_CHUNK_SIZE)
+        )
+
+        return BM25Index(
+            documents=documents,
+            k1=index_settings["K1"],
+            b=index_settings["B"],
+            title_weight=index_settings["TITLE_WEIGHT"],
+        )
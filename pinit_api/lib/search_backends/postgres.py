@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+
+from ...models import Pin
+from ..search_words import get_most_frequent_words
+from .base import SearchBackend, escape_html_expression
+
+__all__ = ["PostgresSearchBackend"]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full-text search on the stored `search_vector` column of pins, with a
+    fuzzy (trigram) fallback on titles when nothing matches.
+    """
+
+    def search_pins(self, normalized_search_term=""):
+        matched_pins = self.get_full_text_matched_pins(
+            normalized_search_term=normalized_search_term
+        )
+
+        # Misspelled or partial words don't match anything with the full-text
+        # search, so we then fall back to a fuzzy search on titles:
+        if not matched_pins.exists():
+            matched_pins = self.get_fuzzy_matched_pins(
+                normalized_search_term=normalized_search_term
+            )
+
+        return matched_pins
+
+    def search_recent_pins(self, normalized_search_term=""):
+        # Without ranking, the most recent matches can be found by scanning the
+        # `created_at` index and stopping early (which is what makes the
+        # degraded mode fast for very common words), and without the fuzzy
+        # fallback:
+        return Pin.objects.filter(search_vector=SearchQuery(normalized_search_term))
+
+    def get_full_text_matched_pins(self, normalized_search_term=""):
+        search_query = SearchQuery(normalized_search_term)
+
+        # Matching uses the GIN index on the stored `search_vector` column.
+        # `ts_rank` returns a `real`, which is cast to `double precision` so that
+        # ranks stored in cursors compare equal to the database values:
+        return Pin.objects.filter(search_vector=search_query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        )
+
+    def get_fuzzy_matched_pins(self, normalized_search_term=""):
+        # The `%>` operator (`trigram_word_similar`) can use the trigram index on
+        # titles, but only with the threshold set as a configuration parameter.
+        # It's set until the end of the transaction only (like the statement
+        # timeout), so as not to leak into the other uses of the (persistent)
+        # connection: the results must be read in the same transaction.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true);",
+                [str(settings.SEARCH_FUZZY_SIMILARITY_THRESHOLD)],
+            )
+
+        return Pin.objects.filter(
+            title__trigram_word_similar=normalized_search_term
+        ).annotate(
+            rank=Cast(
+                TrigramWordSimilarity(normalized_search_term, "title"), FloatField()
+            )
+        )
+
+    def get_snippet_expression(self, normalized_search_term=""):
+        # `ts_headline` is slow (it parses the whole document), so it must only
+        # be computed for the pins which are returned. It doesn't escape the
+        # document (HTML tags are even kept as they are), so it's applied to
+        # the escaped description, whose entities are parsed as single tokens:
+        return Coalesce(
+            SearchHeadline(
+                escape_html_expression(F("description")),
+                SearchQuery(normalized_search_term),
+                start_sel="<mark>",
+                stop_sel="</mark>",
+                max_words=settings.SEARCH_SNIPPET_MAX_WORDS,
+                min_words=settings.SEARCH_SNIPPET_MAX_WORDS // 2,
+            ),
+            Value(""),
+            output_field=TextField(),
+        )
+
+    def get_suggestions(self, prefix="", limit=0):
+        # Word counts are maintained incrementally in a table (see
+        # `lib/search_words.py`):
+        return get_most_frequent_words(prefix=prefix, limit=limit)
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from ..models import SearchQueryPopularity
+from .concurrency import executor, run_with_database_connection
+
+logger = logging.getLogger(__name__)
+
+# The popularity of search terms decays exponentially over time (with a
+# half-life of `HALF_LIFE_DAYS`). Instead of decaying all the scores as time
+# goes by, each search adds a weight growing exponentially with time
+# ("forward decay"): `2 ** ((t - DECAY_EPOCH) / half_life)`. All scores would
+# decay by the same factor, so comparing stored scores is the same as
+# comparing current popularities, and the current number of searches is the
+# score divided by the current weight. (With a half-life of 7 days, weights
+# stay within the range of floats for about 19 years after the epoch.)
+DECAY_EPOCH_TIMESTAMP = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+SECONDS_PER_DAY = 86_400
+
+# Adds the buffered weights (`%(queries)s`, `%(weights)s`) to the scores, in
+# a single statement (rows are upserted in order, so that concurrent flushes
+# lock them in the same order):
+SQL_QUERY_ADD_SEARCH_QUERY_WEIGHTS = """
+INSERT INTO pinit_api_searchquerypopularity (query, score)
+SELECT query, weight
+FROM unnest(%(queries)s::text[], %(weights)s::double precision[]) t (query, weight)
+ORDER BY query
+ON CONFLICT (query)
+DO UPDATE SET score = pinit_api_searchquerypopularity.score + EXCLUDED.score;
+"""
+
+
+def get_search_weight(timestamp=0.0):
+    half_life_seconds = settings.SEARCH_QUERY_LOG["HALF_LIFE_DAYS"] * SECONDS_PER_DAY
+
+    return 2 ** ((timestamp - DECAY_EPOCH_TIMESTAMP) / half_life_seconds)
+
+
+class SearchQueryLog:
+    """
+    Buffers the searches made in this process, as the sums of their weights
+    by search term, and adds them to the database in batches: a flush is
+    started in the background once `FLUSH_MAX_QUERIES` distinct terms are
+    buffered, or `FLUSH_INTERVAL_SECONDS` after the previous flush (`None`
+    disables either trigger). Searches buffered when the process stops are
+    lost.
+    """
+
+    def __init__(self):
+        self.pending_weights = Counter()
+        self.last_flushed_at = time.monotonic()
+        self.is_flushing = False
+        self.lock = threading.Lock()
+
+    def record(self, normalized_search_term=""):
+        weight = get_search_weight(timestamp=time.time())
+
+        with self.lock:
+            self.pending_weights[normalized_search_term] += weight
+
+            if self.is_flushing or not self.is_flush_due():
+                return
+
+            self.is_flushing = True
+
+        executor.submit(run_with_database_connection, self.flush_in_background)
+
+    def is_flush_due(self):
+        log_settings = settings.SEARCH_QUERY_LOG
+
+        flush_max_queries = log_settings["FLUSH_MAX_QUERIES"]
+        flush_interval = log_settings["FLUSH_INTERVAL_SECONDS"]
+
+        return (
+            flush_max_queries is not None
+            and len(self.pending_weights) >= flush_max_queries
+        ) or (
+            flush_interval is not None
+            and time.monotonic() - self.last_flushed_at >= flush_interval
+        )
+
+    def flush(self):
+        """
+        Adds the buffered weights to the database, and returns the number of
+        search terms updated. If that fails, the weights are buffered again.
+        """
+        with self.lock:
+            pending_weights, self.pending_weights = self.pending_weights, Counter()
+            self.last_flushed_at = time.monotonic()
+
+        if not pending_weights:
+            return 0
+
+        queries, weights = zip(*pending_weights.items())
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    SQL_QUERY_ADD_SEARCH_QUERY_WEIGHTS,
+                    {"queries": list(queries), "weights": list(weights)},
+                )
+        except Exception:
+            with self.lock:
+                self.pending_weights.update(pending_weights)
+            raise
+
+        return len(queries)
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush the search query log")
+        finally:
+            with self.lock:
+                self.is_flushing = False
+
+
+# Shared by all the requests of the process:
+search_query_log = SearchQueryLog()
+
+
+def get_popular_search_queries(prefix="", limit=0):
+    """
+    Returns at most `limit` search terms starting with `prefix`, which were
+    searched at least `MIN_SEARCHES` times (after decay), most popular first.
+    """
+    min_score = settings.SEARCH_QUERY_LOG["MIN_SEARCHES"] * get_search_weight(
+        timestamp=time.time()
+    )
+
+    # The matching terms are sorted by score: the prefix index only finds
+    # them. Long prefixes match few terms, which are sorted once read from the
+    # prefix index. Short prefixes can match many of them, so the database
+    # rather scans the score index from the most popular term (down to
+    # `min_score`), stopping once `limit` terms match the prefix:
+    return list(
+        SearchQueryPopularity.objects.filter(
+            query__startswith=prefix, score__gte=min_score
+        )
+        .order_by("-score", "query")
+        .values_list("query", flat=True)[:limit]
+    )
+
+
+def prune_search_queries():
+    """
+    Deletes the search terms searched less than `PRUNE_MAX_SEARCHES` times
+    (after decay), and returns their number.
+    """
+    max_score = settings.SEARCH_QUERY_LOG["PRUNE_MAX_SEARCHES"] * get_search_weight(
+        timestamp=time.time()
+    )
+
+    number_deleted_queries, _ = SearchQueryPopularity.objects.filter(
+        score__lt=max_score
+    ).delete()
+
+    return number_deleted_queries
@@ -0,0 +1,75 @@
+from django.db import connection, transaction
+
+from ..models import SearchPhrase, SearchWord
+
+# The `pinit_api_searchword` table counts the occurrences of each word in the
+# titles and descriptions of all pins, and `pinit_api_searchphrase` those of
+# each sequence of 2 or 3 consecutive words of titles. They're kept up to date
+# by triggers on pins (see migrations 0038 and 0040), so that search
+# suggestions are range reads on the indexes of these tables instead of
+# splitting every pin's text on each keystroke.
+
+# Maximum number of words of the phrases:
+MAX_PHRASE_WORDS = 3
+
+# Pins are locked against writes while the tables are rebuilt, so that the
+# triggers can't count words concurrently:
+SQL_QUERY_LOCK_PINS = "LOCK TABLE pinit_api_pin IN SHARE MODE;"
+
+SQL_QUERY_REBUILD_SEARCH_WORDS = """
+INSERT INTO pinit_api_searchword (word, count)
+SELECT word, COUNT(*)
+FROM pinit_api_pin, pinit_api_pin_words(title, description) word
+GROUP BY word;
+"""
+
+SQL_QUERY_REBUILD_SEARCH_PHRASES = """
+INSERT INTO pinit_api_searchphrase (phrase, number_words, count)
+SELECT phrase, number_words, COUNT(*)
+FROM pinit_api_pin, pinit_api_pin_title_phrases(title)
+GROUP BY phrase, number_words;
+"""
+
+
+def rebuild_search_words():
+    """
+    Rebuilds the tables of words and phrases, and returns their numbers of
+    rows.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_QUERY_LOCK_PINS)
+
+            SearchWord.objects.all().delete()
+            cursor.execute(SQL_QUERY_REBUILD_SEARCH_WORDS)
+            number_words = cursor.rowcount
+
+            SearchPhrase.objects.all().delete()
+            cursor.execute(SQL_QUERY_REBUILD_SEARCH_PHRASES)
+            number_phrases = cursor.rowcount
+
+    return number_words, number_phrases
+
+
+def get_most_frequent_words(prefix="", limit=0):
+    return list(
+        SearchWord.objects.filter(word__startswith=prefix)
+        .order_by("-count", "word")
+        .values_list("word", flat=True)[:limit]
+    )
+
+
+def get_most_frequent_phrases(previous_words=(), prefix="", limit=0):
+    """
+    Returns at most `limit` phrases made of the previous words (at most
+    `MAX_PHRASE_WORDS - 1`) followed by a word starting with `prefix`, most
+    frequent first.
+    """
+    return list(
+        SearchPhrase.objects.filter(
+            number_words=len(previous_words) + 1,
+            phrase__startswith=" ".join([*previous_words, prefix]),
+        )
+        .order_by("-count", "phrase")
+        .values_list("phrase", flat=True)[:limit]
+    )
@@ -0,0 +1,5 @@
+from .base import *
+from .memory_mapped import *
+from .search_backend import *
+from .trie import *
+from .typo_tolerant import *
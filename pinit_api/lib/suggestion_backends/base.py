@@ -0,0 +1,40 @@
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+__all__ = ["SuggestionBackend", "get_suggestion_backend"]
+
+
+class SuggestionBackend:
+    """
+    Interface of the search suggestions backends. The backend used by the
+    search suggestions view is set with `settings.SEARCH_SUGGESTIONS_BACKEND`.
+    """
+
+    def get_suggestions(self, prefix="", limit=0):
+        """
+        Returns at most `limit` words found in pins' titles and descriptions
+        which start with `prefix` (lowercase), most frequent first.
+        """
+        raise NotImplementedError
+
+    def get_typo_tolerant_suggestions(self, prefix="", limit=0):
+        """
+        Returns at most `limit` words starting with `prefix` or with a prefix
+        within a small edit distance of it (for mistyped prefixes), most
+        frequent first. Backends which don't support it return no words.
+        """
+        return []
+
+
+def get_suggestion_backend():
+    return get_suggestion_backend_instance(
+        backend_path=settings.SEARCH_SUGGESTIONS_BACKEND
+    )
+
+
+# Backends are instantiated once per process, since some of them hold state
+# (e.g. an in-memory index):
+@lru_cache(maxsize=None)
+def get_suggestion_backend_instance(backend_path=""):
+    return import_string(backend_path)()
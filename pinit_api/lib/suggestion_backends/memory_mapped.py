@@ -0,0 +1,285 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import SuggestionBackend
+from .trie import get_prefix_upper_bound
+
+__all__ = [
+    "MemoryMappedSuggestionBackend",
+    "MemoryMappedSuggestionIndex",
+    "write_suggestion_index",
+]
+
+# File format: the magic bytes, the size of the JSON header, the JSON header
+# (number of words and completions per node, and dtype, length and offset of
+# each array), then the arrays, aligned on 8 bytes:
+# - `word_offsets` (n + 1): offsets of the words in `word_bytes`,
+# - `word_bytes`: the UTF-8 encoded words, sorted (UTF-8 byte order is the
+#   same as code point order),
+# - `completion_ranks` (n): position of each word in the order of the
+#   completions (most frequent first, then alphabetical order),
+# - `node_keys` (m, sorted): `start * (n + 1) + end` for each node having
+#   precomputed completions, where `[start, end)` is its range of words,
+# - `node_completions` (m * completions_per_node): positions of the
+#   precomputed completions of each node (padded with -1).
+FILE_MAGIC = b"PINSUGG1"
+HEADER_SIZE_FORMAT = "<I"
+ARRAY_ALIGNMENT = 8
+
+# Codes of the arrays when read through `memoryview.cast()`:
+MEMORYVIEW_FORMATS = {"int64": "q", "int32": "i", "uint8": "B"}
+
+
+def write_suggestion_index(path="", trie=None):
+    """
+    Writes the words and precomputed completions of a `SuggestionTrie` to an
+    index file. The file is written next to `path`, then renamed, so that
+    processes never read a partially written file.
+    """
+    words = trie.words
+    number_words = len(words)
+
+    encoded_words = [word.encode("utf-8") for word in words]
+
+    word_offsets = np.zeros(number_words + 1, dtype=np.int64)
+    word_offsets[1:] = np.cumsum(
+        np.fromiter(
+            (len(word) for word in encoded_words), dtype=np.int64, count=number_words
+        )
+    )
+
+    # Different prefixes can have the same range of words (and completions):
+    completions_by_range = {}
+
+    for prefix, completions in trie.completions_by_prefix.items():
+        start = bisect_left(words, prefix)
+        end = (
+            bisect_left(words, get_prefix_upper_bound(prefix), start)
+            if prefix
+            else number_words
+        )
+        completions_by_range[(start, end)] = completions
+
+    ranges = sorted(completions_by_range)
+
+    node_completions = np.full(
+        (len(ranges), trie.completions_per_node), -1, dtype=np.int32
+    )
+
+    for node_index, word_range in enumerate(ranges):
+        for completion_index, word in enumerate(completions_by_range[word_range]):
+            node_completions[node_index, completion_index] = bisect_left(words, word)
+
+    arrays = {
+        "word_offsets": word_offsets,
+        "word_bytes": np.frombuffer(b"".join(encoded_words), dtype=np.uint8),
+        "completion_ranks": trie.completion_ranks.astype(np.int32),
+        "node_keys": np.array(
+            [start * (number_words + 1) + end for start, end in ranges],
+            dtype=np.int64,
+        ),
+        "node_completions": node_completions.ravel(),
+    }
+
+    header = {
+        "number_words": number_words,
+        "completions_per_node": trie.completions_per_node,
+        "arrays": {},
+    }
+
+    offset = 0
+
+    for name, array in arrays.items():
+        header["arrays"][name] = [str(array.dtype), len(array), offset]
+        offset += -(-array.nbytes // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+    encoded_header = json.dumps(header).encode("utf-8")
+
+    data_start = len(FILE_MAGIC) + struct.calcsize(HEADER_SIZE_FORMAT)
+    data_start += len(encoded_header)
+    padding = -data_start % ARRAY_ALIGNMENT
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(temporary_path, "wb") as index_file:
+        index_file.write(FILE_MAGIC)
+        index_file.write(struct.pack(HEADER_SIZE_FORMAT, len(encoded_header)))
+        index_file.write(encoded_header + b"\0" * padding)
+
+        for array in arrays.values():
+            index_file.write(array.tobytes())
+            index_file.write(b"\0" * (-array.nbytes % ARRAY_ALIGNMENT))
+
+        index_file.flush()
+        os.fsync(index_file.fileno())
+
+    os.replace(temporary_path, path)
+
+
+class SortedWords:
+    """
+    Sequence of the (encoded) words of a memory-mapped index, for `bisect`.
+    Words are sliced from the mapping directly (which returns `bytes`).
+    """
+
+    def __init__(self, word_offsets=None, buffer=None, word_bytes_start=0):
+        self.word_offsets = word_offsets
+        self.buffer = buffer
+        self.word_bytes_start = word_bytes_start
+
+    def __len__(self):
+        return len(self.word_offsets) - 1
+
+    def __getitem__(self, position):
+        word_start = self.word_bytes_start + self.word_offsets[position]
+        word_end = self.word_bytes_start + self.word_offsets[position + 1]
+
+        return self.buffer[word_start:word_end]
+
+
+class MemoryMappedSuggestionIndex:
+    """
+    Read-only view of an index file written by `write_suggestion_index`,
+    memory-mapped: the pages of the file are shared by all the processes
+    reading it (and loaded lazily by the OS). Lookups are the same as with a
+    `SuggestionTrie`.
+    """
+
+    def __init__(self, path=""):
+        with open(path, "rb") as index_file:
+            self.file_id = get_file_id(os.fstat(index_file.fileno()))
+            self.buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size_start = len(FILE_MAGIC)
+        header_start = header_size_start + struct.calcsize(HEADER_SIZE_FORMAT)
+
+        if self.buffer[:header_size_start] != FILE_MAGIC:
+            raise ValueError(f"{path} isn't a search suggestions index")
+
+        (header_size,) = struct.unpack_from(
+            HEADER_SIZE_FORMAT, self.buffer, header_size_start
+        )
+        header = json.loads(self.buffer[header_start : header_start + header_size])
+
+        data_start = header_start + header_size
+        data_start += -data_start % ARRAY_ALIGNMENT
+
+        self.completions_per_node = header["completions_per_node"]
+
+        # Arrays are read through memory views rather than NumPy arrays, since
+        # indexing them returns Python objects directly (which is faster for
+        # the few items read by each lookup):
+        arrays = {}
+        array_starts = {}
+
+        for name, (dtype, length, offset) in header["arrays"].items():
+            array_start = array_starts[name] = data_start + offset
+            array_end = array_start + length * np.dtype(dtype).itemsize
+
+            arrays[name] = memoryview(self.buffer)[array_start:array_end].cast(
+                MEMORYVIEW_FORMATS[dtype]
+            )
+
+        self.words = SortedWords(
+            word_offsets=arrays["word_offsets"],
+            buffer=self.buffer,
+            word_bytes_start=array_starts["word_bytes"],
+        )
+        self.completion_ranks = arrays["completion_ranks"]
+        self.node_keys = arrays["node_keys"]
+        self.node_completions = arrays["node_completions"]
+
+    def get_suggestions(self, prefix="", limit=0):
+        number_words = len(self.words)
+
+        start = bisect_left(self.words, prefix.encode("utf-8"))
+        end = (
+            bisect_left(
+                self.words, get_prefix_upper_bound(prefix).encode("utf-8"), start
+            )
+            if prefix
+            else number_words
+        )
+
+        node_key = start * (number_words + 1) + end
+        node_index = bisect_left(self.node_keys, node_key)
+
+        if node_index < len(self.node_keys) and self.node_keys[node_index] == node_key:
+            node_start = node_index * self.completions_per_node
+            node_end = node_start + self.completions_per_node
+
+            positions = [
+                position
+                for position in self.node_completions[node_start:node_end]
+                if position >= 0
+            ]
+        else:
+            # The node has `completions_per_node` words at most:
+            positions = sorted(range(start, end), key=self.completion_ranks.__getitem__)
+
+        return [self.words[position].decode("utf-8") for position in positions[:limit]]
+
+
+def get_file_id(stat_result=None):
+    return stat_result.st_dev, stat_result.st_ino, stat_result.st_mtime_ns
+
+
+class MemoryMappedSuggestionBackend(SuggestionBackend):
+    """
+    Serves the suggestions from a `MemoryMappedSuggestionIndex`, built by the
+    `build_search_suggestions_index` command, so that all the worker
+    processes of a server share the same index in memory.
+
+    Every `RELOAD_CHECK_INTERVAL_SECONDS`, lookups check whether the file was
+    replaced (by a new build) and map the new one if so. Lookups in progress
+    keep using the previous mapping, which remains readable after the file is
+    replaced.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get_suggestions(self, prefix="", limit=0):
+        return self.get_index().get_suggestions(prefix=prefix, limit=limit)
+
+    def get_index(self):
+        index_settings = settings.SEARCH_SUGGESTIONS_MEMORY_MAPPED_INDEX
+
+        if (
+            self.index is None
+            or time.monotonic() - self.checked_at
+            >= index_settings["RELOAD_CHECK_INTERVAL_SECONDS"]
+        ):
+            with self.lock:
+                self.reload_if_replaced(path=index_settings["PATH"])
+
+        return self.index
+
+    def reload_if_replaced(self, path=""):
+        try:
+            file_id = get_file_id(os.stat(path))
+        except FileNotFoundError:
+            if self.index is None:
+                raise ImproperlyConfigured(
+                    f"The search suggestions index ({path}) doesn't exist: it "
+                    "must be built with the `build_search_suggestions_index` "
+                    "command."
+                )
+            # The previous index keeps being served:
+            file_id = self.index.file_id
+
+        if self.index is None or file_id != self.index.file_id:
+            self.index = MemoryMappedSuggestionIndex(path=path)
+
+        self.checked_at = time.monotonic()
@@ -0,0 +1,14 @@
+from ..search_backends import get_search_backend
+from .base import SuggestionBackend
+
+__all__ = ["SearchBackendSuggestionBackend"]
+
+
+class SearchBackendSuggestionBackend(SuggestionBackend):
+    """
+    Serves the suggestions of the search backend (e.g. from the table of word
+    counts for `PostgresSearchBackend`).
+    """
+
+    def get_suggestions(self, prefix="", limit=0):
+        return get_search_backend().get_suggestions(prefix=prefix, limit=limit)
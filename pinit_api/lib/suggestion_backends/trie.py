@@ -0,0 +1,230 @@
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+import numpy as np
+from django.conf import settings
+
+from ...models import SearchWord
+from ..concurrency import run_with_database_connection
+from ..constants import CACHE_VERSION_SEARCH_INDEX
+from ..utils import get_cache_version
+from .base import SuggestionBackend
+
+__all__ = ["SuggestionTrie", "TrieSuggestionBackend", "build_suggestion_trie"]
+
+logger = logging.getLogger(__name__)
+
+TRIE_BUILD_CHUNK_SIZE = 10_000
+
+
+def get_prefix_upper_bound(prefix=""):
+    """
+    Returns the smallest string greater than all the strings starting with
+    `prefix` (which must not be empty).
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SuggestionTrie:
+    """
+    Prefix tree of words, where each node holds the precomputed completions of
+    its prefix: the `completions_per_node` most frequent words starting with
+    it (ties being resolved by alphabetical order).
+
+    The tree is stored flat: words are kept in a sorted list, so that the
+    words of a node are a contiguous range of it, and the completions of the
+    nodes having more words than `completions_per_node` are stored in a dict,
+    by prefix. The completions of the other nodes are all their words, which
+    are sorted on lookup (a handful of words at most).
+    """
+
+    def __init__(self, word_counts=(), completions_per_node=12):
+        self.completions_per_node = completions_per_node
+
+        word_counts = sorted(word_counts)
+
+        self.words = [word for word, _ in word_counts]
+        counts = np.array([count for _, count in word_counts], dtype=np.int64)
+
+        # Position of each word in the order of the completions:
+        self.completion_ranks = np.empty(len(self.words), dtype=np.int64)
+        self.completion_ranks[np.lexsort((np.arange(len(self.words)), -counts))] = (
+            np.arange(len(self.words))
+        )
+
+        self.completions_by_prefix = {}
+        self.precompute_completions()
+
+    def precompute_completions(self):
+        # Depth-first traversal of the nodes having more words than
+        # `completions_per_node` (i.e. of word ranges), from the root:
+        nodes = [("", 0, len(self.words))]
+
+        while nodes:
+            prefix, start, end = nodes.pop()
+
+            if end - start <= self.completions_per_node:
+                continue
+
+            self.completions_by_prefix[prefix] = self.get_range_completions(
+                start=start, end=end
+            )
+
+            # The word equal to the prefix (if any) comes first, and isn't part
+            # of any child node:
+            child_start = start + (self.words[start] == prefix)
+
+            while child_start < end:
+                child_prefix = self.words[child_start][: len(prefix) + 1]
+                child_end = bisect_left(
+                    self.words,
+                    get_prefix_upper_bound(child_prefix),
+                    child_start,
+                    end,
+                )
+
+                nodes.append((child_prefix, child_start, child_end))
+                child_start = child_end
+
+    def get_range_completions(self, start=0, end=0):
+        range_ranks = self.completion_ranks[start:end]
+
+        positions = np.arange(end - start)
+
+        if end - start > self.completions_per_node:
+            positions = np.argpartition(range_ranks, self.completions_per_node - 1)[
+                : self.completions_per_node
+            ]
+
+        positions = positions[np.argsort(range_ranks[positions])]
+
+        return tuple(self.words[start + position] for position in positions)
+
+    def get_suggestions(self, prefix="", limit=0):
+        completions = self.completions_by_prefix.get(prefix)
+
+        if completions is None:
+            # The node has `completions_per_node` words at most:
+            start = bisect_left(self.words, prefix)
+            end = (
+                bisect_left(self.words, get_prefix_upper_bound(prefix), start)
+                if prefix
+                else len(self.words)
+            )
+
+            completions = [
+                self.words[position]
+                for position in sorted(
+                    range(start, end), key=self.completion_ranks.__getitem__
+                )
+            ]
+
+        return list(completions[:limit])
+
+    def get_memory_usage(self):
+        """
+        Returns the approximate number of bytes used by the trie (words,
+        ranks and precomputed completions).
+        """
+        words_size = sys.getsizeof(self.words) + sum(
+            sys.getsizeof(word) for word in self.words
+        )
+
+        # Completions reference the strings of `self.words`:
+        completions_size = sys.getsizeof(self.completions_by_prefix) + sum(
+            sys.getsizeof(prefix) + sys.getsizeof(completions)
+            for prefix, completions in self.completions_by_prefix.items()
+        )
+
+        return words_size + self.completion_ranks.nbytes + completions_size
+
+
+class TrieSuggestionBackend(SuggestionBackend):
+    """
+    Serves the suggestions from a `SuggestionTrie` held in the memory of the
+    process, so that lookups don't use the database.
+
+    The trie is built from the table of word counts on first use, then
+    rebuilt by a background thread when it's stale (see
+    `settings.SEARCH_SUGGESTIONS_TRIE`). Lookups keep using the previous trie
+    until the new one is built.
+    """
+
+    def __init__(self):
+        self.trie = None
+        self.trie_version = None
+        self.trie_built_at = 0.0
+        self.lock = threading.Lock()
+
+    def get_suggestions(self, prefix="", limit=0):
+        return self.get_trie().get_suggestions(prefix=prefix, limit=limit)
+
+    def get_trie(self):
+        if self.trie is None:
+            with self.lock:
+                if self.trie is None:
+                    self.refresh()
+                    self.start_background_refreshes()
+
+        return self.trie
+
+    def refresh(self):
+        # The version is read first, so that pins changed during the build
+        # trigger another refresh:
+        trie_version = get_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
+
+        self.trie = self.build_trie()
+        self.trie_version = trie_version
+        self.trie_built_at = time.monotonic()
+
+    def is_stale(self):
+        trie_age = time.monotonic() - self.trie_built_at
+
+        return (
+            get_cache_version(name=CACHE_VERSION_SEARCH_INDEX) != self.trie_version
+            or trie_age >= settings.SEARCH_SUGGESTIONS_TRIE["MAX_AGE_SECONDS"]
+        )
+
+    def start_background_refreshes(self):
+        refresh_interval = settings.SEARCH_SUGGESTIONS_TRIE["REFRESH_INTERVAL_SECONDS"]
+
+        if refresh_interval is None:
+            return
+
+        threading.Thread(
+            target=self.refresh_periodically,
+            kwargs={"refresh_interval": refresh_interval},
+            name="search-suggestions-trie-refresh",
+            daemon=True,
+        ).start()
+
+    def refresh_periodically(self, refresh_interval=0):
+        while True:
+            time.sleep(refresh_interval)
+
+            try:
+                if self.is_stale():
+                    run_with_database_connection(self.refresh)
+            except Exception:
+                # The previous trie keeps being served, until the next attempt:
+                logger.exception("Failed to refresh the search suggestions trie")
+
+    def build_trie(self):
+        return build_suggestion_trie()
+
+
+def build_suggestion_trie():
+    """
+    Builds a `SuggestionTrie` from the table of word counts.
+    """
+    word_counts = SearchWord.objects.values_list("word", "count").iterator(
+        chunk_size=TRIE_BUILD_CHUNK_SIZE
+    )
+
+    return SuggestionTrie(
+        word_counts=word_counts,
+        completions_per_node=settings.SEARCH_SUGGESTIONS_TRIE["COMPLETIONS_PER_NODE"],
+    )
@@ -0,0 +1,338 @@
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+from django.conf import settings
+
+from .trie import TrieSuggestionBackend, get_prefix_upper_bound
+
+__all__ = [
+    "TypoTolerantIndex",
+    "TypoTolerantTrieSuggestionBackend",
+    "get_deletes",
+    "is_within_distance",
+]
+
+
+def get_deletes(text="", max_distance=0):
+    """
+    Returns the set of the strings obtained by deleting at most
+    `max_distance` characters of `text` (including `text` itself).
+    """
+    deletes = {text}
+    previous_deletes = {text}
+
+    for _ in range(max_distance):
+        previous_deletes = {
+            previous_delete[:position] + previous_delete[position + 1 :]
+            for previous_delete in previous_deletes
+            for position in range(len(previous_delete))
+        }
+        deletes |= previous_deletes
+
+    return deletes
+
+
+def is_within_distance(first_text="", second_text="", max_distance=0):
+    """
+    Returns whether the edit distance between the two strings (insertions,
+    deletions, substitutions and transpositions of adjacent characters) is at
+    most `max_distance`.
+    """
+    if abs(len(first_text) - len(second_text)) > max_distance:
+        return False
+
+    # The common prefix and suffix don't change the distance (and candidates
+    # usually differ by a few characters only):
+    common_start = 0
+    max_common_length = min(len(first_text), len(second_text))
+
+    while (
+        common_start < max_common_length
+        and first_text[common_start] == second_text[common_start]
+    ):
+        common_start += 1
+
+    common_end = 0
+    max_common_length -= common_start
+
+    while (
+        common_end < max_common_length
+        and first_text[-1 - common_end] == second_text[-1 - common_end]
+    ):
+        common_end += 1
+
+    first_text = first_text[common_start : len(first_text) - common_end]
+    second_text = second_text[common_start : len(second_text) - common_end]
+
+    if abs(len(first_text) - len(second_text)) > max_distance:
+        return False
+
+    if not first_text or not second_text:
+        return True
+
+    # The differing parts start and end with different characters, so they're
+    # within a distance of 1 only for a substitution or a transposition:
+    if max_distance == 1:
+        return len(first_text) == len(second_text) == 1 or (
+            len(first_text) == len(second_text) == 2 and first_text == second_text[::-1]
+        )
+
+    # Dynamic programming over the rows of the distance matrix (the last two
+    # rows are kept, for transpositions):
+    previous_previous_row = None
+    previous_row = list(range(len(second_text) + 1))
+
+    for first_index, first_char in enumerate(first_text, start=1):
+        row = [first_index]
+        row_min = first_index
+
+        for second_index, second_char in enumerate(second_text, start=1):
+            distance = previous_row[second_index - 1] + (first_char != second_char)
+            distance = min(distance, previous_row[second_index] + 1, row[-1] + 1)
+
+            if (
+                previous_previous_row is not None
+                and second_index > 1
+                and first_char == second_text[second_index - 2]
+                and first_text[first_index - 2] == second_char
+            ):
+                distance = min(distance, previous_previous_row[second_index - 2] + 1)
+
+            row.append(distance)
+            row_min = min(row_min, distance)
+
+        if row_min > max_distance:
+            return False
+
+        previous_previous_row, previous_row = previous_row, row
+
+    return previous_row[-1] <= max_distance
+
+
+class TypoTolerantIndex:
+    """
+    Symmetric delete index of the prefixes of the words of a `SuggestionTrie`,
+    to complete mistyped prefixes.
+
+    Two strings are within an edit distance `d` of each other only if
+    deleting at most `d` characters of each gives a common string. So each
+    prefix of the words (between `min_length_distance_1` and
+    `max_prefix_length` characters) is indexed under all its deletes, and a
+    lookup generates the deletes of the typed prefix, finds the prefixes
+    sharing one of them, then checks their actual distance. The tolerated
+    distance is 1 from `min_length_distance_1` characters, and 2 from
+    `min_length_distance_2` characters. Longer prefixes are truncated. To
+    bound the memory used, only the prefixes of the `max_words` most frequent
+    words are indexed (`None` indexes all of them): mistyped prefixes are
+    completed with the words starting with them.
+
+    Prefixes are stored as (position of their first word, length), and
+    deletes as hashes (`hash()`, so the index is only valid in the process
+    which built it), sorted, in NumPy arrays.
+    """
+
+    def __init__(
+        self,
+        trie=None,
+        min_length_distance_1=4,
+        min_length_distance_2=7,
+        max_prefix_length=8,
+        max_words=None,
+    ):
+        self.trie = trie
+        self.min_length_distance_1 = min_length_distance_1
+        self.min_length_distance_2 = min_length_distance_2
+        self.max_prefix_length = max_prefix_length
+
+        prefix_starts = array("i")
+        prefix_lengths = array("b")
+        delete_hashes = array("q")
+        delete_prefix_ids = array("i")
+
+        previous_word = ""
+
+        for position, (word, completion_rank) in enumerate(
+            zip(trie.words, trie.completion_ranks.tolist())
+        ):
+            if max_words is not None and completion_rank >= max_words:
+                continue
+
+            for length in range(
+                min_length_distance_1, min(len(word), max_prefix_length) + 1
+            ):
+                prefix = word[:length]
+
+                # Words are sorted, so a prefix already indexed is a prefix of
+                # the previous indexed word:
+                if previous_word[:length] == prefix:
+                    continue
+
+                prefix_id = len(prefix_starts)
+                prefix_starts.append(position)
+                prefix_lengths.append(length)
+
+                for delete in get_deletes(
+                    prefix, max_distance=self.get_max_distance(length=length)
+                ):
+                    delete_hashes.append(hash(delete))
+                    delete_prefix_ids.append(prefix_id)
+
+            previous_word = word
+
+        self.prefix_starts = np.frombuffer(prefix_starts, dtype=np.int32)
+        self.prefix_lengths = np.frombuffer(prefix_lengths, dtype=np.int8)
+
+        # Rank of the most frequent word of each prefix (for early termination
+        # of lookups):
+        self.prefix_best_ranks = np.array(
+            [
+                trie.completion_ranks[start : self.get_prefix_end(prefix_id)].min()
+                for prefix_id, start in enumerate(prefix_starts)
+            ],
+            dtype=np.int32,
+        )
+
+        delete_hashes = np.frombuffer(delete_hashes, dtype=np.int64)
+        order = np.argsort(delete_hashes, kind="stable")
+
+        self.delete_hashes = delete_hashes[order]
+        self.delete_prefix_ids = np.frombuffer(delete_prefix_ids, dtype=np.int32)[order]
+
+    def get_max_distance(self, length=0):
+        return 2 if length >= self.min_length_distance_2 else 1
+
+    def get_prefix(self, prefix_id=0):
+        start = int(self.prefix_starts[prefix_id])
+        return self.trie.words[start][: self.prefix_lengths[prefix_id]]
+
+    def get_prefix_end(self, prefix_id=0):
+        prefix = self.get_prefix(prefix_id=prefix_id)
+
+        return bisect_left(
+            self.trie.words,
+            get_prefix_upper_bound(prefix),
+            int(self.prefix_starts[prefix_id]),
+        )
+
+    def get_suggestions(self, prefix="", limit=0):
+        """
+        Returns at most `limit` words starting with a prefix within the
+        tolerated distance of `prefix` (including `prefix` itself), most
+        frequent first.
+        """
+        prefix = prefix[: self.max_prefix_length]
+
+        if len(prefix) < self.min_length_distance_1 or not len(self.delete_hashes):
+            return []
+
+        max_distance = self.get_max_distance(length=len(prefix))
+
+        hashes = np.fromiter(
+            (hash(delete) for delete in get_deletes(prefix, max_distance=max_distance)),
+            dtype=np.int64,
+        )
+
+        # Ranges of the entries having each hash (searched at once, with the
+        # start of the entries having the next hash):
+        bounds = np.searchsorted(
+            self.delete_hashes, np.concatenate((hashes, hashes + 1))
+        )
+        starts, ends = bounds[: len(hashes)], bounds[len(hashes) :]
+        matching = np.flatnonzero(ends > starts)
+
+        if not len(matching):
+            return []
+
+        candidate_prefix_ids = np.unique(
+            np.concatenate(
+                [
+                    self.delete_prefix_ids[starts[index] : ends[index]]
+                    for index in matching.tolist()
+                ]
+            )
+        )
+
+        # Prefixes whose length differs by more than the distance can't match:
+        candidate_prefix_ids = candidate_prefix_ids[
+            np.abs(self.prefix_lengths[candidate_prefix_ids] - len(prefix))
+            <= max_distance
+        ]
+
+        candidate_prefix_ids = candidate_prefix_ids[
+            np.argsort(self.prefix_best_ranks[candidate_prefix_ids], kind="stable")
+        ]
+
+        candidates = zip(
+            self.prefix_starts[candidate_prefix_ids].tolist(),
+            self.prefix_lengths[candidate_prefix_ids].tolist(),
+            self.prefix_best_ranks[candidate_prefix_ids].tolist(),
+        )
+
+        words = self.trie.words
+        ranked_words = {}
+
+        for start, length, best_rank in candidates:
+            # No word of the remaining candidates can rank better:
+            if (
+                len(ranked_words) >= limit
+                and best_rank > sorted(ranked_words)[limit - 1]
+            ):
+                break
+
+            candidate_prefix = words[start][:length]
+
+            if not is_within_distance(prefix, candidate_prefix, max_distance):
+                continue
+
+            for word in self.trie.get_suggestions(prefix=candidate_prefix, limit=limit):
+                word_position = bisect_left(words, word, start)
+                ranked_words[int(self.trie.completion_ranks[word_position])] = word
+
+        return [ranked_words[rank] for rank in sorted(ranked_words)[:limit]]
+
+    def get_memory_usage(self):
+        """
+        Returns the number of bytes used by the index (on top of the trie).
+        """
+        return (
+            self.prefix_starts.nbytes
+            + self.prefix_lengths.nbytes
+            + self.prefix_best_ranks.nbytes
+            + self.delete_hashes.nbytes
+            + self.delete_prefix_ids.nbytes
+        )
+
+
+class TypoTolerantTrieSuggestionBackend(TrieSuggestionBackend):
+    """
+    `TrieSuggestionBackend` which also completes mistyped prefixes, with a
+    `TypoTolerantIndex` rebuilt along with the trie (see
+    `settings.SEARCH_SUGGESTIONS_TYPO_TOLERANCE`).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.typo_tolerant_index = None
+
+    def get_typo_tolerant_suggestions(self, prefix="", limit=0):
+        # The index is built before the trie is set, so it exists once the
+        # trie does:
+        self.get_trie()
+
+        return self.typo_tolerant_index.get_suggestions(prefix=prefix, limit=limit)
+
+    def build_trie(self):
+        trie = super().build_trie()
+
+        typo_tolerance_settings = settings.SEARCH_SUGGESTIONS_TYPO_TOLERANCE
+
+        self.typo_tolerant_index = TypoTolerantIndex(
+            trie=trie,
+            min_length_distance_1=typo_tolerance_settings["MIN_LENGTH_DISTANCE_1"],
+            min_length_distance_2=typo_tolerance_settings["MIN_LENGTH_DISTANCE_2"],
+            max_prefix_length=typo_tolerance_settings["MAX_PREFIX_LENGTH"],
+            max_words=typo_tolerance_settings["MAX_WORDS"],
+        )
+
+        return trie
@@ -1,4 +1,7 @@
 from .authentication import *
+from .cache_versions import *
 from .exception_handling import *
+from .statement_timeout import *
 from .string_operations import *
+from .pin_manager import *
 from .user_manager import *
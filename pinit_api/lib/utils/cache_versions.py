@@ -0,0 +1,36 @@
+import time
+from django.core.cache import cache
+
+
+# Cached values derived from the database (e.g. feed pages) are keyed by a
+# "version" which is bumped whenever the underlying data changes, rather than
+# being deleted one by one: stale entries just stop being read, and expire.
+def get_cache_version(name=""):
+    version_key = get_cache_version_key(name=name)
+
+    version = cache.get(version_key)
+
+    if version is None:
+        cache.add(version_key, compute_initial_cache_version(), timeout=None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def bump_cache_version(name=""):
+    version_key = get_cache_version_key(name=name)
+
+    try:
+        cache.incr(version_key)
+    except ValueError:  # the version key is missing (never set, or evicted)
+        cache.add(version_key, compute_initial_cache_version(), timeout=None)
+
+
+def get_cache_version_key(name=""):
+    return f"cache_version:{name}"
+
+
+def compute_initial_cache_version():
+    # Starting from the current timestamp (rather than 0) ensures that a version
+    # evicted from the cache doesn't start again from a value already used:
+    return time.time_ns()
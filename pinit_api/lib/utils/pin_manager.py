@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class PinManager(models.Manager):
+    """
+    Manager of pins not loading their `search_vector`: it's only used in
+    database-side search conditions, and is large compared to the other
+    columns. It's loaded on access if needed (or with `.defer(None)`).
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# SQLSTATE of the error raised by PostgreSQL when a statement is cancelled
+# (`query_canceled`), e.g. because of `statement_timeout`:
+PGCODE_QUERY_CANCELED = "57014"
+
+
+@contextmanager
+def statement_timeout(milliseconds=0, using=DEFAULT_DB_ALIAS):
+    """
+    Runs the enclosed queries in a transaction in which PostgreSQL cancels any
+    statement running for longer than `milliseconds` (raising an
+    `OperationalError`, see `is_statement_timeout`). The timeout lasts until
+    the end of the outermost transaction. On other databases, only the
+    transaction is started.
+    """
+    connection = connections[using]
+
+    with transaction.atomic(using=using):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true);",
+                    [f"{int(milliseconds)}ms"],
+                )
+
+        yield
+
+
+def is_statement_timeout(error=None):
+    database_error = error.__cause__
+
+    # `pgcode` with psycopg2, `sqlstate` with psycopg 3:
+    pgcode = getattr(database_error, "pgcode", None) or getattr(
+        database_error, "sqlstate", None
+    )
+
+    return pgcode == PGCODE_QUERY_CANCELED
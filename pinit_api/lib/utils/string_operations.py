@@ -40,3 +40,10 @@ def compute_first_and_last_name(email=""):
     last_name = name_parts[1].capitalize() if len(name_parts) > 1 else ""
 
     return first_name, last_name
+
+
+def normalize_search_term(search_term="", max_length=0):
+    # Lowercase, collapse whitespace, then truncate:
+    normalized_search_term = " ".join(search_term.lower().split())
+
+    return normalized_search_term[:max_length]
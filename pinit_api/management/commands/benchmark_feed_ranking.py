@@ -0,0 +1,66 @@
+import time
+import numpy as np
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from pinit_api.lib.feed_ranking import rank_candidates
+
+DEFAULT_NUMBER_CANDIDATES = 10_000
+DEFAULT_NUMBER_RUNS = 200
+NUMBER_AUTHORS = 500
+CANDIDATES_TIME_SPAN_SECONDS = 30 * 24 * 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the time taken to rank pin suggestion candidates, on synthetic data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=DEFAULT_NUMBER_CANDIDATES)
+        parser.add_argument("--runs", type=int, default=DEFAULT_NUMBER_RUNS)
+
+    def handle(self, *args, **options):
+        number_candidates = options["candidates"]
+        number_runs = options["runs"]
+
+        candidates = self.generate_candidates(number_candidates=number_candidates)
+
+        durations = []
+
+        for _ in range(number_runs):
+            start = time.perf_counter()
+            rank_candidates(
+                **candidates, ranking_settings=settings.PIN_SUGGESTIONS_RANKING
+            )
+            durations.append(time.perf_counter() - start)
+
+        median_duration = float(np.median(durations))
+
+        self.stdout.write(
+            f"Ranked {number_candidates} candidates {number_runs} times: "
+            f"median {median_duration * 1_000:.2f} ms per ranking, "
+            f"{median_duration * 1_000_000_000 / number_candidates:.0f} ns per candidate."
+        )
+
+    def generate_candidates(self, number_candidates=0):
+        random_generator = np.random.default_rng(seed=0)
+
+        now_timestamp = time.time()
+
+        surfaced_at_timestamps = now_timestamp - np.sort(
+            random_generator.uniform(
+                0, CANDIDATES_TIME_SPAN_SECONDS, size=number_candidates
+            )
+        )
+
+        return {
+            "surfaced_at_timestamps": surfaced_at_timestamps,
+            "numbers_saves": random_generator.poisson(2, size=number_candidates).astype(
+                np.float64
+            ),
+            "author_ids": random_generator.integers(
+                0, NUMBER_AUTHORS, size=number_candidates
+            ),
+            "now_timestamp": now_timestamp,
+        }
@@ -0,0 +1,79 @@
+import time
+from itertools import islice
+
+import numpy as np
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.settings import api_settings
+
+from pinit_api.lib.search_backends import InMemorySearchBackend, PostgresSearchBackend
+
+DEFAULT_NUMBER_RUNS = 20
+DEFAULT_NUMBER_SEARCH_TERMS = 10
+MIN_SEARCH_TERM_LENGTH = 4
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the time taken to fetch the first page of search results with "
+        "the Postgres and in-memory (BM25) search backends, on the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "search_terms",
+            nargs="*",
+            help="Search terms to benchmark. Default: the most frequent words.",
+        )
+        parser.add_argument("--runs", type=int, default=DEFAULT_NUMBER_RUNS)
+
+    def handle(self, *args, **options):
+        number_runs = options["runs"]
+
+        in_memory_backend = InMemorySearchBackend()
+
+        start = time.perf_counter()
+        index = in_memory_backend.get_index()
+        build_duration = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Built the in-memory index of {len(index.pin_ids)} pins "
+            f"({len(index.postings)} terms) in {build_duration * 1_000:.0f} ms."
+        )
+
+        search_terms = options["search_terms"] or self.get_frequent_words(index=index)
+
+        for backend in (PostgresSearchBackend(), in_memory_backend):
+            durations = [
+                self.time_first_page(backend=backend, search_term=search_term)
+                for search_term in search_terms
+                for _ in range(number_runs)
+            ]
+
+            self.stdout.write(
+                f"{backend.__class__.__name__}: median "
+                f"{float(np.median(durations)) * 1_000:.2f} ms, 95th percentile "
+                f"{float(np.percentile(durations, 95)) * 1_000:.2f} ms per first page "
+                f"({len(search_terms)} search terms, {number_runs} runs each)."
+            )
+
+    def get_frequent_words(self, index=None):
+        frequent_words = (
+            word
+            for word, _ in index.word_counts.most_common()
+            if len(word) >= MIN_SEARCH_TERM_LENGTH
+        )
+
+        return list(islice(frequent_words, DEFAULT_NUMBER_SEARCH_TERMS))
+
+    def time_first_page(self, backend=None, search_term=""):
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            search_results = backend.search_pins(
+                normalized_search_term=search_term
+            ).order_by("-rank", "-created_at", "-id")
+
+            list(search_results[: api_settings.PAGE_SIZE])
+
+        return time.perf_counter() - start
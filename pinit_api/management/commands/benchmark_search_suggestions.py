@@ -0,0 +1,204 @@
+import os
+import string
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from pinit_api.lib.suggestion_backends import (
+    MemoryMappedSuggestionIndex,
+    SuggestionTrie,
+    TypoTolerantIndex,
+    write_suggestion_index,
+)
+
+DEFAULT_NUMBERS_WORDS = (10_000, 100_000, 1_000_000)
+DEFAULT_NUMBER_LOOKUPS = 10_000
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 12
+MAX_PREFIX_LENGTH = 5
+MIN_MISTYPED_PREFIX_LENGTH = 4
+MAX_MISTYPED_PREFIX_LENGTH = 9
+LETTERS = np.array(list(string.ascii_lowercase))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the memory used by the search suggestions trie (and the size of "
+        "the memory-mapped index file, and the memory used by the typo-tolerant "
+        "index) and the time taken by lookups, for several numbers of distinct "
+        "words (synthetic data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words", type=int, nargs="+", default=list(DEFAULT_NUMBERS_WORDS)
+        )
+        parser.add_argument("--lookups", type=int, default=DEFAULT_NUMBER_LOOKUPS)
+
+    def handle(self, *args, **options):
+        random_generator = np.random.default_rng(seed=0)
+
+        for number_words in options["words"]:
+            word_counts = self.generate_word_counts(
+                number_words=number_words, random_generator=random_generator
+            )
+
+            start = time.perf_counter()
+            trie = SuggestionTrie(
+                word_counts=word_counts,
+                completions_per_node=settings.SEARCH_SUGGESTIONS_TRIE[
+                    "COMPLETIONS_PER_NODE"
+                ],
+            )
+            build_duration = time.perf_counter() - start
+
+            memory_usage = trie.get_memory_usage()
+            limit = trie.completions_per_node
+
+            prefixes = self.generate_prefixes(
+                words=trie.words,
+                number_prefixes=options["lookups"],
+                random_generator=random_generator,
+            )
+
+            self.stdout.write(
+                f"{len(trie.words)} words: trie built in {build_duration:.2f} s, "
+                f"{memory_usage / 1_000_000:.1f} MB "
+                f"({memory_usage / max(len(trie.words), 1):.0f} bytes per word, "
+                f"{len(trie.completions_by_prefix)} precomputed nodes), "
+                f"{self.time_lookups(index=trie, prefixes=prefixes, limit=limit)}."
+            )
+
+            self.benchmark_typo_tolerant_index(
+                trie=trie,
+                number_lookups=options["lookups"],
+                random_generator=random_generator,
+            )
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "search_suggestions.idx")
+
+                write_suggestion_index(path=path, trie=trie)
+                file_size = os.path.getsize(path)
+
+                index = MemoryMappedSuggestionIndex(path=path)
+
+                self.stdout.write(
+                    f"{len(trie.words)} words: memory-mapped index file of "
+                    f"{file_size / 1_000_000:.1f} MB "
+                    f"({file_size / max(len(trie.words), 1):.0f} bytes per word), "
+                    f"{self.time_lookups(index=index, prefixes=prefixes, limit=limit)}."
+                )
+
+    def benchmark_typo_tolerant_index(
+        self, trie=None, number_lookups=0, random_generator=None
+    ):
+        typo_tolerance_settings = settings.SEARCH_SUGGESTIONS_TYPO_TOLERANCE
+
+        start = time.perf_counter()
+        index = TypoTolerantIndex(
+            trie=trie,
+            min_length_distance_1=typo_tolerance_settings["MIN_LENGTH_DISTANCE_1"],
+            min_length_distance_2=typo_tolerance_settings["MIN_LENGTH_DISTANCE_2"],
+            max_prefix_length=typo_tolerance_settings["MAX_PREFIX_LENGTH"],
+            max_words=typo_tolerance_settings["MAX_WORDS"],
+        )
+        build_duration = time.perf_counter() - start
+
+        memory_usage = index.get_memory_usage()
+        number_indexed_words = min(
+            len(trie.words), typo_tolerance_settings["MAX_WORDS"] or len(trie.words)
+        )
+
+        prefixes = self.generate_mistyped_prefixes(
+            words=trie.words,
+            number_prefixes=number_lookups,
+            random_generator=random_generator,
+        )
+
+        lookups = self.time_lookups(
+            index=index, prefixes=prefixes, limit=trie.completions_per_node
+        )
+
+        self.stdout.write(
+            f"{len(trie.words)} words: typo-tolerant index built in "
+            f"{build_duration:.2f} s, {memory_usage / 1_000_000:.1f} MB "
+            f"({memory_usage / max(number_indexed_words, 1):.0f} bytes per indexed "
+            f"word, {len(index.delete_hashes)} deletes), {lookups}."
+        )
+
+    def time_lookups(self, index=None, prefixes=(), limit=0):
+        durations = []
+
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.get_suggestions(prefix=prefix, limit=limit)
+            durations.append(time.perf_counter() - start)
+
+        return (
+            f"lookups: median {float(np.median(durations)) * 1_000_000:.1f} µs, "
+            f"95th percentile {float(np.percentile(durations, 95)) * 1_000_000:.1f} µs"
+        )
+
+    def generate_word_counts(self, number_words=0, random_generator=None):
+        lengths = random_generator.integers(
+            MIN_WORD_LENGTH, MAX_WORD_LENGTH + 1, size=number_words
+        )
+        letters = random_generator.choice(LETTERS, size=(number_words, MAX_WORD_LENGTH))
+
+        words = {
+            "".join(letters[index, :length]) for index, length in enumerate(lengths)
+        }
+
+        # Word frequencies roughly follow Zipf's law:
+        counts = random_generator.zipf(1.5, size=len(words))
+
+        return list(zip(words, counts.tolist()))
+
+    def generate_prefixes(self, words=(), number_prefixes=0, random_generator=None):
+        word_indices = random_generator.integers(0, len(words), size=number_prefixes)
+        prefix_lengths = random_generator.integers(
+            1, MAX_PREFIX_LENGTH + 1, size=number_prefixes
+        )
+
+        return [
+            words[word_index][:prefix_length]
+            for word_index, prefix_length in zip(word_indices, prefix_lengths)
+        ]
+
+    def generate_mistyped_prefixes(
+        self, words=(), number_prefixes=0, random_generator=None
+    ):
+        """
+        Returns prefixes of words with two adjacent characters swapped.
+        """
+        word_indices = random_generator.integers(0, len(words), size=number_prefixes)
+        prefix_lengths = random_generator.integers(
+            MIN_MISTYPED_PREFIX_LENGTH,
+            MAX_MISTYPED_PREFIX_LENGTH + 1,
+            size=number_prefixes,
+        )
+        swap_positions = random_generator.random(size=number_prefixes)
+
+        prefixes = []
+
+        for word_index, prefix_length, swap_position in zip(
+            word_indices, prefix_lengths, swap_positions
+        ):
+            prefix = words[word_index][:prefix_length]
+
+            if len(prefix) >= 2:
+                position = int(swap_position * (len(prefix) - 1))
+                prefix = (
+                    prefix[:position]
+                    + prefix[position + 1]
+                    + prefix[position]
+                    + prefix[position + 2 :]
+                )
+
+            prefixes.append(prefix)
+
+        return prefixes
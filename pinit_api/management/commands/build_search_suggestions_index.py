@@ -0,0 +1,41 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from pinit_api.lib.suggestion_backends import (
+    build_suggestion_trie,
+    write_suggestion_index,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the memory-mapped search suggestions index file from the table "
+        "of word counts, and atomically replaces the previous one (servers "
+        "using `MemoryMappedSuggestionBackend` pick it up without a restart)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=settings.SEARCH_SUGGESTIONS_MEMORY_MAPPED_INDEX["PATH"],
+            help="Path of the index file. Default: from the settings.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+
+        self.write_warning("Building the search suggestions index...")
+        trie = build_suggestion_trie()
+        write_suggestion_index(path=path, trie=trie)
+        self.write_success(
+            f"Wrote {len(trie.words)} words to {path} "
+            f"({os.path.getsize(path) / 1_000_000:.1f} MB)."
+        )
+
+    def write_warning(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def write_success(self, message):
+        self.stdout.write(self.style.SUCCESS(message))
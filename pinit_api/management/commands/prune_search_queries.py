@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from pinit_api.lib.search_queries import prune_search_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the logged search terms which were searched less than "
+        f"{settings.SEARCH_QUERY_LOG['PRUNE_MAX_SEARCHES']} times (after decay)."
+    )
+
+    def handle(self, *args, **options):
+        self.write_warning("Pruning logged search terms...")
+        number_deleted_queries = prune_search_queries()
+        self.write_success(f"Deleted {number_deleted_queries} search terms.")
+
+    def write_warning(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def write_success(self, message):
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from pinit_api.lib.home_feed import rebuild_home_feeds, trim_home_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the materialized home feed of every active account from scratch, "
+        f"keeping the {settings.HOME_FEED_MAX_ITEMS_PER_ACCOUNT} most recently "
+        "surfaced pins per account."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--trim-only",
+            action="store_true",
+            help="Only delete the feed items exceeding the per-account limit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["trim_only"]:
+            self.write_warning("Trimming home feeds...")
+            number_deleted_items = trim_home_feeds()
+            self.write_success(f"Deleted {number_deleted_items} feed items.")
+            return
+
+        self.write_warning("Rebuilding home feeds...")
+        number_created_items = rebuild_home_feeds()
+        self.write_success(f"Created {number_created_items} feed items.")
+
+    def write_warning(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def write_success(self, message):
+        self.stdout.write(self.style.SUCCESS(message))
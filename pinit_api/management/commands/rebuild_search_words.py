@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+
+from pinit_api.lib.search_words import rebuild_search_words
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the tables of word and phrase counts used for search "
+        "suggestions from scratch, from the titles and descriptions of all pins."
+    )
+
+    def handle(self, *args, **options):
+        self.write_warning("Rebuilding search words and phrases...")
+        number_words, number_phrases = rebuild_search_words()
+        self.write_success(
+            f"Counted {number_words} distinct words and {number_phrases} "
+            "distinct phrases."
+        )
+
+    def write_warning(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def write_success(self, message):
+        self.stdout.write(self.style.SUCCESS(message))
@@ -5,6 +5,7 @@ from django.conf import settings
 from pinit_api.tests.testing_utils import AccountFactory, PinFactory, BoardFactory
 from django.core.management import BaseCommand
 from pinit_api.models import User, Account, Pin, Board
+from pinit_api.lib.home_feed import rebuild_home_feeds
 
 NUMBER_ACCOUNTS_TO_CREATE = 100
 NUMBER_PINS_TO_CREATE = 1000
@@ -50,6 +51,10 @@ class Command(BaseCommand):
         self.save_pins_in_boards()
         self.write_success("Saved pins in boards.")
 
+        self.write_warning("Rebuilding home feeds...")
+        number_created_feed_items = rebuild_home_feeds()
+        self.write_success(f"Created {number_created_feed_items} feed items.")
+
     def write_warning(self, message):
         self.stdout.write(self.style.WARNING(message))
 
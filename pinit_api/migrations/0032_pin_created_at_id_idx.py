@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0031_rename_title_board_name_board_slug_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pin",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="pin_created_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.0 on 2026-10-18 11:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BACKFILL_CHUNK_SIZE = 10_000
+
+# Same expression as `SearchVector("title", weight="A") + SearchVector("description", weight="B")`,
+# which the search view used to compute on the fly:
+SQL_SEARCH_VECTOR_EXPRESSION = """
+setweight(to_tsvector(COALESCE({table}title, '')), 'A')
+|| setweight(to_tsvector(COALESCE({table}description, '')), 'B')
+"""
+
+SQL_CREATE_SEARCH_VECTOR_TRIGGER = f"""
+CREATE FUNCTION pinit_api_pin_update_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SQL_SEARCH_VECTOR_EXPRESSION.format(table="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pinit_api_pin_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, description, search_vector ON pinit_api_pin
+FOR EACH ROW EXECUTE FUNCTION pinit_api_pin_update_search_vector();
+"""
+
+SQL_DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS pinit_api_pin_search_vector_trigger ON pinit_api_pin;
+DROP FUNCTION IF EXISTS pinit_api_pin_update_search_vector();
+"""
+
+SQL_BACKFILL_SEARCH_VECTOR_CHUNK = f"""
+UPDATE pinit_api_pin
+SET search_vector = {SQL_SEARCH_VECTOR_EXPRESSION.format(table="")}
+WHERE id >= %s AND id < %s;
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # Rows are updated by ranges of IDs, each range in its own transaction
+    # (the migration is non-atomic), so as to keep locks and WAL bursts short:
+    Pin = apps.get_model("pinit_api", "Pin")
+
+    first_id = Pin.objects.order_by("id").values_list("id", flat=True).first()
+    last_id = Pin.objects.order_by("-id").values_list("id", flat=True).first()
+
+    if first_id is None:
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for chunk_start_id in range(first_id, last_id + 1, BACKFILL_CHUNK_SIZE):
+            cursor.execute(
+                SQL_BACKFILL_SEARCH_VECTOR_CHUNK,
+                [chunk_start_id, chunk_start_id + BACKFILL_CHUNK_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("pinit_api", "0033_feeditem"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pin",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(
+            SQL_CREATE_SEARCH_VECTOR_TRIGGER,
+            SQL_DROP_SEARCH_VECTOR_TRIGGER,
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        # The index is built once the column is filled, without locking writes:
+        AddIndexConcurrently(
+            model_name="pin",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="pin_search_vector_idx"
+            ),
+        ),
+    ]
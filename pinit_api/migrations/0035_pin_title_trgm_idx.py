@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-18 12:10
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("pinit_api", "0034_pin_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="pin",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"], name="pin_title_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-18 12:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("pinit_api", "0035_pin_title_trgm_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="pin",
+            index=models.Index(
+                fields=["author", "-created_at"], name="pin_author_created_at_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="pininboard",
+            index=models.Index(
+                fields=["board", "pin"], name="pin_in_board_board_pin_idx"
+            ),
+        ),
+    ]
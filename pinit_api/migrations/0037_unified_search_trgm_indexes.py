@@ -0,0 +1,66 @@
+# Generated by Django 5.0 on 2026-10-18 12:01
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("pinit_api", "0036_search_filter_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="account",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("username"),
+                    name="gin_trgm_ops",
+                ),
+                name="account_username_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="account",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="account_first_name_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="account",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="account_last_name_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="account",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("business_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="account_business_name_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="board",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="board_name_trgm_idx",
+            ),
+        ),
+    ]
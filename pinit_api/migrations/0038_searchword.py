@@ -0,0 +1,130 @@
+# Generated by Django 5.0 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+# Words are split like the search suggestions used to do on the fly (on
+# spaces, periods, commas, hyphens, colons, slashes and question marks):
+SQL_CREATE_PIN_WORDS_FUNCTION = """
+CREATE FUNCTION pinit_api_pin_words(title text, description text)
+RETURNS SETOF text AS $$
+    SELECT word
+    FROM (
+        SELECT regexp_split_to_table(lower(title), '[\\s.,-:/?]+') AS word
+        UNION ALL
+        SELECT regexp_split_to_table(lower(description), '[\\s.,-:/?]+') AS word
+    ) t
+    WHERE word <> ''
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+# The counts of the words of the previous version of the pin are decremented,
+# and those of the new version incremented (words are upserted in order, so
+# that concurrent transactions lock them in the same order). Words which
+# don't appear anymore are deleted.
+SQL_CREATE_SEARCH_WORDS_TRIGGER = """
+CREATE FUNCTION pinit_api_pin_update_search_words() RETURNS trigger AS $$
+DECLARE
+    old_title text;
+    old_description text;
+    new_title text;
+    new_description text;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_title := OLD.title;
+        old_description := OLD.description;
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        new_title := NEW.title;
+        new_description := NEW.description;
+    END IF;
+
+    INSERT INTO pinit_api_searchword (word, count)
+    SELECT word, SUM(delta)
+    FROM (
+        SELECT word, 1 AS delta
+        FROM pinit_api_pin_words(new_title, new_description) word
+        UNION ALL
+        SELECT word, -1 AS delta
+        FROM pinit_api_pin_words(old_title, old_description) word
+    ) t
+    GROUP BY word
+    HAVING SUM(delta) <> 0
+    ORDER BY word
+    ON CONFLICT (word)
+    DO UPDATE SET count = pinit_api_searchword.count + EXCLUDED.count;
+
+    DELETE FROM pinit_api_searchword
+    WHERE count <= 0
+    AND word IN (SELECT pinit_api_pin_words(old_title, old_description));
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pinit_api_pin_search_words_trigger
+AFTER INSERT OR DELETE OR UPDATE OF title, description ON pinit_api_pin
+FOR EACH ROW EXECUTE FUNCTION pinit_api_pin_update_search_words();
+"""
+
+SQL_DROP_SEARCH_WORDS_TRIGGER = """
+DROP TRIGGER IF EXISTS pinit_api_pin_search_words_trigger ON pinit_api_pin;
+DROP FUNCTION IF EXISTS pinit_api_pin_update_search_words();
+DROP FUNCTION IF EXISTS pinit_api_pin_words(text, text);
+"""
+
+# The migration is atomic: pins can't be written between the creation of the
+# trigger and the end of the backfill, so that no word is counted twice.
+SQL_BACKFILL_SEARCH_WORDS = """
+INSERT INTO pinit_api_searchword (word, count)
+SELECT word, COUNT(*)
+FROM pinit_api_pin, pinit_api_pin_words(title, description) word
+GROUP BY word;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0037_unified_search_trgm_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchWord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("word", models.TextField()),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["word"],
+                        include=("count",),
+                        name="search_word_word_pattern_idx",
+                        opclasses=["text_pattern_ops"],
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchword",
+            constraint=models.UniqueConstraint(
+                fields=("word",), name="search_word_word_unique"
+            ),
+        ),
+        migrations.RunSQL(
+            SQL_CREATE_PIN_WORDS_FUNCTION + SQL_CREATE_SEARCH_WORDS_TRIGGER,
+            SQL_DROP_SEARCH_WORDS_TRIGGER,
+        ),
+        migrations.RunSQL(SQL_BACKFILL_SEARCH_WORDS, migrations.RunSQL.noop),
+    ]
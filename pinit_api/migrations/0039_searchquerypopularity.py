@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0038_searchword"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchQueryPopularity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("query", models.TextField()),
+                ("score", models.FloatField(default=0.0)),
+            ],
+            options={
+                "verbose_name_plural": "Search query popularities",
+                "indexes": [
+                    models.Index(
+                        fields=["query"],
+                        include=("score",),
+                        name="search_query_pattern_idx",
+                        opclasses=["text_pattern_ops"],
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchquerypopularity",
+            constraint=models.UniqueConstraint(
+                fields=("query",), name="search_query_popularity_query_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.0 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+# Sequences of 2 and 3 consecutive words of a title, with words split like in
+# `pinit_api_pin_words()` (see migration 0038):
+SQL_CREATE_PIN_TITLE_PHRASES_FUNCTION = """
+CREATE FUNCTION pinit_api_pin_title_phrases(title text)
+RETURNS TABLE (phrase text, number_words integer) AS $$
+    SELECT array_to_string(words[position:position + size - 1], ' '), size
+    FROM (
+        SELECT array_remove(
+            regexp_split_to_array(lower(title), '[\\s.,-:/?]+'), ''
+        ) AS words
+    ) t
+    CROSS JOIN generate_series(2, 3) size
+    CROSS JOIN generate_series(1, cardinality(words) - size + 1) position
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+# Same as the trigger maintaining word counts (see migration 0038), for the
+# phrases of titles:
+SQL_CREATE_SEARCH_PHRASES_TRIGGER = """
+CREATE FUNCTION pinit_api_pin_update_search_phrases() RETURNS trigger AS $$
+DECLARE
+    old_title text;
+    new_title text;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_title := OLD.title;
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        new_title := NEW.title;
+    END IF;
+
+    INSERT INTO pinit_api_searchphrase (phrase, number_words, count)
+    SELECT phrase, number_words, SUM(delta)
+    FROM (
+        SELECT phrase, number_words, 1 AS delta
+        FROM pinit_api_pin_title_phrases(new_title)
+        UNION ALL
+        SELECT phrase, number_words, -1 AS delta
+        FROM pinit_api_pin_title_phrases(old_title)
+    ) t
+    GROUP BY phrase, number_words
+    HAVING SUM(delta) <> 0
+    ORDER BY phrase
+    ON CONFLICT (phrase)
+    DO UPDATE SET count = pinit_api_searchphrase.count + EXCLUDED.count;
+
+    DELETE FROM pinit_api_searchphrase
+    WHERE count <= 0
+    AND phrase IN (SELECT phrase FROM pinit_api_pin_title_phrases(old_title));
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pinit_api_pin_search_phrases_trigger
+AFTER INSERT OR DELETE OR UPDATE OF title ON pinit_api_pin
+FOR EACH ROW EXECUTE FUNCTION pinit_api_pin_update_search_phrases();
+"""
+
+SQL_DROP_SEARCH_PHRASES_TRIGGER = """
+DROP TRIGGER IF EXISTS pinit_api_pin_search_phrases_trigger ON pinit_api_pin;
+DROP FUNCTION IF EXISTS pinit_api_pin_update_search_phrases();
+DROP FUNCTION IF EXISTS pinit_api_pin_title_phrases(text);
+"""
+
+# As in migration 0038, the migration is atomic so that no phrase is counted
+# twice:
+SQL_BACKFILL_SEARCH_PHRASES = """
+INSERT INTO pinit_api_searchphrase (phrase, number_words, count)
+SELECT phrase, number_words, COUNT(*)
+FROM pinit_api_pin, pinit_api_pin_title_phrases(title)
+GROUP BY phrase, number_words;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0039_searchquerypopularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchPhrase",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("phrase", models.TextField()),
+                ("number_words", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["number_words", "phrase"],
+                        include=("count",),
+                        name="search_phrase_pattern_idx",
+                        opclasses=["int2_ops", "text_pattern_ops"],
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchphrase",
+            constraint=models.UniqueConstraint(
+                fields=("phrase",), name="search_phrase_phrase_unique"
+            ),
+        ),
+        migrations.RunSQL(
+            SQL_CREATE_PIN_TITLE_PHRASES_FUNCTION + SQL_CREATE_SEARCH_PHRASES_TRIGGER,
+            SQL_DROP_SEARCH_PHRASES_TRIGGER,
+        ),
+        migrations.RunSQL(SQL_BACKFILL_SEARCH_PHRASES, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-18 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0040_searchphrase"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="home_feed_active_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["home_feed_active_at"], name="account_feed_active_at_idx"
+            ),
+        ),
+    ]
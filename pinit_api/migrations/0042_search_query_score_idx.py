@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pinit_api", "0041_account_home_feed_active_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="searchquerypopularity",
+            index=models.Index(fields=["-score"], name="search_query_score_idx"),
+        ),
+    ]
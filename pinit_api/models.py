@@ -1,7 +1,10 @@
 import random
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import AbstractBaseUser
-from pinit_api.lib.utils import UserManager
+from django.db.models.functions import Upper
+from pinit_api.lib.utils import PinManager, UserManager
 
 
 class User(AbstractBaseUser):
@@ -42,6 +45,36 @@ class Account(models.Model):
     background_picture_url = models.URLField(blank=True, null=True)
     description = models.TextField(null=True, blank=True)
     owner = models.OneToOneField(User, on_delete=models.CASCADE)
+    # Last time the account's materialized home feed was read or (re)built:
+    # pins are only pushed to the feeds of recently active accounts (see
+    # `pinit_api/lib/home_feed.py`).
+    home_feed_active_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Supports the selection of the feeds to push pins to:
+            models.Index(
+                fields=["home_feed_active_at"], name="account_feed_active_at_idx"
+            ),
+            # Support the case-insensitive "contains" lookups of the unified
+            # search (`UPPER(column) LIKE UPPER('%term%')`):
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="account_username_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="account_first_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="account_last_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("business_name"), name="gin_trgm_ops"),
+                name="account_business_name_trgm_idx",
+            ),
+        ]
 
     @property
     def display_name(self):
@@ -61,6 +94,26 @@ class Pin(models.Model):
     image_url = models.URLField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     author = models.ForeignKey(Account, on_delete=models.CASCADE)
+    # Weighted full-text search vector of the title (A) and description (B),
+    # maintained by a database trigger (see migration 0034):
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PinManager()
+
+    class Meta:
+        indexes = [
+            # Supports the keyset pagination of the pin suggestions feed:
+            models.Index(fields=["-created_at", "-id"], name="pin_created_at_id_idx"),
+            # Supports searches filtered by author:
+            models.Index(
+                fields=["author", "-created_at"], name="pin_author_created_at_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="pin_search_vector_idx"),
+            # Supports the fuzzy (trigram) fallback of the search:
+            GinIndex(
+                fields=["title"], name="pin_title_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.unique_id:
@@ -92,6 +145,13 @@ class Board(models.Model):
 
     class Meta:
         unique_together = (("author", "slug"),)
+        indexes = [
+            # Supports the unified search (see `Account.Meta.indexes`):
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="board_name_trgm_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.unique_id:
@@ -122,6 +182,121 @@ class PinInBoard(models.Model):
     class Meta:
         unique_together = ("pin", "board")
         verbose_name_plural = "Pins in boards"
+        indexes = [
+            # Supports searches filtered by board (the unique constraint
+            # above starts with `pin`):
+            models.Index(fields=["board", "pin"], name="pin_in_board_board_pin_idx"),
+        ]
 
     def __str__(self):
         return f"{self.pin} in {self.board}"
+
+
+class FeedItem(models.Model):
+    # Materialized home feed: one row per pin surfaced to an account,
+    # filled at write time (see `pinit_api/lib/home_feed.py`).
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="feed_items"
+    )
+    pin = models.ForeignKey(Pin, on_delete=models.CASCADE, related_name="feed_items")
+    surfaced_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("account", "pin")
+        indexes = [
+            models.Index(
+                fields=["account", "-surfaced_at", "-pin"],
+                name="feed_item_account_surfaced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.pin} in feed of {self.account}"
+
+
+class SearchWord(models.Model):
+    # Number of occurrences of each word in the titles and descriptions of all
+    # pins (used for search suggestions), maintained by a database trigger on
+    # pins (see migration 0038).
+    word = models.TextField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["word"], name="search_word_word_unique"),
+        ]
+        indexes = [
+            # Supports the prefix (`LIKE 'prefix%'`) lookups of search
+            # suggestions, as an index-only scan:
+            models.Index(
+                fields=["word"],
+                name="search_word_word_pattern_idx",
+                opclasses=["text_pattern_ops"],
+                include=["count"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.word} ({self.count})"
+
+
+class SearchPhrase(models.Model):
+    # Number of occurrences of each sequence of 2 or 3 consecutive words in the
+    # titles of all pins (used to complete multi-word search suggestions),
+    # maintained by a database trigger on pins (see migration 0040).
+    phrase = models.TextField()
+    number_words = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["phrase"], name="search_phrase_phrase_unique"
+            ),
+        ]
+        indexes = [
+            # Supports the prefix lookups of phrases of a given number of words
+            # (see `SearchWord.Meta.indexes`):
+            models.Index(
+                fields=["number_words", "phrase"],
+                name="search_phrase_pattern_idx",
+                opclasses=["int2_ops", "text_pattern_ops"],
+                include=["count"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.phrase} ({self.count})"
+
+
+class SearchQueryPopularity(models.Model):
+    # Time-decayed number of searches of each (normalized) search term, used
+    # for search suggestions. Scores are stored as "forward decayed" values
+    # (see `pinit_api/lib/search_queries.py`), so that ordering by `score`
+    # orders by current popularity.
+    query = models.TextField()
+    score = models.FloatField(default=0.0)
+
+    class Meta:
+        verbose_name_plural = "Search query popularities"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["query"], name="search_query_popularity_query_unique"
+            ),
+        ]
+        indexes = [
+            # Supports the prefix lookups of search suggestions (see
+            # `SearchWord.Meta.indexes`):
+            models.Index(
+                fields=["query"],
+                name="search_query_pattern_idx",
+                opclasses=["text_pattern_ops"],
+                include=["score"],
+            ),
+            # Supports the ordering of the popular searches starting with
+            # short prefixes (see `get_popular_search_queries`):
+            models.Index(fields=["-score"], name="search_query_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.query} ({self.score})"
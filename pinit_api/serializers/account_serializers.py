@@ -14,6 +14,9 @@ class AccountWithBoardsReadSerializer(AccountBaseReadSerializer):
         ordered_boards = Board.objects.filter(author=obj).order_by(
             "-last_pin_added_at", "-created_at"
         )
+        ordered_boards = BoardWithBasicDetailsReadSerializer.setup_eager_loading(
+            ordered_boards
+        )
         return BoardWithBasicDetailsReadSerializer(ordered_boards, many=True).data
 
 
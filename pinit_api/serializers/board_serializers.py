@@ -1,12 +1,13 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from ..models import Board, PinInBoard
-from .common_serializers import AccountBaseReadSerializer
+from ..models import Board, Pin, PinInBoard
+from .common_serializers import AccountBaseReadSerializer, EagerLoadingMixin
 from .pin_serializers import PinWithAuthorDetailsReadSerializer
 
 NUMBER_FIRST_IMAGES = 3
 
 
-class BoardReadBaseSerializer(serializers.ModelSerializer):
+class BoardReadBaseSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Board
         fields = (
@@ -21,13 +22,28 @@ class BoardWithBasicDetailsReadSerializer(BoardReadBaseSerializer):
 
     class Meta(BoardReadBaseSerializer.Meta):
         fields = BoardReadBaseSerializer.Meta.fields + ("first_image_urls",)
+        prefetch_related = (
+            # Sliced prefetches are computed in a single query (with a window function):
+            Prefetch(
+                "pins_in_board",
+                queryset=PinInBoard.objects.select_related("pin").order_by(
+                    "last_saved_at"
+                )[:NUMBER_FIRST_IMAGES],
+                to_attr="oldest_pins_in_board",
+            ),
+        )
 
     def get_first_image_urls(self, obj):
-        oldest_pins_in_board = PinInBoard.objects.filter(board=obj).order_by(
-            "last_saved_at"
-        )[:NUMBER_FIRST_IMAGES]
+        # Boards must be loaded with `setup_eager_loading`:
+        return [pin_in_board.pin.image_url for pin_in_board in obj.oldest_pins_in_board]
+
 
-        return [pin_in_board.pin.image_url for pin_in_board in oldest_pins_in_board]
+class BoardWithAuthorDetailsReadSerializer(BoardWithBasicDetailsReadSerializer):
+    author = AccountBaseReadSerializer(read_only=True)
+
+    class Meta(BoardWithBasicDetailsReadSerializer.Meta):
+        fields = BoardWithBasicDetailsReadSerializer.Meta.fields + ("author",)
+        select_related = ("author",)
 
 
 class BoardWithFullDetailsReadSerializer(BoardReadBaseSerializer):
@@ -39,10 +55,13 @@ class BoardWithFullDetailsReadSerializer(BoardReadBaseSerializer):
             "author",
             "pins",
         )
+        select_related = ("author",)
 
     def get_pins(self, obj):
-        pin_in_boards = PinInBoard.objects.filter(board=obj).order_by("-last_saved_at")
+        pins = Pin.objects.filter(pininboard__board=obj).order_by(
+            "-pininboard__last_saved_at"
+        )
 
-        pins = [pin_in_board.pin for pin_in_board in pin_in_boards]
+        pins = PinWithAuthorDetailsReadSerializer.setup_eager_loading(pins)
 
         return PinWithAuthorDetailsReadSerializer(pins, many=True).data
@@ -4,7 +4,29 @@ from rest_framework import serializers
 from ..models import Account
 
 
-class AccountBaseReadSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """
+    Read serializers declare the relations they touch in their `Meta`
+    (`select_related` and `prefetch_related`), so that the querysets they
+    serialize can load them upfront with `setup_eager_loading`, instead of
+    issuing one query per serialized item.
+    """
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related = getattr(cls.Meta, "select_related", ())
+        prefetch_related = getattr(cls.Meta, "prefetch_related", ())
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+
+class AccountBaseReadSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     display_name = serializers.SerializerMethodField()
 
     class Meta:
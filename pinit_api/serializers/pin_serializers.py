@@ -1,10 +1,10 @@
 from rest_framework import serializers
 
 from ..models import Pin
-from .account_serializers import AccountBaseReadSerializer
+from .common_serializers import AccountBaseReadSerializer, EagerLoadingMixin
 
 
-class PinBaseReadSerializer(serializers.ModelSerializer):
+class PinBaseReadSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Pin
         fields = (
@@ -19,8 +19,18 @@ class PinWithAuthorDetailsReadSerializer(PinBaseReadSerializer):
 
     class Meta(PinBaseReadSerializer.Meta):
         fields = PinBaseReadSerializer.Meta.fields + ("author",)
+        select_related = ("author",)
 
 
 class PinWithFullDetailsReadSerializer(PinWithAuthorDetailsReadSerializer):
     class Meta(PinWithAuthorDetailsReadSerializer.Meta):
         fields = PinWithAuthorDetailsReadSerializer.Meta.fields + ("description",)
+
+
+class PinSearchResultWithSnippetReadSerializer(PinWithAuthorDetailsReadSerializer):
+    # Excerpt of the description, with the matched terms highlighted,
+    # annotated on the pins by the search backend:
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta(PinWithAuthorDetailsReadSerializer.Meta):
+        fields = PinWithAuthorDetailsReadSerializer.Meta.fields + ("snippet",)
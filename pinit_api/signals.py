@@ -0,0 +1,29 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Board, Pin, PinInBoard
+from .lib.utils import bump_cache_version
+from .lib.constants import CACHE_VERSION_PIN_FEED, CACHE_VERSION_SEARCH_INDEX
+
+
+@receiver(post_save, sender=Pin)
+@receiver(post_delete, sender=Pin)
+def invalidate_cached_pin_feed(sender, **kwargs):
+    bump_cache_version(name=CACHE_VERSION_PIN_FEED)
+
+
+# Search results can be filtered by board, so they're also invalidated when
+# pins are saved to (or removed from) boards:
+@receiver(post_save, sender=Pin)
+@receiver(post_delete, sender=Pin)
+@receiver(post_save, sender=PinInBoard)
+@receiver(post_delete, sender=PinInBoard)
+def invalidate_cached_search_results(sender, **kwargs):
+    bump_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
+
+
+# `board.pins.add()` (and `.remove()`, `.clear()`) doesn't send `post_save`:
+@receiver(m2m_changed, sender=Board.pins.through)
+def invalidate_cached_search_results_on_board_pins_change(sender, action="", **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
@@ -3,7 +3,7 @@ from datetime import timedelta
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 
-from ..testing_utils import AccountFactory, BoardFactory, PinFactory
+from ..testing_utils import AccountFactory, BoardFactory, PinFactory, QueryCountMixin
 from pinit_api.lib.constants import ERROR_CODE_UNAUTHORIZED
 from pinit_api.serializers.board_serializers import NUMBER_FIRST_IMAGES
 
@@ -67,7 +67,7 @@ class AccountsTestCase(APITestCase):
         )
 
 
-class GetAccountPublicDetailsTests(AccountsTestCase):
+class GetAccountPublicDetailsTests(AccountsTestCase, QueryCountMixin):
     def test_get_account_details_happy_path(self):
         response = self.get(username=self.account.username)
 
@@ -85,6 +85,20 @@ class GetAccountPublicDetailsTests(AccountsTestCase):
             response_data=response_data, account=self.account
         )
 
+    def test_get_account_details_constant_number_of_queries(self):
+        number_queries_few_boards = self.count_queries(
+            lambda: self.get(username=self.account.username)
+        )
+
+        for board in BoardFactory.create_batch(5, author=self.account):
+            board.pins.add(*PinFactory.create_batch(NUMBER_FIRST_IMAGES + 1))
+
+        number_queries_more_boards = self.count_queries(
+            lambda: self.get(username=self.account.username)
+        )
+
+        self.assertEqual(number_queries_few_boards, number_queries_more_boards)
+
     def test_get_account_details_not_found(self):
         response = self.get(username="non_existing_username")
 
@@ -1,6 +1,7 @@
 from rest_framework import status
 from rest_framework.test import APITestCase
 from ..testing_utils.factories import BoardFactory, PinFactory
+from ..testing_utils.mixins import QueryCountMixin
 from pinit_api.lib.constants import (
     ERROR_CODE_ACCOUNT_NOT_FOUND,
     ERROR_CODE_BOARD_NOT_FOUND,
@@ -9,7 +10,7 @@ from pinit_api.lib.constants import (
 NUMBER_PINS = 5
 
 
-class GetBoardDetailsViewTests(APITestCase):
+class GetBoardDetailsViewTests(APITestCase, QueryCountMixin):
     def setUp(self):
         self.board = BoardFactory()
 
@@ -116,3 +117,16 @@ class GetBoardDetailsViewTests(APITestCase):
         self.assertEqual(
             response_data, {"errors": [{"code": ERROR_CODE_ACCOUNT_NOT_FOUND}]}
         )
+
+    def test_constant_number_of_queries(self):
+        number_queries_all_pins = self.count_queries(
+            lambda: self.get(username=self.author.username, slug=self.board.slug)
+        )
+
+        self.board.pins.remove(*self.pins[1:])
+
+        number_queries_single_pin = self.count_queries(
+            lambda: self.get(username=self.author.username, slug=self.board.slug)
+        )
+
+        self.assertEqual(number_queries_all_pins, number_queries_single_pin)
@@ -1,16 +1,39 @@
+from datetime import timedelta
+from unittest import mock
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
 
-from pinit_api.models import Pin
-from ..testing_utils import UserFactory, PinFactory, JWTAuthenticationMixin
+from pinit_api.models import Account, FeedItem, Pin
+from pinit_api.lib.home_feed import (
+    push_pin_to_home_feeds,
+    rebuild_home_feeds,
+    seed_home_feed,
+)
+from pinit_api.lib.constants import (
+    ERROR_CODE_INVALID_CURSOR,
+    ERROR_CODE_INVALID_SINCE_PARAMETER,
+)
+from ..testing_utils import (
+    UserFactory,
+    AccountFactory,
+    PinFactory,
+    BoardFactory,
+    JWTAuthenticationMixin,
+    QueryCountMixin,
+)
 
 NUMBER_EXISTING_PINS = 150
 PAGINATION_PAGE_SIZE = settings.REST_FRAMEWORK["PAGE_SIZE"]
 
 
-class GetPinSuggestionsTests(APITestCase, JWTAuthenticationMixin):
+class GetPinSuggestionsTests(APITestCase, JWTAuthenticationMixin, QueryCountMixin):
     def setUp(self):
+        cache.clear()
+
         self.pins = PinFactory.create_batch(NUMBER_EXISTING_PINS)
 
         self.user = UserFactory()
@@ -91,3 +114,370 @@ class GetPinSuggestionsTests(APITestCase, JWTAuthenticationMixin):
         self.check_response_item_against_pin_object(
             response_item=first_response_item, pin=most_recent_pin_second_page
         )
+
+    def test_get_pin_suggestions_cursor_first_page(self):
+        response = self.get_with_cursor_pagination()
+
+        self.check_response_cursor_first_page(response=response)
+
+    def get_with_cursor_pagination(self, cursor=None):
+        query_params = {"pagination": "cursor"}
+
+        if cursor:
+            query_params["cursor"] = cursor
+
+        return self.client.get("/api/pin-suggestions/", query_params)
+
+    def check_response_cursor_first_page(self, response=None):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        self.assertNotIn("count", response_data)
+        self.assertIsNotNone(response_data["next"])
+        self.assertEqual(len(response_data["results"]), PAGINATION_PAGE_SIZE)
+
+        self.check_first_item_response_first_page(response_data=response_data)
+
+    def test_get_pin_suggestions_cursor_following_pages(self):
+        first_page_data = self.get_with_cursor_pagination().json()
+
+        second_page_response = self.client.get(first_page_data["next"])
+
+        self.check_response_cursor_second_page(response=second_page_response)
+
+        third_page_data = self.client.get(second_page_response.json()["next"]).json()
+
+        self.check_response_cursor_last_page(response_data=third_page_data)
+
+    def check_response_cursor_second_page(self, response=None):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        self.assertEqual(len(response_data["results"]), PAGINATION_PAGE_SIZE)
+
+        self.check_first_item_response_second_page(response_data=response_data)
+
+    def check_response_cursor_last_page(self, response_data=None):
+        self.assertIsNone(response_data["next"])
+
+        self.assertEqual(
+            len(response_data["results"]),
+            NUMBER_EXISTING_PINS - 2 * PAGINATION_PAGE_SIZE,
+        )
+
+        oldest_pin = Pin.objects.earliest("created_at")
+
+        self.assertEqual(
+            response_data["results"][-1]["unique_id"], oldest_pin.unique_id
+        )
+
+    def test_get_pin_suggestions_invalid_cursor(self):
+        response = self.get_with_cursor_pagination(cursor="invalid")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(
+            response.json(), {"errors": [{"code": ERROR_CODE_INVALID_CURSOR}]}
+        )
+
+    def test_get_pin_suggestions_constant_number_of_queries(self):
+        number_queries_full_page = self.count_queries(lambda: self.get(page=1))
+
+        Pin.objects.exclude(pk=self.pins[0].pk).delete()
+
+        number_queries_single_pin = self.count_queries(lambda: self.get(page=1))
+
+        self.assertEqual(number_queries_full_page, number_queries_single_pin)
+
+    def test_get_pin_suggestions_ranked_by_saves(self):
+        oldest_pin = Pin.objects.earliest("created_at")
+
+        for board in BoardFactory.create_batch(3):
+            board.pins.add(oldest_pin)
+
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(response_data["results"][0]["unique_id"], oldest_pin.unique_id)
+
+    def test_get_pin_suggestions_page_served_from_cache(self):
+        first_response = self.get(page=1)
+
+        # Only the user and account lookups are needed once the page is cached:
+        with self.assertNumQueries(2):
+            second_response = self.get(page=1)
+
+        self.assertEqual(first_response.json(), second_response.json())
+
+    def test_get_pin_suggestions_page_cached_by_scheme_and_host(self):
+        self.get(page=1)
+
+        response_data = self.client.get(
+            "/api/pin-suggestions/", {"page": 1}, secure=True
+        ).json()
+
+        self.assertTrue(response_data["next"].startswith("https://testserver/"))
+
+    def test_get_pin_suggestions_cache_invalidated_on_pin_creation(self):
+        self.get(page=1)
+
+        new_pin = PinFactory()
+
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(response_data["count"], NUMBER_EXISTING_PINS + 1)
+        self.assertEqual(response_data["results"][0]["unique_id"], new_pin.unique_id)
+
+    def test_get_pin_suggestions_cache_invalidated_on_pin_deletion(self):
+        self.get(page=1)
+
+        Pin.objects.latest("created_at").delete()
+
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(response_data["count"], NUMBER_EXISTING_PINS - 1)
+
+
+class GetHomeFeedPinSuggestionsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.pins = PinFactory.create_batch(NUMBER_EXISTING_PINS)
+
+        self.account = AccountFactory(home_feed_active_at=timezone.now())
+
+        rebuild_home_feeds()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.account.owner)
+
+    def get(self, page=1):
+        return self.client.get("/api/pin-suggestions/", {"page": page})
+
+    def get_first_result_unique_id(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.json()["results"][0]["unique_id"]
+
+    def test_home_feed_built_from_most_recent_pins(self):
+        response = self.get()
+
+        response_data = response.json()
+
+        self.assertEqual(response_data["count"], NUMBER_EXISTING_PINS)
+
+        most_recent_pin = Pin.objects.latest("created_at")
+
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], most_recent_pin.unique_id
+        )
+
+    def test_new_pin_pushed_to_home_feed(self):
+        new_pin = PinFactory()
+
+        push_pin_to_home_feeds(pin=new_pin)
+
+        self.assertEqual(self.get_first_result_unique_id(), new_pin.unique_id)
+
+    def test_saved_pin_resurfaced_in_home_feed(self):
+        oldest_pin = Pin.objects.earliest("created_at")
+
+        push_pin_to_home_feeds(pin=oldest_pin, surfaced_at=timezone.now())
+
+        self.assertEqual(self.get_first_result_unique_id(), oldest_pin.unique_id)
+
+        self.assertEqual(self.get().json()["count"], NUMBER_EXISTING_PINS)
+
+    @override_settings(HOME_FEED_MAX_ITEMS_PER_ACCOUNT=100)
+    def test_home_feed_capped(self):
+        push_pin_to_home_feeds(pin=PinFactory())
+
+        self.assertEqual(FeedItem.objects.filter(account=self.account).count(), 100)
+
+    def test_saved_pin_pushed_to_home_feed_in_background(self):
+        board = BoardFactory(author=self.account)
+        oldest_pin = Pin.objects.earliest("created_at")
+
+        # Background pushes run right away, with the test's connection:
+        with mock.patch(
+            "pinit_api.lib.home_feed.executor.submit",
+            side_effect=lambda run_with_database_connection, push: push(),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/save-pin/",
+                    {"pin_id": oldest_pin.unique_id, "board_id": board.unique_id},
+                    format="json",
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.get_first_result_unique_id(), oldest_pin.unique_id)
+
+    def test_new_pin_not_pushed_to_inactive_home_feed(self):
+        inactive_account = AccountFactory(
+            home_feed_active_at=timezone.now()
+            - timedelta(days=settings.HOME_FEED_ACTIVE_DAYS + 1)
+        )
+
+        new_pin = PinFactory()
+
+        push_pin_to_home_feeds(pin=new_pin)
+
+        self.assertTrue(FeedItem.objects.filter(account=self.account, pin=new_pin))
+        self.assertFalse(FeedItem.objects.filter(account=inactive_account))
+
+        # When it's read again, the global feed is served while the feed is
+        # rebuilt in the background (here, right away with the test's
+        # connection):
+        self.client.force_authenticate(inactive_account.owner)
+
+        with mock.patch(
+            "pinit_api.lib.home_feed.executor.submit",
+            side_effect=lambda run_with_database_connection, seed: seed(),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.get_first_result_unique_id(), new_pin.unique_id)
+
+        inactive_account.refresh_from_db()
+
+        self.assertAlmostEqual(
+            inactive_account.home_feed_active_at,
+            timezone.now(),
+            delta=timedelta(seconds=1),
+        )
+        self.assertEqual(
+            FeedItem.objects.filter(account=inactive_account).count(),
+            NUMBER_EXISTING_PINS + 1,
+        )
+
+        self.assertEqual(self.get_first_result_unique_id(), new_pin.unique_id)
+
+    @override_settings(HOME_FEED_SEED_MAX_ITEMS=100)
+    def test_home_feed_seed_capped(self):
+        new_account = AccountFactory()
+
+        seed_home_feed(account=new_account)
+
+        self.assertEqual(FeedItem.objects.filter(account=new_account).count(), 100)
+
+    def test_home_feed_seeded_on_signup(self):
+        self.client.post(
+            "/api/signup/",
+            {
+                "email": "new.user@example.com",
+                "password": "Pa$$w0rd_new_user",
+                "birthdate": "1970-01-01",
+            },
+            format="json",
+        )
+
+        new_account = Account.objects.get(owner__email="new.user@example.com")
+
+        self.assertEqual(
+            FeedItem.objects.filter(account=new_account).count(), NUMBER_EXISTING_PINS
+        )
+
+
+class GetNewPinSuggestionsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.pins = PinFactory.create_batch(NUMBER_EXISTING_PINS)
+
+        self.most_recent_pin = Pin.objects.latest("created_at")
+
+        self.client = APIClient()
+        self.client.force_authenticate(UserFactory())
+
+    def get(self, since=""):
+        return self.client.get("/api/pin-suggestions/", {"since": since})
+
+    def test_get_new_pin_suggestions_none(self):
+        response = self.get(since=self.most_recent_pin.unique_id)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_get_new_pin_suggestions_since_pin(self):
+        new_pins = PinFactory.create_batch(2)
+
+        response = self.get(since=self.most_recent_pin.unique_id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        self.assertFalse(response_data["has_more"])
+        self.assertFalse(response_data["reset"])
+        self.assertEqual(
+            [result["unique_id"] for result in response_data["results"]],
+            [new_pins[1].unique_id, new_pins[0].unique_id],
+        )
+
+    def test_get_new_pin_suggestions_since_timestamp(self):
+        new_pin = PinFactory()
+
+        response = self.get(since=self.most_recent_pin.created_at.isoformat())
+
+        response_data = response.json()
+
+        self.assertEqual(len(response_data["results"]), 1)
+        self.assertEqual(response_data["results"][0]["unique_id"], new_pin.unique_id)
+
+    @override_settings(PIN_SUGGESTIONS_SINCE_MAX_RESULTS=10)
+    def test_get_new_pin_suggestions_capped(self):
+        oldest_pin = Pin.objects.earliest("created_at")
+
+        response_data = self.get(since=oldest_pin.unique_id).json()
+
+        self.assertTrue(response_data["has_more"])
+        self.assertEqual(len(response_data["results"]), 10)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], self.most_recent_pin.unique_id
+        )
+
+    def test_get_new_pin_suggestions_unknown_since_pin(self):
+        response = self.get(since="unknown")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.check_response_reset(response_data=response.json())
+
+    def test_get_new_pin_suggestions_since_pin_trimmed_from_feed(self):
+        trimmed_pin = Pin.objects.earliest("created_at")
+
+        account = AccountFactory()
+        seed_home_feed(account=account)
+
+        self.client.force_authenticate(account.owner)
+
+        FeedItem.objects.filter(pin=trimmed_pin).delete()
+
+        response = self.get(since=trimmed_pin.unique_id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.check_response_reset(response_data=response.json())
+
+    def check_response_reset(self, response_data=None):
+        # The client reloads the most recent pins of the feed:
+        self.assertTrue(response_data["reset"])
+        self.assertTrue(response_data["has_more"])
+        self.assertEqual(
+            len(response_data["results"]), settings.PIN_SUGGESTIONS_SINCE_MAX_RESULTS
+        )
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], self.most_recent_pin.unique_id
+        )
+
+    def test_get_new_pin_suggestions_invalid_since_date(self):
+        response = self.get(since="2024-02-30T12:00:00")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(
+            response.json(), {"errors": [{"code": ERROR_CODE_INVALID_SINCE_PARAMETER}]}
+        )
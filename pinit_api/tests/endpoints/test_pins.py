@@ -1,6 +1,8 @@
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
 
@@ -59,6 +61,13 @@ class GetPinDetailsTests(APITestCase):
             account.profile_picture_url,
         )
 
+    def test_get_pin_details_search_vector_not_loaded(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get(unique_id=self.pin.unique_id)
+
+        for query in context.captured_queries:
+            self.assertNotIn("search_vector", query["sql"])
+
     def test_get_pin_details_not_exists(self):
         non_existing_unique_id = self.get_non_existing_unique_id()
 
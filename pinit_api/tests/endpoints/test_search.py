@@ -1,19 +1,52 @@
+import time
 from rest_framework.test import APITestCase, APIClient
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 from rest_framework import status
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
-from ..testing_utils import PinFactory
+from ..testing_utils import BoardFactory, PinFactory, QueryCountMixin
 from pinit_api.views.search import ERROR_CODE_MISSING_SEARCH_PARAMETER
-from pinit_api.models import Pin
+from pinit_api.lib.constants import (
+    ERROR_CODE_INVALID_CURSOR,
+    ERROR_CODE_INVALID_SEARCH_FILTER,
+)
+from pinit_api.lib.search_queries import get_search_weight, search_query_log
+from pinit_api.models import Pin, PinInBoard, SearchQueryPopularity
 
 NUMBER_PINS_MATCHING_SEARCH_TITLE = 75
 NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION = 75
 
 PAGINATION_PAGE_SIZE = settings.REST_FRAMEWORK["PAGE_SIZE"]
 
+# Logged searches are only flushed explicitly (background flushes would use
+# another database connection, outside of the test's transaction):
+SEARCH_QUERY_LOG_WITHOUT_FLUSHES = {
+    **settings.SEARCH_QUERY_LOG,
+    "FLUSH_INTERVAL_SECONDS": None,
+    "FLUSH_MAX_QUERIES": None,
+}
 
-class SearchTests(APITestCase):
+
+# The in-memory index is normally rebuilt by a background thread (which
+# wouldn't see the data of the test's transaction):
+SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS = {
+    **settings.SEARCH_IN_MEMORY_INDEX,
+    "BACKGROUND_REBUILDS": False,
+}
+
+
+@override_settings(SEARCH_QUERY_LOG=SEARCH_QUERY_LOG_WITHOUT_FLUSHES)
+class SearchTests(APITestCase, QueryCountMixin):
     def setUp(self):
+        cache.clear()
+        search_query_log.pending_weights.clear()
+
         self.client = APIClient()
 
         # We will search for pins containing "sunset":
@@ -82,6 +115,40 @@ class SearchTests(APITestCase):
     def get(self, q="sunset", page=1):
         return self.client.get("/api/search/", {"q": q, "page": page})
 
+    def test_search_pins_logs_search(self):
+        self.get(q="  Sunset ", page=1)
+        self.get(q="sunset", page=1)
+        self.get(q="sunset", page=2)
+        self.get(q="lake", page=1)
+
+        self.assertListEqual(list(search_query_log.pending_weights), ["sunset"])
+
+        # Logging a search doesn't write to the database:
+        with self.assertNumQueries(0):
+            search_query_log.record(normalized_search_term="sunset")
+
+        self.assertEqual(search_query_log.flush(), 1)
+        self.assertFalse(search_query_log.pending_weights)
+
+        search_query_popularity = SearchQueryPopularity.objects.get(query="sunset")
+
+        self.assertAlmostEqual(
+            search_query_popularity.score / get_search_weight(timestamp=time.time()),
+            3,
+            places=3,
+        )
+
+        self.get(q="sunset", page=1)
+        search_query_log.flush()
+
+        search_query_popularity.refresh_from_db()
+
+        self.assertAlmostEqual(
+            search_query_popularity.score / get_search_weight(timestamp=time.time()),
+            4,
+            places=3,
+        )
+
     def check_results_ordering(self, first_result=None, last_result=None):
         pin_first_result = Pin.objects.get(unique_id=first_result["unique_id"])
         pin_last_result = Pin.objects.get(unique_id=last_result["unique_id"])
@@ -140,3 +207,504 @@ class SearchTests(APITestCase):
             response_data["errors"],
             [{"code": ERROR_CODE_MISSING_SEARCH_PARAMETER}],
         )
+
+    def test_search_pins_constant_number_of_queries(self):
+        number_queries_full_page = self.count_queries(lambda: self.get(page=1))
+
+        Pin.objects.exclude(pk=self.first_batch[0].pk).delete()
+
+        number_queries_single_result = self.count_queries(lambda: self.get(page=1))
+
+        self.assertEqual(number_queries_full_page, number_queries_single_result)
+
+    @override_settings(PAGINATION_MAX_COUNT=60)
+    def test_search_pins_capped_count(self):
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(response_data["count"], 60)
+        self.assertTrue(response_data["count_is_capped"])
+        self.assertTrue(response_data["count_is_estimated"])
+        self.assertIsNotNone(response_data["next"])
+        self.assertEqual(len(response_data["results"]), PAGINATION_PAGE_SIZE)
+
+        last_page_data = self.get(page=3).json()
+
+        self.assertIsNone(last_page_data["next"])
+        self.assertEqual(
+            len(last_page_data["results"]),
+            NUMBER_PINS_MATCHING_SEARCH_TITLE
+            + NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION
+            - 2 * PAGINATION_PAGE_SIZE,
+        )
+
+        response_page_out_of_range = self.get(page=4)
+
+        self.assertEqual(
+            response_page_out_of_range.status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_search_pins_exact_count(self):
+        response_data = self.get(page=1).json()
+
+        self.assertFalse(response_data["count_is_estimated"])
+        self.assertFalse(response_data["count_is_capped"])
+
+    def test_search_pins_count_query_is_bounded(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get(page=1)
+
+        count_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "COUNT(*)" in query["sql"]
+        ]
+
+        self.assertEqual(len(count_queries), 1)
+        self.assertIn(f"LIMIT {settings.PAGINATION_MAX_COUNT + 1}", count_queries[0])
+        self.assertNotIn("ts_rank", count_queries[0])
+
+    def test_search_pins_after_pin_update(self):
+        updated_pin = self.second_batch[0]
+        updated_pin.title = "Horse riding"
+        updated_pin.save()
+
+        response_data = self.get(q="horse").json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], updated_pin.unique_id
+        )
+
+    def test_search_pins_ranking_query_reads_narrow_rows(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(page=1)
+
+        self.check_response_first_page(response=response)
+
+        ranking_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "ts_rank" in query["sql"]
+        ]
+
+        self.assertTrue(ranking_queries)
+
+        for ranking_query in ranking_queries:
+            self.assertNotIn('"pinit_api_pin"."description"', ranking_query)
+
+    def test_search_pins_page_served_from_cache(self):
+        first_response = self.get(page=1)
+
+        # Only the pins of the page are fetched once the page is cached:
+        with self.assertNumQueries(1):
+            second_response = self.get(q="  SUNSET ", page=1)
+
+        first_response_data = first_response.json()
+        second_response_data = second_response.json()
+
+        self.assertEqual(
+            first_response_data["results"], second_response_data["results"]
+        )
+        self.assertEqual(first_response_data["count"], second_response_data["count"])
+
+        # Links are built from each request:
+        self.assertEqual(
+            first_response_data["next"], "http://testserver/api/search/?page=2&q=sunset"
+        )
+        self.assertEqual(
+            second_response_data["next"],
+            "http://testserver/api/search/?page=2&q=++SUNSET+",
+        )
+
+    def test_search_pins_cursor_page_served_from_cache_links(self):
+        query_params = {"pagination": "cursor"}
+
+        first_response_data = self.client.get(
+            "/api/search/", {"q": "sunset", **query_params}
+        ).json()
+        second_response_data = self.client.get(
+            "/api/search/", {"q": "Sunset", "snippets": "true", **query_params}
+        ).json()
+
+        first_next_params = parse_qs(urlsplit(first_response_data["next"]).query)
+        second_next_params = parse_qs(urlsplit(second_response_data["next"]).query)
+
+        # Same cached page, with links built from each request:
+        self.assertEqual(first_next_params["cursor"], second_next_params["cursor"])
+        self.assertEqual(first_next_params["q"], ["sunset"])
+        self.assertNotIn("snippets", first_next_params)
+        self.assertEqual(second_next_params["q"], ["Sunset"])
+        self.assertEqual(second_next_params["snippets"], ["true"])
+
+    def test_search_pins_cache_invalidated_on_pin_update(self):
+        self.assertEqual(self.get(q="horse").json()["count"], 0)
+
+        updated_pin = self.first_batch[0]
+        updated_pin.title = "Horse riding"
+        updated_pin.save()
+
+        self.assertEqual(self.get(q="horse").json()["count"], 1)
+
+    def test_search_pins_cache_invalidated_on_pin_deletion(self):
+        self.get(page=1)
+
+        Pin.objects.filter(pk=self.first_batch[0].pk).delete()
+
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(
+            response_data["count"],
+            NUMBER_PINS_MATCHING_SEARCH_TITLE
+            + NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION
+            - 1,
+        )
+
+    def test_search_pins_cursor_pagination(self):
+        response_data = self.client.get(
+            "/api/search/", {"q": "sunset", "pagination": "cursor"}
+        ).json()
+
+        self.assertNotIn("count", response_data)
+
+        results = response_data["results"]
+
+        while response_data["next"]:
+            response_data = self.client.get(response_data["next"]).json()
+            results += response_data["results"]
+
+        self.assertEqual(
+            len(results),
+            NUMBER_PINS_MATCHING_SEARCH_TITLE + NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION,
+        )
+        self.assertEqual(len({result["unique_id"] for result in results}), len(results))
+
+        # Same ordering as with page numbers (title matches rank first):
+        self.assertEqual(
+            [result["unique_id"] for result in results[:PAGINATION_PAGE_SIZE]],
+            [result["unique_id"] for result in self.get(page=1).json()["results"]],
+        )
+        self.assertEqual(
+            results[NUMBER_PINS_MATCHING_SEARCH_TITLE - 1]["title"], "Beautiful sunset"
+        )
+        self.assertEqual(
+            results[NUMBER_PINS_MATCHING_SEARCH_TITLE]["title"], "Some title"
+        )
+
+    def test_search_pins_cursor_pagination_equal_ranks_same_millisecond(self):
+        # The title matches have equal ranks, and are created in the same
+        # millisecond, a few microseconds apart:
+        created_at = datetime(2024, 1, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+
+        for index, pin in enumerate(self.first_batch):
+            Pin.objects.filter(pk=pin.pk).update(
+                created_at=created_at + timedelta(microseconds=index + 1)
+            )
+
+        response_data = self.client.get(
+            "/api/search/", {"q": "beautiful sunset", "pagination": "cursor"}
+        ).json()
+
+        results = response_data["results"]
+
+        while response_data["next"]:
+            response_data = self.client.get(response_data["next"]).json()
+            results += response_data["results"]
+
+        title_match_ids = [
+            result["unique_id"]
+            for result in results
+            if result["title"] == "Beautiful sunset"
+        ]
+
+        self.assertListEqual(
+            title_match_ids, [pin.unique_id for pin in self.first_batch[::-1]]
+        )
+
+    def test_search_pins_invalid_cursor(self):
+        response = self.client.get(
+            "/api/search/", {"q": "sunset", "cursor": "not-a-cursor"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["errors"], [{"code": ERROR_CODE_INVALID_CURSOR}]
+        )
+
+    def test_search_pins_fuzzy_fallback(self):
+        response_data = self.get(q="sunsett").json()
+
+        self.assertEqual(response_data["count"], NUMBER_PINS_MATCHING_SEARCH_TITLE)
+        self.assertEqual(response_data["results"][0]["title"], "Beautiful sunset")
+
+    @override_settings(SEARCH_FUZZY_SIMILARITY_THRESHOLD=0.9)
+    def test_search_pins_fuzzy_fallback_threshold(self):
+        response_data = self.get(q="sunsett").json()
+
+        self.assertEqual(response_data["count"], 0)
+
+    def get_with_filters(self, **filters):
+        return self.client.get("/api/search/", {"q": "sunset", **filters})
+
+    def test_search_pins_filtered_by_author(self):
+        author = self.second_batch[0].author
+
+        response_data = self.get_with_filters(author=author.username).json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], self.second_batch[0].unique_id
+        )
+
+        response_data = self.get_with_filters(author="unknown-author").json()
+
+        self.assertEqual(response_data["count"], 0)
+
+    def test_search_pins_filtered_by_board(self):
+        board = BoardFactory()
+
+        for pin in self.second_batch[:3]:
+            PinInBoard.objects.create(pin=pin, board=board)
+
+        response_data = self.get_with_filters(board=board.unique_id).json()
+
+        self.assertEqual(response_data["count"], 3)
+
+    def test_search_pins_filtered_by_board_cache_invalidated_on_pin_save(self):
+        board = BoardFactory()
+        pin_to_save = self.second_batch[0]
+
+        self.assertEqual(
+            self.get_with_filters(board=board.unique_id).json()["count"], 0
+        )
+
+        self.client.force_authenticate(user=board.author.owner)
+        response = self.client.post(
+            "/api/save-pin/",
+            {"pin_id": pin_to_save.unique_id, "board_id": board.unique_id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response_data = self.get_with_filters(board=board.unique_id).json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], pin_to_save.unique_id
+        )
+
+    def test_search_pins_filtered_by_creation_date(self):
+        old_pin = self.first_batch[0]
+        Pin.objects.filter(pk=old_pin.pk).update(
+            created_at=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+
+        response_data = self.get_with_filters(created_before="2021-01-01").json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(response_data["results"][0]["unique_id"], old_pin.unique_id)
+
+        response_data = self.get_with_filters(
+            created_after="2021-01-01T00:00:00Z"
+        ).json()
+
+        self.assertEqual(
+            response_data["count"],
+            NUMBER_PINS_MATCHING_SEARCH_TITLE
+            + NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION
+            - 1,
+        )
+
+    def test_search_pins_invalid_date_filter(self):
+        response = self.get_with_filters(created_after="2021-13-01")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["errors"], [{"code": ERROR_CODE_INVALID_SEARCH_FILTER}]
+        )
+
+    def test_search_pins_with_snippets(self):
+        with CaptureQueriesContext(connection) as context:
+            response_data = self.get_with_filters(page=2, snippets="true").json()
+
+        self.assertEqual(
+            response_data["results"][-1]["snippet"],
+            "That&#x27;s a beautiful <mark>sunset</mark>.",
+        )
+        self.assertEqual(response_data["results"][0]["snippet"], "")
+
+        # Snippets are only computed in the query fetching the pins of the page:
+        headline_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "ts_headline" in query["sql"]
+        ]
+
+        self.assertEqual(len(headline_queries), 1)
+        self.assertNotIn("ts_rank", headline_queries[0])
+
+    def test_search_pins_without_snippets(self):
+        response_data = self.get(page=1).json()
+
+        self.assertNotIn("snippet", response_data["results"][0])
+
+    @override_settings(
+        SEARCH_BACKEND="pinit_api.lib.search_backends.InMemorySearchBackend",
+        SEARCH_IN_MEMORY_INDEX=SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS,
+    )
+    def test_search_pins_with_snippets_default_expression(self):
+        response_data = self.get_with_filters(page=3, snippets="true").json()
+
+        self.assertEqual(
+            response_data["results"][0]["snippet"], "That&#x27;s a beautiful sunset."
+        )
+
+    def test_search_pins_with_snippets_escapes_description(self):
+        self.check_snippet_escapes_description(
+            expected_snippet=(
+                "<mark>Malicious</mark> &lt;script&gt;alert(&#x27;&amp;&#x27;)"
+                "&lt;/script"
+            )
+        )
+
+    @override_settings(
+        SEARCH_BACKEND="pinit_api.lib.search_backends.InMemorySearchBackend",
+        SEARCH_IN_MEMORY_INDEX=SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS,
+    )
+    def test_search_pins_with_snippets_default_expression_escapes_description(
+        self,
+    ):
+        self.check_snippet_escapes_description(
+            expected_snippet=(
+                "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; "
+                "Malicious &lt;script&gt;alert(&#x27;&amp;&#x27;)&lt;/script&gt;"
+            )
+        )
+
+    def check_snippet_escapes_description(self, expected_snippet=""):
+        malicious_pin = PinFactory.create(
+            title="Malicious pin",
+            description=(
+                '<img src=x onerror="alert(1)"> Malicious '
+                "<script>alert('&')</script>"
+            ),
+        )
+
+        response_data = self.get_with_filters(q="malicious", snippets="true").json()
+
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], malicious_pin.unique_id
+        )
+        self.assertEqual(response_data["results"][0]["snippet"], expected_snippet)
+
+    @override_settings(SEARCH_STATEMENT_TIMEOUT_MS=50)
+    def test_search_pins_degraded_after_timeout(self):
+        def get_slow_search_results(**kwargs):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(1);")
+
+        with mock.patch(
+            "pinit_api.views.search.get_search_results",
+            side_effect=get_slow_search_results,
+        ):
+            response = self.get(page=1)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        self.assertTrue(response_data["degraded"])
+        self.assertIsNone(response_data["next"])
+
+        # The most recent matches are returned:
+        self.assertEqual(len(response_data["results"]), PAGINATION_PAGE_SIZE)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], self.second_batch[-1].unique_id
+        )
+
+        # Degraded results aren't cached:
+        self.assertFalse(self.get(page=1).json()["degraded"])
+
+    @override_settings(SEARCH_STATEMENT_TIMEOUT_MS=50)
+    def test_search_pins_degraded_after_timeout_later_pages_empty(self):
+        def get_slow_search_results(**kwargs):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(1);")
+
+        cursor_response_data = self.client.get(
+            "/api/search/", {"q": "sunset", "pagination": "cursor"}
+        ).json()
+
+        with mock.patch(
+            "pinit_api.views.search.get_search_results",
+            side_effect=get_slow_search_results,
+        ):
+            page_response_data = self.get(page=2).json()
+            cursor_response_data = self.client.get(cursor_response_data["next"]).json()
+
+        for response_data in (page_response_data, cursor_response_data):
+            self.assertTrue(response_data["degraded"])
+            self.assertIsNone(response_data["next"])
+            self.assertListEqual(response_data["results"], [])
+
+
+@override_settings(
+    SEARCH_BACKEND="pinit_api.lib.search_backends.InMemorySearchBackend",
+    SEARCH_IN_MEMORY_INDEX=SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS,
+    SEARCH_QUERY_LOG=SEARCH_QUERY_LOG_WITHOUT_FLUSHES,
+)
+class InMemorySearchBackendSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.client = APIClient()
+
+        self.title_matches = PinFactory.create_batch(
+            NUMBER_PINS_MATCHING_SEARCH_TITLE, title="Beautiful sunset", description=""
+        )
+        self.description_matches = PinFactory.create_batch(
+            NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION,
+            title="Some title",
+            description="That's a beautiful sunset.",
+        )
+
+    def get(self, q="sunset", **params):
+        return self.client.get("/api/search/", {"q": q, **params})
+
+    def test_search_pins_first_page(self):
+        response_data = self.get(page=1).json()
+
+        self.assertEqual(
+            response_data["count"],
+            NUMBER_PINS_MATCHING_SEARCH_TITLE + NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION,
+        )
+        self.assertEqual(len(response_data["results"]), PAGINATION_PAGE_SIZE)
+        self.assertEqual(response_data["results"][0]["title"], "Beautiful sunset")
+
+    def test_search_pins_cursor_pagination(self):
+        response_data = self.get(pagination="cursor").json()
+
+        results = response_data["results"]
+
+        while response_data["next"]:
+            response_data = self.client.get(response_data["next"]).json()
+            results += response_data["results"]
+
+        self.assertEqual(
+            [result["title"] for result in results],
+            ["Beautiful sunset"] * NUMBER_PINS_MATCHING_SEARCH_TITLE
+            + ["Some title"] * NUMBER_PINS_MATCHING_SEARCH_DESCRIPTION,
+        )
+
+    def test_search_pins_after_pin_update(self):
+        self.assertEqual(self.get(q="horse").json()["count"], 0)
+
+        updated_pin = self.description_matches[0]
+        updated_pin.title = "Horse riding"
+        updated_pin.save()
+
+        response_data = self.get(q="horse").json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(
+            response_data["results"][0]["unique_id"], updated_pin.unique_id
+        )
@@ -1,12 +1,33 @@
+import os
+import tempfile
+import time
+from io import StringIO
+
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
 
 from ..testing_utils import PinFactory
+from pinit_api.lib.search_queries import get_search_weight
+from pinit_api.lib.suggestion_backends import get_suggestion_backend
+from pinit_api.models import SearchQueryPopularity
 from pinit_api.views.search import ERROR_CODE_MISSING_SEARCH_PARAMETER
 
+# The in-memory index is normally rebuilt by a background thread (which
+# wouldn't see the data of the test's transaction):
+SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS = {
+    **settings.SEARCH_IN_MEMORY_INDEX,
+    "BACKGROUND_REBUILDS": False,
+}
+
 
 class SearchSuggestionsTests(APITestCase):
     def setUp(self):
+        cache.clear()
+
         self.client = APIClient()
 
         # We will test a search autocomplete on "beach":
@@ -43,8 +64,121 @@ class SearchSuggestionsTests(APITestCase):
             ["beach", "beacha", "beacheresque", "beachiful", "beacho", "beachy"],
         )
 
-    def get(self, search=""):
-        return self.client.get("/api/search-suggestions/", {"search": search})
+    def test_get_search_suggestions_popular_searches_first(self):
+        weight = get_search_weight(timestamp=time.time())
+
+        for query, number_searches in [
+            ("beach view", 5),
+            ("beach", 4),
+            ("beach house", 1),
+        ]:
+            SearchQueryPopularity.objects.create(
+                query=query, score=number_searches * weight
+            )
+
+        self.assertListEqual(
+            self.get(search="Beach").json()["results"],
+            [
+                "beach view",
+                "beach",
+                "beacha",
+                "beacheresque",
+                "beachiful",
+                "beacho",
+                "beachy",
+            ],
+        )
+        self.assertListEqual(
+            self.get(search="beach  v").json()["results"], ["beach view"]
+        )
+
+    def test_get_search_suggestions_phrases(self):
+        PinFactory.create(title="Beautiful beaches", description=None)
+
+        self.assertListEqual(
+            self.get(search="Beautiful bea").json()["results"],
+            ["beautiful beach", "beautiful beaches"],
+        )
+        self.assertListEqual(
+            self.get(search="beautiful ").json()["results"],
+            ["beautiful beach", "beautiful beaches"],
+        )
+        self.assertListEqual(
+            self.get(search="a beachy b").json()["results"], ["a beachy beach"]
+        )
+        self.assertListEqual(
+            self.get(search="my view of a beachy b").json()["results"],
+            ["my view of a beachy beach"],
+        )
+        self.assertListEqual(self.get(search="beautiful sea").json()["results"], [])
+
+    def test_get_search_suggestions_cached(self):
+        self.check_response_happy_path(response=self.get(search="beach"))
+
+        # Popular searches don't invalidate cached suggestions (which expire
+        # shortly), and equivalent search terms share them:
+        SearchQueryPopularity.objects.create(
+            query="beach view", score=5 * get_search_weight(timestamp=time.time())
+        )
+
+        self.check_response_happy_path(response=self.get(search=" Beach"))
+        self.assertListEqual(
+            self.get(search="beach ").json()["results"], ["beach view"]
+        )
+
+        # Changed pins do:
+        PinFactory.create(title="Beachcomber", description=None)
+
+        self.assertListEqual(
+            self.get(search="beach").json()["results"][:3],
+            ["beach view", "beach", "beacha"],
+        )
+
+    def test_get_search_suggestions_cache_headers(self):
+        response = self.get(search="beach")
+
+        self.check_response_happy_path(response=response)
+        self.assertIn("public", response.headers["Cache-Control"])
+        self.assertIn("max-age=30", response.headers["Cache-Control"])
+
+        etag = response.headers["ETag"]
+
+        # The same suggestions have the same ETag, which clients send back to
+        # revalidate them:
+        self.assertEqual(self.get(search="Beach").headers["ETag"], etag)
+
+        response = self.get(search="beach", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertIn("max-age=30", response.headers["Cache-Control"])
+
+        response = self.get(search="beachy", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_get_search_suggestions_edited_pin(self):
+        pin = PinFactory.create(title="Beachiful beachiful", description=None)
+
+        self.assertEqual(self.get(search="beachi").json()["results"], ["beachiful"])
+
+        pin.title = "Beachside"
+        pin.save()
+
+        self.assertEqual(self.get(search="beachi").json()["results"], ["beachiful"])
+        self.assertEqual(self.get(search="beachs").json()["results"], ["beachside"])
+
+    def test_get_search_suggestions_deleted_pin(self):
+        PinFactory.create(title="Beachside", description=None).delete()
+
+        self.assertEqual(self.get(search="beachs").json()["results"], [])
+
+    def get(self, search="", headers=None):
+        return self.client.get(
+            "/api/search-suggestions/", {"search": search}, headers=headers
+        )
 
     def test_get_search_suggestions_missing_search_param(self):
         response = self.get(search="")
@@ -60,3 +194,74 @@ class SearchSuggestionsTests(APITestCase):
             response_data["errors"],
             [{"code": ERROR_CODE_MISSING_SEARCH_PARAMETER}],
         )
+
+
+@override_settings(
+    SEARCH_BACKEND="pinit_api.lib.search_backends.InMemorySearchBackend",
+    SEARCH_IN_MEMORY_INDEX=SEARCH_IN_MEMORY_INDEX_WITHOUT_BACKGROUND_REBUILDS,
+)
+class InMemorySearchBackendSearchSuggestionsTests(SearchSuggestionsTests):
+    pass
+
+
+@override_settings(
+    SEARCH_SUGGESTIONS_BACKEND="pinit_api.lib.suggestion_backends.TrieSuggestionBackend",
+    SEARCH_SUGGESTIONS_TRIE={
+        "COMPLETIONS_PER_NODE": 12,
+        "REFRESH_INTERVAL_SECONDS": None,
+        "MAX_AGE_SECONDS": 300,
+    },
+)
+class TrieSuggestionBackendSearchSuggestionsTests(SearchSuggestionsTests):
+    def get(self, search="", headers=None):
+        # The trie is normally refreshed by a background thread (which wouldn't
+        # see the data of the test's transaction):
+        get_suggestion_backend().refresh()
+
+        return super().get(search=search, headers=headers)
+
+
+@override_settings(
+    SEARCH_SUGGESTIONS_BACKEND=(
+        "pinit_api.lib.suggestion_backends.TypoTolerantTrieSuggestionBackend"
+    ),
+)
+class TypoTolerantTrieSuggestionBackendSearchSuggestionsTests(
+    TrieSuggestionBackendSearchSuggestionsTests
+):
+    def test_get_search_suggestions_mistyped_word(self):
+        response = self.get(search="Baech")
+
+        self.check_response_happy_path(response=response)
+
+    def test_get_search_suggestions_deleted_pin(self):
+        PinFactory.create(title="Beachside", description=None).delete()
+
+        # Nothing starts with "beachs" anymore, so it's completed as if mistyped:
+        response = self.get(search="beachs")
+
+        self.check_response_happy_path(response=response)
+
+
+class MemoryMappedSuggestionBackendSearchSuggestionsTests(SearchSuggestionsTests):
+    def setUp(self):
+        super().setUp()
+
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+
+        self.enterContext(
+            override_settings(
+                SEARCH_SUGGESTIONS_BACKEND=(
+                    "pinit_api.lib.suggestion_backends.MemoryMappedSuggestionBackend"
+                ),
+                SEARCH_SUGGESTIONS_MEMORY_MAPPED_INDEX={
+                    "PATH": os.path.join(directory, "search_suggestions.idx"),
+                    "RELOAD_CHECK_INTERVAL_SECONDS": 0,
+                },
+            )
+        )
+
+    def get(self, search="", headers=None):
+        call_command("build_search_suggestions_index", stdout=StringIO())
+
+        return super().get(search=search, headers=headers)
@@ -0,0 +1,123 @@
+from unittest import mock
+from rest_framework.test import APITransactionTestCase, APIClient
+from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+
+from ..testing_utils import AccountFactory, BoardFactory, PinFactory
+from pinit_api.views.search import ERROR_CODE_MISSING_SEARCH_PARAMETER
+
+NUMBER_MATCHING_PINS = 10
+
+
+# Sub-queries run in other threads, with their own database connections, so
+# test data must be committed to be visible to them:
+class UnifiedSearchTests(APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.client = APIClient()
+
+        self.account = AccountFactory(
+            custom_username="sunsetlover", first_name="Jane", last_name="Doe"
+        )
+        AccountFactory(custom_username="someone", first_name="Sunset", last_name="Fan")
+        AccountFactory(custom_username="nobody", first_name="John", last_name="Smith")
+
+        self.board = BoardFactory(author=self.account, name="Sunsets by the sea")
+        BoardFactory(name="Mountains")
+
+        PinFactory.create_batch(
+            NUMBER_MATCHING_PINS, title="Beautiful sunset", description=""
+        )
+        PinFactory(title="A horse", description="")
+
+    def get(self, q="sunset"):
+        return self.client.get("/api/search/all/", {"q": q})
+
+    def test_search_all_happy_path(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        self.assertEqual(
+            len(response_data["pins"]), settings.UNIFIED_SEARCH_RESULTS_PER_TYPE
+        )
+        self.assertEqual(response_data["pins"][0]["title"], "Beautiful sunset")
+
+        # Matched on the first name or on the username, shortest usernames first:
+        self.assertListEqual(
+            [account["username"] for account in response_data["accounts"]],
+            ["someone", "sunsetlover"],
+        )
+
+        self.assertEqual(len(response_data["boards"]), 1)
+        self.assertEqual(response_data["boards"][0]["unique_id"], self.board.unique_id)
+        self.assertEqual(
+            response_data["boards"][0]["author"]["username"], self.account.username
+        )
+
+    def test_search_all_matches_display_name(self):
+        response_data = self.get(q="jane doe").json()
+
+        self.assertListEqual(
+            [account["username"] for account in response_data["accounts"]],
+            ["sunsetlover"],
+        )
+        self.assertListEqual(response_data["pins"], [])
+        self.assertListEqual(response_data["boards"], [])
+
+    def test_search_all_pins_cached(self):
+        first_response_data = self.get().json()
+
+        with mock.patch(
+            "pinit_api.views.unified_search.get_search_results"
+        ) as get_search_results:
+            second_response_data = self.get().json()
+
+        get_search_results.assert_not_called()
+        self.assertEqual(first_response_data["pins"], second_response_data["pins"])
+
+    @override_settings(SEARCH_STATEMENT_TIMEOUT_MS=50)
+    def test_search_all_pins_degraded_after_timeout(self):
+        def get_slow_search_results(**kwargs):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(1);")
+
+        with mock.patch(
+            "pinit_api.views.unified_search.get_search_results",
+            side_effect=get_slow_search_results,
+        ):
+            response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = response.json()
+
+        # The most recent matches are returned:
+        self.assertEqual(
+            len(response_data["pins"]), settings.UNIFIED_SEARCH_RESULTS_PER_TYPE
+        )
+        self.assertEqual(response_data["pins"][0]["title"], "Beautiful sunset")
+        self.assertEqual(len(response_data["boards"]), 1)
+
+        # Degraded results aren't cached:
+        with mock.patch(
+            "pinit_api.views.unified_search.get_search_results"
+        ) as get_search_results:
+            get_search_results.return_value = []
+            self.get()
+
+        get_search_results.assert_called_once()
+
+    def test_search_all_missing_search_param(self):
+        response = self.get(q="  ")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["errors"], [{"code": ERROR_CODE_MISSING_SEARCH_PARAMETER}]
+        )
@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
@@ -5,3 +7,11 @@ class JWTAuthenticationMixin:
     def authenticate_client(self, user):
         tokens_pair = RefreshToken.for_user(user)
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_pair.access_token}")
+
+
+class QueryCountMixin:
+    def count_queries(self, function):
+        with CaptureQueriesContext(connection) as context:
+            function()
+
+        return len(context.captured_queries)
@@ -0,0 +1,65 @@
+import numpy as np
+from django.test import TestCase
+from pinit_api.lib.feed_ranking import rank_candidates, compute_ranks_within_groups
+
+RANKING_SETTINGS = {
+    "ENABLED": True,
+    "CANDIDATE_WINDOW": 1000,
+    "RECENCY_WEIGHT": 1.0,
+    "RECENCY_HALF_LIFE_HOURS": 48,
+    "SAVES_WEIGHT": 0.25,
+    "AUTHOR_DIVERSITY_DECAY": 0.7,
+}
+NOW_TIMESTAMP = 1_700_000_000.0
+ONE_HOUR = 3600
+
+
+class TestRankCandidates(TestCase):
+    def rank(self, ages_in_hours=None, numbers_saves=None, author_ids=None):
+        return rank_candidates(
+            surfaced_at_timestamps=NOW_TIMESTAMP
+            - np.array(ages_in_hours, dtype=np.float64) * ONE_HOUR,
+            numbers_saves=np.array(numbers_saves, dtype=np.float64),
+            author_ids=np.array(author_ids, dtype=np.int64),
+            now_timestamp=NOW_TIMESTAMP,
+            ranking_settings=RANKING_SETTINGS,
+        ).tolist()
+
+    def test_rank_candidates_by_recency(self):
+        ranking = self.rank(
+            ages_in_hours=[1, 2, 3], numbers_saves=[0, 0, 0], author_ids=[1, 2, 3]
+        )
+        self.assertEqual(ranking, [0, 1, 2])
+
+    def test_rank_candidates_saves_boost(self):
+        ranking = self.rank(
+            ages_in_hours=[1, 2, 3], numbers_saves=[0, 0, 10], author_ids=[1, 2, 3]
+        )
+        self.assertEqual(ranking, [2, 0, 1])
+
+    def test_rank_candidates_author_diversity(self):
+        ranking = self.rank(
+            ages_in_hours=[1, 2, 3], numbers_saves=[0, 0, 0], author_ids=[1, 1, 2]
+        )
+        self.assertEqual(ranking, [0, 2, 1])
+
+    def test_rank_candidates_ties_keep_original_order(self):
+        ranking = self.rank(
+            ages_in_hours=[1, 1, 1], numbers_saves=[0, 0, 0], author_ids=[1, 2, 3]
+        )
+        self.assertEqual(ranking, [0, 1, 2])
+
+
+class TestComputeRanksWithinGroups(TestCase):
+    def test_compute_ranks_within_groups(self):
+        ranks = compute_ranks_within_groups(
+            scores=np.array([0.5, 0.9, 0.7, 0.1]),
+            group_ids=np.array([1, 2, 1, 1]),
+        )
+        self.assertEqual(ranks.tolist(), [1, 0, 0, 2])
+
+    def test_compute_ranks_within_groups_empty(self):
+        ranks = compute_ranks_within_groups(
+            scores=np.array([]), group_ids=np.array([], dtype=np.int64)
+        )
+        self.assertEqual(ranks.tolist(), [])
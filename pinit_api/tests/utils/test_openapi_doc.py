@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import yaml
+from django.test import SimpleTestCase
+
+OPENAPI_DOC_PATH = Path(__file__).resolve().parents[2] / "static" / "openapi_doc.yml"
+
+
+class TestOpenAPIDoc(SimpleTestCase):
+    def test_openapi_doc_is_valid_yaml(self):
+        with open(OPENAPI_DOC_PATH) as openapi_doc_file:
+            openapi_doc = yaml.safe_load(openapi_doc_file)
+
+        self.assertIn("paths", openapi_doc)
+        self.assertIn("/api/search/", openapi_doc["paths"])
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from pinit_api.lib.pagination import KeysetPagination
+from pinit_api.models import Pin
+from ..testing_utils import PinFactory
+
+NUMBER_PINS = 5
+
+
+class SingleItemKeysetPagination(KeysetPagination):
+    page_size = 1
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.pins = PinFactory.create_batch(NUMBER_PINS)
+
+        # All in the same millisecond, a few microseconds apart:
+        created_at = datetime(2024, 1, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+
+        for index, pin in enumerate(self.pins):
+            Pin.objects.filter(pk=pin.pk).update(
+                created_at=created_at + timedelta(microseconds=index + 1)
+            )
+
+    def get_page(self, url="/"):
+        paginator = SingleItemKeysetPagination()
+        request = Request(APIRequestFactory().get(url))
+
+        page = paginator.paginate_queryset(Pin.objects.all(), request)
+
+        return page, paginator.get_next_link()
+
+    def test_paginate_items_in_same_millisecond(self):
+        paginated_pins = []
+        next_link = "/"
+
+        while next_link:
+            page, next_link = self.get_page(url=next_link)
+            paginated_pins += page
+
+        self.assertListEqual(paginated_pins, self.pins[::-1])
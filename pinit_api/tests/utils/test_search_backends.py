@@ -0,0 +1,158 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from pinit_api.lib.search_backends import (
+    BM25Index,
+    InMemorySearchBackend,
+    PostgresSearchBackend,
+    tokenize,
+)
+from ..testing_utils import PinFactory
+
+DOCUMENTS = [
+    (1, "Beautiful sunset", "Over the sea."),
+    (2, "Some title", "That's a beautiful sunset."),
+    (3, "Sunset, sunset, sunset", ""),
+    (4, "A horse", None),
+]
+
+
+class TestTokenize(SimpleTestCase):
+    def test_tokenize(self):
+        self.assertListEqual(
+            tokenize("That's a beautiful SUNSET."),
+            ["that", "s", "a", "beautiful", "sunset"],
+        )
+
+    def test_tokenize_empty_text(self):
+        self.assertListEqual(tokenize(None), [])
+
+
+class TestBM25Index(SimpleTestCase):
+    def setUp(self):
+        self.index = BM25Index(documents=DOCUMENTS)
+
+    def search(self, terms=()):
+        pin_ids, _ = self.index.search(terms=terms, limit=10)
+        return pin_ids.tolist()
+
+    def test_search_ranks_title_matches_first(self):
+        self.assertListEqual(self.search(terms=["sunset"]), [3, 1, 2])
+
+    def test_search_requires_all_terms(self):
+        self.assertListEqual(self.search(terms=["beautiful", "sea"]), [1])
+
+    def test_search_unknown_term(self):
+        self.assertListEqual(self.search(terms=["sunset", "cat"]), [])
+
+    def test_search_limit(self):
+        pin_ids, scores = self.index.search(terms=["sunset"], limit=2)
+
+        self.assertListEqual(pin_ids.tolist(), [3, 1])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_search_empty_index(self):
+        pin_ids, _ = BM25Index(documents=[]).search(terms=["sunset"], limit=10)
+
+        self.assertListEqual(pin_ids.tolist(), [])
+
+    def test_get_suggestions(self):
+        self.assertListEqual(
+            self.index.get_suggestions(prefix="s", limit=3), ["sunset", "s", "sea"]
+        )
+        self.assertListEqual(self.index.get_suggestions(prefix="sunsets", limit=3), [])
+
+
+class TestInMemorySearchBackend(SimpleTestCase):
+    def test_index_rebuilt_in_background(self):
+        backend = InMemorySearchBackend()
+
+        rebuild_started = threading.Event()
+        rebuild_can_finish = threading.Event()
+
+        def build_index():
+            rebuild_started.set()
+            rebuild_can_finish.wait(timeout=5)
+
+            return "second index" if backend.index else "first index"
+
+        with mock.patch.object(
+            backend, "build_index", side_effect=build_index
+        ) as build_index_mock, mock.patch(
+            "pinit_api.lib.search_backends.in_memory.get_cache_version",
+            return_value=1,
+        ) as get_cache_version:
+            # There is no index until the first one is built:
+            self.assertIsNone(backend.get_index())
+            self.assertTrue(rebuild_started.wait(timeout=5))
+            self.assertIsNone(backend.get_index())
+
+            rebuild_can_finish.set()
+            backend.rebuild_thread.join(timeout=5)
+
+            self.assertEqual(backend.get_index(), "first index")
+
+            rebuild_started.clear()
+            rebuild_can_finish.clear()
+            get_cache_version.return_value = 2
+
+            # The previous index is served while the new one is built (by a
+            # single rebuild):
+            self.assertEqual(backend.get_index(), "first index")
+            self.assertTrue(rebuild_started.wait(timeout=5))
+            self.assertEqual(backend.get_index(), "first index")
+
+            rebuild_can_finish.set()
+            backend.rebuild_thread.join(timeout=5)
+
+            self.assertEqual(backend.get_index(), "second index")
+            self.assertFalse(backend.is_stale())
+            self.assertEqual(build_index_mock.call_count, 2)
+
+    def test_search_served_by_postgres_until_index_built(self):
+        backend = InMemorySearchBackend()
+
+        with mock.patch.object(
+            backend, "start_background_rebuild"
+        ) as start_background_rebuild, mock.patch.object(
+            backend.fallback_backend, "search_pins", return_value="postgres results"
+        ), mock.patch.object(
+            backend.fallback_backend, "get_suggestions", return_value=["sunset"]
+        ), mock.patch(
+            "pinit_api.lib.search_backends.in_memory.get_cache_version",
+            return_value=1,
+        ):
+            self.assertEqual(
+                backend.search_pins(normalized_search_term="sunset"),
+                "postgres results",
+            )
+            self.assertEqual(backend.get_suggestions(prefix="sun", limit=1), ["sunset"])
+
+        start_background_rebuild.assert_called()
+
+
+class TestPostgresSearchBackend(TransactionTestCase):
+    def get_word_similarity_threshold(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.word_similarity_threshold;")
+            return cursor.fetchone()[0]
+
+    def test_fuzzy_search_threshold_set_for_transaction_only(self):
+        pin = PinFactory(title="Beautiful sunset", description="")
+        default_threshold = self.get_word_similarity_threshold()
+
+        with transaction.atomic():
+            matched_pins = PostgresSearchBackend().search_pins(
+                normalized_search_term="sunsett"
+            )
+
+            self.assertListEqual(list(matched_pins), [pin])
+            self.assertEqual(
+                self.get_word_similarity_threshold(),
+                str(settings.SEARCH_FUZZY_SIMILARITY_THRESHOLD),
+            )
+
+        self.assertEqual(self.get_word_similarity_threshold(), default_threshold)
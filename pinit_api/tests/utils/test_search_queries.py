@@ -0,0 +1,96 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from pinit_api.lib.search_queries import *
+from pinit_api.lib.search_queries import executor
+from pinit_api.models import SearchQueryPopularity
+
+
+class TestSearchQueryLog(TestCase):
+    def setUp(self):
+        self.search_query_log = SearchQueryLog()
+
+    @override_settings(
+        SEARCH_QUERY_LOG={
+            **settings.SEARCH_QUERY_LOG,
+            "FLUSH_INTERVAL_SECONDS": None,
+            "FLUSH_MAX_QUERIES": 2,
+        }
+    )
+    def test_record_starts_flush_when_enough_queries(self):
+        with mock.patch.object(executor, "submit") as submit:
+            self.search_query_log.record(normalized_search_term="sunset")
+            self.search_query_log.record(normalized_search_term="sunset")
+
+            submit.assert_not_called()
+
+            self.search_query_log.record(normalized_search_term="lake")
+            # A flush is already in progress:
+            self.search_query_log.record(normalized_search_term="sea")
+
+        submit.assert_called_once()
+
+    @override_settings(
+        SEARCH_QUERY_LOG={
+            **settings.SEARCH_QUERY_LOG,
+            "FLUSH_INTERVAL_SECONDS": 0,
+            "FLUSH_MAX_QUERIES": None,
+        }
+    )
+    def test_record_starts_flush_after_interval(self):
+        with mock.patch.object(executor, "submit") as submit:
+            self.search_query_log.record(normalized_search_term="sunset")
+
+        submit.assert_called_once()
+
+    def test_flush_failure_keeps_weights(self):
+        self.search_query_log.record(normalized_search_term="sunset")
+
+        with mock.patch(
+            "pinit_api.lib.search_queries.connection.cursor", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.search_query_log.flush()
+
+        self.assertListEqual(list(self.search_query_log.pending_weights), ["sunset"])
+
+    def test_search_weight_decay(self):
+        half_life_seconds = settings.SEARCH_QUERY_LOG["HALF_LIFE_DAYS"] * 86_400
+        now = time.time()
+
+        self.assertAlmostEqual(
+            get_search_weight(timestamp=now - half_life_seconds)
+            / get_search_weight(timestamp=now),
+            0.5,
+        )
+
+
+class TestPopularSearchQueries(TestCase):
+    def setUp(self):
+        weight = get_search_weight(timestamp=time.time())
+
+        for query, number_searches in [
+            ("beach", 4),
+            ("beach view", 5),
+            ("beach house", 1),
+            ("sunset", 10),
+            ("sea", 0.01),
+        ]:
+            SearchQueryPopularity.objects.create(
+                query=query, score=number_searches * weight
+            )
+
+    def test_get_popular_search_queries(self):
+        self.assertListEqual(
+            get_popular_search_queries(prefix="beach", limit=12),
+            ["beach view", "beach"],
+        )
+        self.assertListEqual(
+            get_popular_search_queries(prefix="", limit=2), ["sunset", "beach view"]
+        )
+
+    def test_prune_search_queries(self):
+        self.assertEqual(prune_search_queries(), 1)
+        self.assertFalse(SearchQueryPopularity.objects.filter(query="sea").exists())
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from pinit_api.lib.search_words import *
+from pinit_api.models import SearchPhrase, SearchWord
+
+from ..testing_utils import PinFactory
+
+
+class TestSearchWords(TestCase):
+    def setUp(self):
+        PinFactory.create(title="A beach, at sunset", description="Beach/sea")
+        PinFactory.create(title="Sunset", description=None)
+
+    def get_word_counts(self):
+        return dict(SearchWord.objects.values_list("word", "count"))
+
+    def get_phrase_counts(self):
+        return dict(SearchPhrase.objects.values_list("phrase", "count"))
+
+    def test_search_words_maintained_on_write(self):
+        self.assertEqual(
+            self.get_word_counts(),
+            {"a": 1, "beach": 2, "at": 1, "sunset": 2, "sea": 1},
+        )
+
+    def test_rebuild_search_words(self):
+        word_counts = self.get_word_counts()
+
+        phrase_counts = self.get_phrase_counts()
+
+        SearchWord.objects.update(count=0)
+        SearchPhrase.objects.all().delete()
+
+        self.assertEqual(rebuild_search_words(), (len(word_counts), len(phrase_counts)))
+        self.assertEqual(self.get_word_counts(), word_counts)
+        self.assertEqual(self.get_phrase_counts(), phrase_counts)
+
+    def test_get_most_frequent_words(self):
+        self.assertEqual(
+            get_most_frequent_words(prefix="s", limit=2), ["sunset", "sea"]
+        )
+
+    def test_search_phrases_maintained_on_write(self):
+        self.assertEqual(
+            self.get_phrase_counts(),
+            {
+                "a beach": 1,
+                "beach at": 1,
+                "at sunset": 1,
+                "a beach at": 1,
+                "beach at sunset": 1,
+            },
+        )
+
+        pin = PinFactory.create(title="Beach at night", description=None)
+
+        self.assertEqual(self.get_phrase_counts()["beach at"], 2)
+
+        pin.title = "Sunset"
+        pin.save()
+
+        self.assertEqual(self.get_phrase_counts()["beach at"], 1)
+        self.assertNotIn("beach at night", self.get_phrase_counts())
+
+    def test_get_most_frequent_phrases(self):
+        PinFactory.create(title="Beach at night", description=None)
+        PinFactory.create(title="Beach at night", description=None)
+
+        self.assertEqual(
+            get_most_frequent_phrases(previous_words=["beach"], prefix="a", limit=12),
+            ["beach at"],
+        )
+        self.assertEqual(
+            get_most_frequent_phrases(
+                previous_words=["beach", "at"], prefix="", limit=12
+            ),
+            ["beach at night", "beach at sunset"],
+        )
+        self.assertEqual(
+            get_most_frequent_phrases(
+                previous_words=["beach", "at"], prefix="s", limit=12
+            ),
+            ["beach at sunset"],
+        )
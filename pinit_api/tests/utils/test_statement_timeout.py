@@ -0,0 +1,28 @@
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.test import TestCase
+from pinit_api.lib.utils.statement_timeout import *
+
+
+class TestStatementTimeout(TestCase):
+    def execute(self, sql=""):
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()[0]
+
+    def test_statement_timeout_cancels_slow_statement(self):
+        with self.assertRaises(OperationalError) as context:
+            with statement_timeout(milliseconds=10):
+                self.execute("SELECT pg_sleep(1);")
+
+        self.assertTrue(is_statement_timeout(error=context.exception))
+
+    def test_statement_timeout_fast_statement(self):
+        with statement_timeout(milliseconds=1000):
+            self.assertEqual(self.execute("SELECT 1;"), 1)
+
+    def test_is_statement_timeout_other_error(self):
+        with self.assertRaises(DatabaseError) as context:
+            with transaction.atomic():
+                self.execute("SELECT 1 / 0;")
+
+        self.assertFalse(is_statement_timeout(error=context.exception))
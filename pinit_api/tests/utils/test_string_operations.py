@@ -53,3 +53,17 @@ class TestComputeFirstAndLastNameFromEmail(TestCase):
         ) = compute_first_and_last_name(email=email)
         self.assertEqual(computed_first_name, "")
         self.assertEqual(computed_last_name, "")
+
+
+class TestNormalizeSearchTerm(TestCase):
+    def test_normalize_search_term(self):
+        normalized_search_term = normalize_search_term(
+            search_term="  Beautiful \t SUNSET\n", max_length=140
+        )
+        self.assertEqual(normalized_search_term, "beautiful sunset")
+
+    def test_normalize_search_term_truncated(self):
+        normalized_search_term = normalize_search_term(
+            search_term="sunset " * 30, max_length=140
+        )
+        self.assertEqual(len(normalized_search_term), 140)
@@ -0,0 +1,268 @@
+import os
+import random
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from pinit_api.lib.suggestion_backends import *
+
+WORD_COUNTS = [
+    ("beach", 3),
+    ("beacha", 2),
+    ("beacheresque", 1),
+    ("beachy", 1),
+    ("bear", 2),
+    ("sunset", 5),
+]
+
+
+def generate_word_counts():
+    random_generator = random.Random(0)
+
+    return {
+        "".join(random_generator.choices("abcé", k=random_generator.randint(1, 6))): (
+            random_generator.randint(1, 5)
+        )
+        for _ in range(500)
+    }
+
+
+class TestSuggestionTrie(SimpleTestCase):
+    def setUp(self):
+        self.trie = SuggestionTrie(word_counts=WORD_COUNTS, completions_per_node=2)
+
+    def test_get_suggestions_precomputed_node(self):
+        self.assertIn("bea", self.trie.completions_by_prefix)
+        self.assertListEqual(
+            self.trie.get_suggestions(prefix="bea", limit=2), ["beach", "beacha"]
+        )
+
+    def test_get_suggestions_small_node(self):
+        self.assertNotIn("beache", self.trie.completions_by_prefix)
+        self.assertListEqual(
+            self.trie.get_suggestions(prefix="beache", limit=2), ["beacheresque"]
+        )
+
+    def test_get_suggestions_ties_alphabetical_order(self):
+        self.assertListEqual(
+            self.trie.get_suggestions(prefix="beachy", limit=2), ["beachy"]
+        )
+        self.assertListEqual(
+            self.trie.get_suggestions(prefix="beach", limit=2), ["beach", "beacha"]
+        )
+        self.assertListEqual(
+            self.trie.get_suggestions(prefix="", limit=2), ["sunset", "beach"]
+        )
+
+    def test_get_suggestions_unknown_prefix(self):
+        self.assertListEqual(self.trie.get_suggestions(prefix="cat", limit=2), [])
+
+    def test_get_suggestions_limit(self):
+        self.assertListEqual(self.trie.get_suggestions(prefix="be", limit=1), ["beach"])
+
+    def test_get_suggestions_same_as_sorting_all_words(self):
+        random_generator = random.Random(0)
+
+        word_counts = {
+            "".join(
+                random_generator.choices("abc", k=random_generator.randint(1, 6))
+            ): (random_generator.randint(1, 5))
+            for _ in range(500)
+        }
+
+        trie = SuggestionTrie(word_counts=word_counts.items(), completions_per_node=12)
+
+        for prefix in ["", "a", "ab", "abc", "ba", "cca", "abcabc"]:
+            expected_suggestions = sorted(
+                (word for word in word_counts if word.startswith(prefix)),
+                key=lambda word: (-word_counts[word], word),
+            )[:12]
+
+            self.assertListEqual(
+                trie.get_suggestions(prefix=prefix, limit=12), expected_suggestions
+            )
+
+    def test_empty_trie(self):
+        trie = SuggestionTrie(word_counts=[], completions_per_node=2)
+
+        self.assertListEqual(trie.get_suggestions(prefix="", limit=2), [])
+        self.assertListEqual(trie.get_suggestions(prefix="a", limit=2), [])
+
+
+class TestMemoryMappedSuggestionIndex(SimpleTestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.path = os.path.join(self.directory, "search_suggestions.idx")
+
+    def write_index(self, word_counts=()):
+        trie = SuggestionTrie(word_counts=word_counts, completions_per_node=12)
+        write_suggestion_index(path=self.path, trie=trie)
+
+        return trie
+
+    def test_get_suggestions_same_as_trie(self):
+        trie = self.write_index(word_counts=generate_word_counts().items())
+
+        index = MemoryMappedSuggestionIndex(path=self.path)
+
+        for word in trie.words:
+            for prefix_length in range(len(word) + 1):
+                prefix = word[:prefix_length]
+
+                self.assertListEqual(
+                    index.get_suggestions(prefix=prefix, limit=12),
+                    trie.get_suggestions(prefix=prefix, limit=12),
+                )
+
+        self.assertListEqual(index.get_suggestions(prefix="z", limit=12), [])
+
+    def test_empty_index(self):
+        self.write_index(word_counts=[])
+
+        index = MemoryMappedSuggestionIndex(path=self.path)
+
+        self.assertListEqual(index.get_suggestions(prefix="", limit=12), [])
+        self.assertListEqual(index.get_suggestions(prefix="a", limit=12), [])
+
+    def test_backend_reloads_replaced_index(self):
+        with override_settings(
+            SEARCH_SUGGESTIONS_MEMORY_MAPPED_INDEX={
+                "PATH": self.path,
+                "RELOAD_CHECK_INTERVAL_SECONDS": 0,
+            }
+        ):
+            backend = MemoryMappedSuggestionBackend()
+
+            with self.assertRaises(ImproperlyConfigured):
+                backend.get_suggestions(prefix="be", limit=12)
+
+            self.write_index(word_counts=[("beach", 1), ("sunset", 2)])
+            self.assertListEqual(
+                backend.get_suggestions(prefix="be", limit=12), ["beach"]
+            )
+
+            self.write_index(word_counts=[("beach", 1), ("bear", 2)])
+            self.assertListEqual(
+                backend.get_suggestions(prefix="be", limit=12), ["bear", "beach"]
+            )
+
+            # The last index keeps being served if the file is deleted:
+            os.remove(self.path)
+            self.assertListEqual(
+                backend.get_suggestions(prefix="be", limit=12), ["bear", "beach"]
+            )
+
+
+class TestTypoTolerantIndex(SimpleTestCase):
+    def setUp(self):
+        self.trie = SuggestionTrie(word_counts=WORD_COUNTS, completions_per_node=12)
+        self.index = TypoTolerantIndex(
+            trie=self.trie, min_length_distance_1=4, min_length_distance_2=7
+        )
+
+    def test_get_deletes(self):
+        self.assertSetEqual(
+            get_deletes("abc", max_distance=1), {"abc", "bc", "ac", "ab"}
+        )
+        self.assertSetEqual(
+            get_deletes("abc", max_distance=2),
+            {"abc", "bc", "ac", "ab", "a", "b", "c"},
+        )
+
+    def test_is_within_distance(self):
+        for first_text, second_text, distance in [
+            ("beach", "beach", 0),
+            ("beach", "beachy", 1),
+            ("beach", "bewch", 1),
+            ("beach", "baech", 1),
+            ("beach", "baecj", 2),
+            ("beach", "bech", 1),
+            ("beach", "ebahc", 2),
+            ("beach", "bxxxh", 3),
+            ("ca", "abc", 3),
+        ]:
+            for max_distance in range(4):
+                self.assertIs(
+                    is_within_distance(first_text, second_text, max_distance),
+                    distance <= max_distance,
+                    (first_text, second_text, max_distance),
+                )
+
+    def test_get_suggestions_mistyped_prefix(self):
+        expected_suggestions = ["beach", "beacha", "beacheresque", "beachy"]
+
+        # Transposition, substitution, deletion, insertion:
+        for prefix in ["baech", "bewch", "bech", "beaach"]:
+            self.assertListEqual(
+                self.index.get_suggestions(prefix=prefix, limit=12),
+                expected_suggestions,
+            )
+
+        self.assertListEqual(
+            self.index.get_suggestions(prefix="beach", limit=2), ["beach", "beacha"]
+        )
+
+    def test_get_suggestions_distance_depends_on_length(self):
+        # Prefixes shorter than `min_length_distance_1` aren't completed:
+        self.assertListEqual(self.index.get_suggestions(prefix="bae", limit=12), [])
+
+        self.assertListEqual(self.index.get_suggestions(prefix="snsrt", limit=12), [])
+        self.assertListEqual(
+            self.index.get_suggestions(prefix="snusetr", limit=12), ["sunset"]
+        )
+
+    def test_get_suggestions_same_as_brute_force(self):
+        word_counts = generate_word_counts()
+
+        trie = SuggestionTrie(word_counts=word_counts.items(), completions_per_node=12)
+        index = TypoTolerantIndex(
+            trie=trie,
+            min_length_distance_1=3,
+            min_length_distance_2=5,
+            max_prefix_length=5,
+        )
+
+        random_generator = random.Random(0)
+
+        for _ in range(200):
+            prefix = "".join(
+                random_generator.choices("abcé", k=random_generator.randint(3, 7))
+            )
+
+            truncated_prefix = prefix[:5]
+            max_distance = 2 if len(truncated_prefix) >= 5 else 1
+
+            expected_suggestions = sorted(
+                (
+                    word
+                    for word in word_counts
+                    if any(
+                        is_within_distance(
+                            truncated_prefix, word[:length], max_distance
+                        )
+                        for length in range(3, min(len(word), 5) + 1)
+                    )
+                ),
+                key=lambda word: (-word_counts[word], word),
+            )[:12]
+
+            self.assertListEqual(
+                index.get_suggestions(prefix=prefix, limit=12),
+                expected_suggestions,
+                prefix,
+            )
+
+    def test_get_suggestions_max_words(self):
+        index = TypoTolerantIndex(trie=self.trie, max_words=1)
+
+        # Only the prefixes of "sunset" are indexed:
+        self.assertListEqual(
+            index.get_suggestions(prefix="snuset", limit=12), ["sunset"]
+        )
+        self.assertListEqual(index.get_suggestions(prefix="baech", limit=12), [])
+
+    def test_empty_index(self):
+        trie = SuggestionTrie(word_counts=[], completions_per_node=2)
+        index = TypoTolerantIndex(trie=trie)
+
+        self.assertListEqual(index.get_suggestions(prefix="beach", limit=12), [])
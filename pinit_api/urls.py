@@ -10,6 +10,7 @@ from .views import (
     pins,
     search_suggestions,
     search,
+    unified_search,
     boards,
 )
 
@@ -52,6 +53,7 @@ urlpatterns = [
         name="get_pin_suggestions",
     ),
     path("search/", search.search_pins, name="search_pins"),
+    path("search/all/", unified_search.search_all, name="search_all"),
     path(
         "search-suggestions/",
         search_suggestions.get_search_suggestions,
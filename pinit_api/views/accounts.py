@@ -7,9 +7,10 @@ from ..serializers.account_serializers import (
     AccountWithPublicDetailsReadSerializer,
     AccountWithPrivateDetailsReadSerializer,
 )
+from .mixins import EagerLoadingMixin
 
 
-class GetAccountPublicDetailsView(generics.RetrieveAPIView):
+class GetAccountPublicDetailsView(EagerLoadingMixin, generics.RetrieveAPIView):
     queryset = Account.objects.all()
     serializer_class = AccountWithPublicDetailsReadSerializer
     lookup_field = "username"
@@ -18,7 +18,10 @@ class GetBoardDetailsView(APIView):
             return self.get_response_account_not_found()
 
         try:
-            board = Board.objects.get(author=account, slug=slug)
+            boards = BoardWithFullDetailsReadSerializer.setup_eager_loading(
+                Board.objects.all()
+            )
+            board = boards.get(author=account, slug=slug)
         except:
             return self.get_response_board_not_found()
 
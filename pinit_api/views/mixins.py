@@ -0,0 +1,11 @@
+class EagerLoadingMixin:
+    """
+    Generic views mixin loading upfront the relations declared by the view's
+    serializer (see `EagerLoadingMixin` in `serializers/common_serializers.py`),
+    so that list endpoints run a constant number of queries whatever the page size.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        return self.get_serializer_class().setup_eager_loading(queryset)
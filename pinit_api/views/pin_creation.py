@@ -9,6 +9,7 @@ from pinit_api.lib.constants import (
     ERROR_CODE_PIN_CREATION_FAILED,
     ERROR_CODE_MISSING_PIN_IMAGE_FILE,
 )
+from pinit_api.lib.home_feed import schedule_push_pin_to_home_feeds
 from pinit_api.serializers.pin_serializers import PinBaseReadSerializer
 
 
@@ -47,6 +48,8 @@ class CreatePinView(generics.CreateAPIView):
         pin.image_url = self.compute_file_url_s3(file_key_s3)
         pin.save()
 
+        schedule_push_pin_to_home_feeds(pin=pin)
+
         pin_serializer = PinBaseReadSerializer(pin)
 
         return Response(pin_serializer.data, status=status.HTTP_201_CREATED)
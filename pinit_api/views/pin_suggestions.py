@@ -1,11 +1,181 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from ..models import Pin
 from ..serializers import PinWithAuthorDetailsReadSerializer
+from ..lib.constants import CACHE_VERSION_PIN_FEED, ERROR_CODE_INVALID_SINCE_PARAMETER
+from ..lib.feed_ranking import get_ranked_pin_ids
+from ..lib.home_feed import get_home_feed_pins
+from ..lib.hydration import get_pins_in_order
+from ..lib.pagination import KeysetPagination, is_cursor_pagination_requested
+from ..lib.utils import get_cache_version
+
+SINCE_QUERY_PARAM = "since"
+
+
+class HomeFeedKeysetPagination(KeysetPagination):
+    ordering = ("-surfaced_at", "-id")
 
 
 class GetPinSuggestionsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
-    queryset = Pin.objects.all().order_by("-created_at")
     serializer_class = PinWithAuthorDetailsReadSerializer
+
+    def list(self, request, *args, **kwargs):
+        if SINCE_QUERY_PARAM in request.query_params:
+            return self.list_new_pins(since=request.query_params[SINCE_QUERY_PARAM])
+
+        # Feed pages only change when pins are created, deleted or saved
+        # (see `pinit_api/signals.py`), so we serve them from the cache
+        # until the feed version moves:
+        cache_key = self.get_page_cache_key()
+
+        cached_page_data = cache.get(cache_key)
+
+        if cached_page_data is not None:
+            return Response(cached_page_data)
+
+        if self.is_ranking_enabled():
+            response = self.list_ranked_pins()
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        cache.set(cache_key, response.data, settings.PIN_SUGGESTIONS_PAGE_CACHE_TIMEOUT)
+
+        return response
+
+    def list_new_pins(self, since=""):
+        """
+        "Delta" mode, for clients polling for new pins: returns only the pins
+        surfaced in the feed after `since` (either the ID of the most recent
+        pin the client has, or a timestamp), most recent first. At most
+        `PIN_SUGGESTIONS_SINCE_MAX_RESULTS` pins are returned: if there are
+        more (`has_more`), clients should reload the first page instead.
+        If the pin isn't in the feed (anymore), the most recent pins of the
+        feed are returned, with `reset`, so that clients replace their pins
+        with them.
+        """
+        feed_pins = self.get_feed_pins()
+
+        try:
+            high_water_mark = self.get_high_water_mark(since=since, feed_pins=feed_pins)
+        except ValueError:  # well formatted but invalid date
+            return Response(
+                {"errors": [{"code": ERROR_CODE_INVALID_SINCE_PARAMETER}]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # The pin may have been trimmed from the (capped) feed, or deleted:
+        is_reset = high_water_mark is None
+
+        max_results = settings.PIN_SUGGESTIONS_SINCE_MAX_RESULTS
+
+        new_pins = feed_pins.order_by("-surfaced_at", "-id")
+
+        if not is_reset:
+            new_pins = new_pins.filter(surfaced_at__gt=high_water_mark)
+
+        new_pins = self.get_serializer_class().setup_eager_loading(new_pins)
+
+        # We fetch one extra pin to know whether some were left out:
+        new_pins = list(new_pins[: max_results + 1])
+
+        if not new_pins and not is_reset:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.get_serializer(new_pins[:max_results], many=True)
+
+        return Response(
+            {
+                "has_more": len(new_pins) > max_results,
+                "reset": is_reset,
+                "results": serializer.data,
+            }
+        )
+
+    def get_high_water_mark(self, since="", feed_pins=None):
+        """
+        Returns the date after which pins are new, or `None` if `since` is the
+        ID of a pin which isn't in the feed. Raises a `ValueError` for invalid
+        dates.
+        """
+        since_date = parse_datetime(since)
+
+        if since_date:
+            if timezone.is_naive(since_date):
+                since_date = timezone.make_aware(since_date)
+            return since_date
+
+        return (
+            feed_pins.filter(unique_id=since)
+            .values_list("surfaced_at", flat=True)
+            .first()
+        )
+
+    def is_ranking_enabled(self):
+        # Cursor pages follow the plain recency order, so as to allow
+        # scrolling past the ranked candidates window:
+        return settings.PIN_SUGGESTIONS_RANKING[
+            "ENABLED"
+        ] and not is_cursor_pagination_requested(request=self.request)
+
+    def list_ranked_pins(self):
+        ranked_pin_ids = get_ranked_pin_ids(feed_pins=self.get_feed_pins())
+
+        # Only the pins of the requested page are fetched and serialized:
+        page_pin_ids = self.paginate_queryset(ranked_pin_ids)
+
+        page_pins = get_pins_in_order(
+            pin_ids=page_pin_ids, serializer_class=self.get_serializer_class()
+        )
+
+        serializer = self.get_serializer(page_pins, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    def get_page_cache_key(self):
+        feed_version = get_cache_version(name=CACHE_VERSION_PIN_FEED)
+
+        account = getattr(self.request.user, "account", None)
+        feed_owner = account.id if account else "global"
+
+        # Cached pages contain absolute links to the next and previous pages,
+        # so the scheme and host of the request are part of the key. URLs are
+        # hashed to keep keys short and free of whitespace:
+        request_url = self.request.build_absolute_uri()
+        request_digest = hashlib.sha256(request_url.encode("utf-8")).hexdigest()
+
+        return f"pin_suggestions:{feed_version}:{feed_owner}:{request_digest}"
+
+    def get_queryset(self):
+        feed_pins = self.get_feed_pins().order_by("-surfaced_at", "-id")
+
+        return self.get_serializer_class().setup_eager_loading(feed_pins)
+
+    def get_feed_pins(self):
+        account = getattr(self.request.user, "account", None)
+
+        home_feed_pins = get_home_feed_pins(account=account)
+
+        if home_feed_pins is not None:
+            return home_feed_pins
+
+        # Users without a materialized feed (or whose feed is being rebuilt)
+        # get the global feed (most recent pins first):
+        return Pin.objects.annotate(surfaced_at=F("created_at"))
+
+    @property
+    def pagination_class(self):
+        if is_cursor_pagination_requested(request=self.request):
+            return HomeFeedKeysetPagination
+
+        return api_settings.DEFAULT_PAGINATION_CLASS
@@ -6,6 +6,8 @@ from rest_framework import status, views
 
 from ..models import Pin, Board, PinInBoard
 from ..serializers import PinWithFullDetailsReadSerializer
+from ..lib.home_feed import schedule_push_pin_to_home_feeds
+from .mixins import EagerLoadingMixin
 from ..lib.constants import (
     ERROR_CODE_PIN_NOT_FOUND,
     ERROR_CODE_BOARD_NOT_FOUND,
@@ -13,7 +15,7 @@ from ..lib.constants import (
 )
 
 
-class GetPinDetailsView(generics.RetrieveAPIView):
+class GetPinDetailsView(EagerLoadingMixin, generics.RetrieveAPIView):
     queryset = Pin.objects.all()
     serializer_class = PinWithFullDetailsReadSerializer
     lookup_field = "unique_id"
@@ -64,6 +66,9 @@ class SavePinView(views.APIView):
 
         was_updated = existing_pin_save is not None
 
+        # Saving a pin brings it back to the top of the home feeds:
+        schedule_push_pin_to_home_feeds(pin=pin, surfaced_at=now)
+
         return was_updated
 
     def update_last_pin_added_at(self, board=None, date=None):
@@ -1,15 +1,59 @@
+import hashlib
+from functools import partial
+from datetime import datetime, time
+from urllib.parse import urlencode
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from rest_framework import status
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
-
-from ..models import Pin
-from ..serializers import PinWithAuthorDetailsReadSerializer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
+from ..serializers import (
+    PinSearchResultWithSnippetReadSerializer,
+    PinWithAuthorDetailsReadSerializer,
+)
+from ..lib.constants import CACHE_VERSION_SEARCH_INDEX, ERROR_CODE_INVALID_SEARCH_FILTER
+from ..lib.hydration import get_pins_in_order
+from ..lib.pagination import (
+    CappedCountPagination,
+    KeysetPagination,
+    is_cursor_pagination_requested,
+)
+from ..lib.search_backends import get_search_backend
+from ..lib.search_queries import search_query_log
+from ..lib.utils import (
+    get_cache_version,
+    is_statement_timeout,
+    normalize_search_term,
+    statement_timeout,
+)
 
 ERROR_CODE_MISSING_SEARCH_PARAMETER = "missing_search_parameter"
 
+SEARCH_TERM_MAX_LENGTH = 140
+
+# Optional filters (query parameter: lookup applied to the matched pins):
+SEARCH_FILTER_LOOKUPS = {
+    "author": "author__username",
+    "board": "boards__unique_id",
+    "created_after": "created_at__gt",
+    "created_before": "created_at__lt",
+}
+SEARCH_DATE_FILTERS = ("created_after", "created_before")
+
+SNIPPETS_QUERY_PARAM = "snippets"
+
+# Values of `get_requested_page()` for the first page of results:
+FIRST_PAGES = ("page:1", "cursor:")
+
+
+class SearchResultsKeysetPagination(KeysetPagination):
+    ordering = ("-rank", "-created_at", "-id")
+
 
 @api_view(["GET"])
 def search_pins(request):
@@ -21,24 +65,281 @@ def search_pins(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    shortened_search_term = search_term[:140]
+    normalized_search_term = normalize_search_term(
+        search_term=search_term, max_length=SEARCH_TERM_MAX_LENGTH
+    )
+
+    search_filters = get_search_filters(request=request)
 
-    search_vector = SearchVector("title", weight="A") + SearchVector(
-        "description", weight="B"
+    if search_filters is None:
+        return Response(
+            {"errors": [{"code": ERROR_CODE_INVALID_SEARCH_FILTER}]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Only the IDs of the pins of the page are cached (along with the
+    # pagination details, but not the links, which are built from each
+    # request), and the pins are fetched again on each request, so that
+    # they're always up to date (e.g. author's display name).
+    # Cached pages become stale as soon as a pin is created, edited or deleted
+    # (see `pinit_api/signals.py`):
+    page = get_requested_page(request=request)
+
+    cache_key = get_search_results_cache_key(
+        normalized_search_term=normalized_search_term,
+        search_filters=search_filters,
+        page=page,
     )
-    search_query = SearchQuery(shortened_search_term)
 
-    all_pins_annotated = Pin.objects.annotate(
-        search=search_vector, rank=SearchRank(search_vector, search_query)
+    page_data = get_guarded_search_data(
+        cache_key=cache_key,
+        get_data=partial(
+            get_search_results_page_data,
+            normalized_search_term=normalized_search_term,
+            search_filters=search_filters,
+            request=request,
+        ),
+        get_degraded_data=partial(
+            get_degraded_search_results_page_data,
+            normalized_search_term=normalized_search_term,
+            search_filters=search_filters,
+            request=request,
+        ),
     )
 
-    matched_pins = all_pins_annotated.filter(search=search_query)
+    # Searches are logged for search suggestions, once per search (on the
+    # first page), if they return results. This only buffers the search:
+    if page in FIRST_PAGES and page_data["results"]:
+        search_query_log.record(normalized_search_term=normalized_search_term)
+
+    return get_search_results_response(
+        page_data=page_data,
+        normalized_search_term=normalized_search_term,
+        with_snippets=request.GET.get(SNIPPETS_QUERY_PARAM) == "true",
+        request=request,
+    )
+
+
+def get_search_filters(request=None):
+    """
+    Returns the filters provided in the query parameters, as a dict of
+    lookups to apply to the matched pins, or `None` if a date is invalid.
+    Dates can be datetimes or plain dates (ISO 8601).
+    """
+    search_filters = {}
+
+    for query_param, lookup in SEARCH_FILTER_LOOKUPS.items():
+        value = request.GET.get(query_param)
+
+        if not value:
+            continue
+
+        if query_param in SEARCH_DATE_FILTERS:
+            value = parse_search_filter_date(value=value)
+
+            if value is None:
+                return None
+
+        search_filters[lookup] = value
+
+    return search_filters
+
+
+def parse_search_filter_date(value=""):
+    try:
+        date = parse_datetime(value)
+
+        if date is None:
+            day = parse_date(value)
+            date = datetime.combine(day, time.min) if day else None
+    except ValueError:  # well formatted but invalid date
+        return None
+
+    if date and timezone.is_naive(date):
+        date = timezone.make_aware(date)
+
+    return date
+
+
+def get_guarded_search_data(cache_key="", get_data=None, get_degraded_data=None):
+    """
+    Returns the result of `get_data()`, cached under `cache_key`. An
+    expensive search (e.g. very common words) mustn't hold the worker and the
+    database connection for long, so if it times out, the result of
+    `get_degraded_data()` is returned instead. Degraded results aren't
+    cached, so that the search is retried.
+    """
+    data = cache.get(cache_key)
+
+    if data is not None:
+        return data
+
+    try:
+        with statement_timeout(milliseconds=settings.SEARCH_STATEMENT_TIMEOUT_MS):
+            data = get_data()
+    except OperationalError as error:
+        if not is_statement_timeout(error=error):
+            raise
+
+        return get_degraded_data()
+
+    cache.set(cache_key, data, settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+    return data
 
-    search_results = matched_pins.order_by("-rank", "-created_at")
 
-    paginator = PageNumberPagination()
+def get_search_results_page_data(
+    normalized_search_term="", search_filters=None, request=None
+):
+    """
+    First phase of the search: ranks the matches and paginates them, only
+    reading the columns needed for the ordering. Returns the pagination
+    details (without links, see `get_search_results_response`), with the IDs
+    of the pins of the page as `results`.
+    """
+    paginator = get_search_results_pagination_class(request=request)()
+
+    search_results = get_search_results(
+        normalized_search_term=normalized_search_term, search_filters=search_filters
+    )
+
     paginated_results = paginator.paginate_queryset(search_results, request)
 
-    serializer = PinWithAuthorDetailsReadSerializer(paginated_results, many=True)
+    page_pin_ids = [pin.id for pin in paginated_results]
+
+    return {**paginator.get_page_state(), "results": page_pin_ids, "degraded": False}
+
+
+def get_degraded_search_results_page_data(
+    normalized_search_term="", search_filters=None, request=None
+):
+    """
+    Degraded mode of the search, after the ranking query timed out: returns
+    the IDs of the most recent matches (not ranked), on a single page (later
+    pages, requested before the search timed out, are empty).
+    """
+    if get_requested_page(request=request) in FIRST_PAGES:
+        page_pin_ids = get_recent_matched_pin_ids(
+            normalized_search_term=normalized_search_term,
+            search_filters=search_filters,
+            limit=settings.SEARCH_DEGRADED_MAX_RESULTS,
+        )
+    else:
+        page_pin_ids = []
+
+    if is_cursor_pagination_requested(request=request):
+        return {"next_cursor": None, "results": page_pin_ids, "degraded": True}
+
+    # The total number of matches is unknown:
+    return {
+        "count": len(page_pin_ids),
+        "count_is_estimated": True,
+        "count_is_capped": False,
+        "page_number": 1,
+        "has_next": False,
+        "results": page_pin_ids,
+        "degraded": True,
+    }
+
+
+def get_recent_matched_pin_ids(normalized_search_term="", search_filters=None, limit=0):
+    """
+    Returns the IDs of the `limit` most recent matches (not ranked), or none
+    if that query times out too.
+    """
+    recent_matched_pins = (
+        get_search_backend()
+        .search_recent_pins(normalized_search_term=normalized_search_term)
+        .filter(**search_filters)
+        .order_by("-created_at", "-id")
+    )
+
+    try:
+        with statement_timeout(milliseconds=settings.SEARCH_STATEMENT_TIMEOUT_MS):
+            return list(recent_matched_pins.values_list("id", flat=True)[:limit])
+    except OperationalError as error:
+        if not is_statement_timeout(error=error):
+            raise
+
+        return []
+
+
+def get_search_results(normalized_search_term="", search_filters=None):
+    matched_pins = get_search_backend().search_pins(
+        normalized_search_term=normalized_search_term
+    )
+
+    # Filters are part of the ranking query, so that the database only ranks
+    # the matching pins which pass them:
+    matched_pins = matched_pins.filter(**search_filters)
+
+    # Wide columns (e.g. descriptions) aren't carried through the sort:
+    return matched_pins.only("id", "created_at").order_by("-rank", "-created_at", "-id")
+
+
+def get_search_results_pagination_class(request=None):
+    # With cursor pagination, each page is read right after the
+    # `(rank, created_at, id)` position of the previous page's last result,
+    # without skipping over the previous pages nor counting all matches:
+    if is_cursor_pagination_requested(request=request):
+        return SearchResultsKeysetPagination
+
+    # Counting all the matches of broad search terms would take longer than
+    # finding the page, so counts are capped:
+    return CappedCountPagination
+
+
+def get_requested_page(request=None):
+    if is_cursor_pagination_requested(request=request):
+        cursor_query_param = SearchResultsKeysetPagination.cursor_query_param
+        return f"cursor:{request.GET.get(cursor_query_param, '')}"
+
+    return f"page:{request.GET.get('page', '1')}"
+
+
+def get_search_results_cache_key(
+    normalized_search_term="", search_filters=None, page=""
+):
+    search_index_version = get_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
+
+    search = f"{normalized_search_term}?{urlencode(search_filters)}"
+
+    # Searches are hashed to keep keys short and free of whitespace:
+    search_digest = hashlib.sha256(search.encode("utf-8")).hexdigest()
+
+    return f"search:{search_index_version}:{search_digest}:{page}"
+
+
+def get_search_results_response(
+    page_data=None, normalized_search_term="", with_snippets=False, request=None
+):
+    # Second phase of the search: only the pins of the page are fetched
+    # (in a single query), and put back in the order of the results.
+    # Snippets are computed in that same query, i.e. for these pins only:
+    if with_snippets:
+        serializer_class = PinSearchResultWithSnippetReadSerializer
+        annotations = {
+            "snippet": get_search_backend().get_snippet_expression(
+                normalized_search_term=normalized_search_term
+            )
+        }
+    else:
+        serializer_class = PinWithAuthorDetailsReadSerializer
+        annotations = None
+
+    page_pins = get_pins_in_order(
+        pin_ids=page_data["results"],
+        serializer_class=serializer_class,
+        annotations=annotations,
+    )
+
+    serializer = serializer_class(page_pins, many=True)
+
+    # Links to the other pages are built from the request, since cached pages
+    # are shared by requests with other query parameters (e.g. spellings of
+    # the search term) or hosts:
+    paginated_data = get_search_results_pagination_class(
+        request=request
+    ).get_paginated_data(page_state=page_data, request=request, data=serializer.data)
 
-    return paginator.get_paginated_response(serializer.data)
+    return Response({**paginated_data, "degraded": page_data["degraded"]})
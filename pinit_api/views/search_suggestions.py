@@ -1,39 +1,24 @@
-from django.db import connection
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
+from ..lib.constants import CACHE_VERSION_SEARCH_INDEX
+from ..lib.search_queries import get_popular_search_queries
+from ..lib.search_words import MAX_PHRASE_WORDS, get_most_frequent_phrases
+from ..lib.suggestion_backends import get_suggestion_backend
+from ..lib.utils import get_cache_version, normalize_search_term
+from .search import SEARCH_TERM_MAX_LENGTH
 
 NUMBER_SUGGESTIONS_RETURNED = 12
 ERROR_CODE_MISSING_SEARCH_PARAMETER = "missing_search_parameter"
 
-# This query will return an intermediary table containing a single column (`word`)
-# and one row per word found in all pins' title and description,
-# by leveraging the regexp_split_to_table PostgreSQL function.
-# We split the text by: space, period, comma, hyphen, colon, slash and question mark.
-SQL_QUERY_SELECT_ALL_WORDS_PINS_TITLE_DESCRIPTION = """
-SELECT regexp_split_to_table(lower(title), '[\\s.,-:/?]+') AS word
-FROM pinit_api_pin
-UNION ALL
-SELECT regexp_split_to_table(lower(description), '[\\s.,-:/?]+') AS word
-FROM pinit_api_pin
-"""
-
-# This query will select the N words which appear most frequently in the
-# intermediary table above and which are 'LIKE' the pattern provided as parameter (`%s`).
-# This pattern will be `{prefix}%`, where `prefix` is the term we want to auto-complete,
-# and `%` is the usual SQL wildcard for `LIKE` statements.
-SQL_QUERY_GET_AUTOCOMPLETE_SUGGESTIONS = f"""
-SELECT word
-FROM (
-{SQL_QUERY_SELECT_ALL_WORDS_PINS_TITLE_DESCRIPTION}
-) t
-WHERE word LIKE %s
-GROUP BY word
-ORDER BY COUNT(*) DESC, word
-LIMIT {NUMBER_SUGGESTIONS_RETURNED};
-"""
-
 
 @api_view(["GET"])
 def get_search_suggestions(request):
@@ -45,18 +30,141 @@ def get_search_suggestions(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    sanitized_search_term = "".join(char for char in search_term if char.isalnum())
+    normalized_search_term = normalize_search_term(
+        search_term=search_term, max_length=SEARCH_TERM_MAX_LENGTH
+    )
+
+    search_words = get_search_words(search_term=search_term)
+
+    # Short prefixes are requested over and over (on each keystroke), so
+    # suggestions are cached by prefix, for a short time (the popular searches
+    # change without invalidating them), or until a pin changes:
+    cache_key = get_search_suggestions_cache_key(
+        normalized_search_term=normalized_search_term, search_words=search_words
+    )
+
+    response_data = cache.get(cache_key)
+
+    if response_data is None:
+        response_data = {
+            "results": get_suggestions(
+                normalized_search_term=normalized_search_term,
+                search_words=search_words,
+            )
+        }
+
+        cache.set(cache_key, response_data, settings.SEARCH_SUGGESTIONS_CACHE_TIMEOUT)
+
+    return get_search_suggestions_response(request=request, response_data=response_data)
+
+
+def get_suggestions(normalized_search_term="", search_words=()):
+    # Popular searches (normalized like in the search view) come first, then
+    # the completions of the words:
+    popular_search_queries = get_popular_search_queries(
+        prefix=normalized_search_term,
+        limit=settings.SEARCH_SUGGESTIONS_MAX_POPULAR_QUERIES,
+    )
+
+    # Search terms of several words are completed with the phrases of pin
+    # titles, single words with the words of pins:
+    if len(search_words) > 1:
+        completions = get_phrase_completions(search_words=search_words)
+    else:
+        completions = get_word_completions(
+            prefix=search_words[0] if search_words else ""
+        )
+
+    suggestions = popular_search_queries + [
+        completion
+        for completion in completions
+        if completion not in popular_search_queries
+    ]
+
+    return suggestions[:NUMBER_SUGGESTIONS_RETURNED]
+
+
+def get_search_suggestions_cache_key(normalized_search_term="", search_words=()):
+    search_index_version = get_cache_version(name=CACHE_VERSION_SEARCH_INDEX)
 
-    lowercase_search_term = sanitized_search_term.lower()
+    # Suggestions only depend on the normalized search term (for popular
+    # searches) and on its sanitized words (for completions):
+    search = json.dumps([normalized_search_term, search_words])
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            SQL_QUERY_GET_AUTOCOMPLETE_SUGGESTIONS, [f"{lowercase_search_term}%"]
+    # Search terms are hashed to keep keys short and free of whitespace:
+    search_digest = hashlib.sha256(search.encode("utf-8")).hexdigest()
+
+    return f"search_suggestions:{search_index_version}:{search_digest}"
+
+
+def get_search_suggestions_response(request=None, response_data=None):
+    """
+    Returns the suggestions with HTTP caching headers: they don't depend on
+    the user, so browsers and shared caches may reuse them for
+    `SEARCH_SUGGESTIONS_MAX_AGE` seconds, then revalidate them with their
+    ETag (a hash of the suggestions), which is answered with a 304 response
+    if they didn't change.
+    """
+    serialized_data = json.dumps(response_data, sort_keys=True)
+    etag = quote_etag(hashlib.sha256(serialized_data.encode("utf-8")).hexdigest())
+
+    response = Response(response_data)
+    response.headers["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.SEARCH_SUGGESTIONS_MAX_AGE
+    )
+
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def get_search_words(search_term=""):
+    """
+    Returns the (sanitized) words of the search term, followed by an empty
+    word if it ends with a space (i.e. the next word is being typed).
+    """
+    search_words = [
+        "".join(char for char in word if char.isalnum()).lower()
+        for word in search_term.split()
+    ]
+
+    search_words = [word for word in search_words if word]
+
+    if search_term[-1:].isspace():
+        search_words.append("")
+
+    return search_words
+
+
+def get_word_completions(prefix=""):
+    """
+    Completes the word, or if nothing starts with it, completes it as if
+    mistyped (with backends supporting it).
+    """
+    suggestion_backend = get_suggestion_backend()
+
+    completions = suggestion_backend.get_suggestions(
+        prefix=prefix, limit=NUMBER_SUGGESTIONS_RETURNED
+    )
+
+    if not completions:
+        completions = suggestion_backend.get_typo_tolerant_suggestions(
+            prefix=prefix, limit=NUMBER_SUGGESTIONS_RETURNED
         )
 
-        # cursor.fetchall() returns a list of lists, so we need to flatten it:
-        suggestions = [item[0] for item in cursor.fetchall()]
+    return completions
+
+
+def get_phrase_completions(search_words=()):
+    """
+    Completes the last word given the previous ones (the phrases having at
+    most `MAX_PHRASE_WORDS` words, the words before are kept as they are).
+    """
+    leading_words = search_words[:-MAX_PHRASE_WORDS]
 
-    response_data = {"results": suggestions}
+    phrases = get_most_frequent_phrases(
+        previous_words=search_words[-MAX_PHRASE_WORDS:-1],
+        prefix=search_words[-1],
+        limit=NUMBER_SUGGESTIONS_RETURNED,
+    )
 
-    return Response(response_data)
+    return [" ".join([*leading_words, phrase]) for phrase in phrases]
@@ -9,6 +9,7 @@ from ..lib.utils import (
     get_tokens_data,
 )
 from ..models import Account
+from ..lib.home_feed import seed_home_feed
 from ..serializers import UserCreateSerializer
 
 FORBIDDEN_USERNAMES = [
@@ -50,7 +51,7 @@ def create_personal_account(user=None):
     first_name, last_name = compute_first_and_last_name(email=email)
     initial = compute_initial(email=email)
 
-    Account.objects.create(
+    account = Account.objects.create(
         username=username,
         type="personal",
         first_name=first_name,
@@ -59,6 +60,8 @@ def create_personal_account(user=None):
         owner=user,
     )
 
+    seed_home_feed(account=account)
+
 
 def compute_default_username_from_email(email=""):
     username_candidate = compute_username_candidate(email=email)
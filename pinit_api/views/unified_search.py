@@ -0,0 +1,128 @@
+from functools import partial, reduce
+from operator import and_
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Length
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..models import Account, Board
+from ..serializers import AccountBaseReadSerializer, PinWithAuthorDetailsReadSerializer
+from ..serializers.board_serializers import BoardWithAuthorDetailsReadSerializer
+from ..lib.concurrency import run_concurrently
+from ..lib.hydration import get_pins_in_order
+from ..lib.utils import normalize_search_term
+from .search import (
+    ERROR_CODE_MISSING_SEARCH_PARAMETER,
+    SEARCH_TERM_MAX_LENGTH,
+    get_guarded_search_data,
+    get_recent_matched_pin_ids,
+    get_search_results,
+    get_search_results_cache_key,
+)
+
+ACCOUNT_NAME_FIELDS = ("username", "first_name", "last_name", "business_name")
+
+
+@api_view(["GET"])
+def search_all(request):
+    normalized_search_term = normalize_search_term(
+        search_term=request.GET.get("q", ""), max_length=SEARCH_TERM_MAX_LENGTH
+    )
+
+    if not normalized_search_term:
+        return Response(
+            {"errors": [{"code": ERROR_CODE_MISSING_SEARCH_PARAMETER}]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # The sub-queries are independent, so they run at the same time (each
+    # with its own database connection): the response takes as long as the
+    # slowest one, rather than the sum of them.
+    pins, accounts, boards = run_concurrently(
+        partial(get_top_pins, normalized_search_term=normalized_search_term),
+        partial(get_top_accounts, normalized_search_term=normalized_search_term),
+        partial(get_top_boards, normalized_search_term=normalized_search_term),
+    )
+
+    return Response({"pins": pins, "accounts": accounts, "boards": boards})
+
+
+def get_top_pins(normalized_search_term=""):
+    limit = settings.UNIFIED_SEARCH_RESULTS_PER_TYPE
+
+    # Same timeout, degraded mode and caching of the pin IDs as the search of
+    # pins (see `search_pins`):
+    top_pin_ids = get_guarded_search_data(
+        cache_key=get_search_results_cache_key(
+            normalized_search_term=normalized_search_term,
+            search_filters={},
+            page=f"top:{limit}",
+        ),
+        get_data=partial(
+            get_top_search_result_ids,
+            normalized_search_term=normalized_search_term,
+            limit=limit,
+        ),
+        get_degraded_data=partial(
+            get_recent_matched_pin_ids,
+            normalized_search_term=normalized_search_term,
+            search_filters={},
+            limit=limit,
+        ),
+    )
+
+    top_pins = get_pins_in_order(
+        pin_ids=top_pin_ids, serializer_class=PinWithAuthorDetailsReadSerializer
+    )
+
+    return PinWithAuthorDetailsReadSerializer(top_pins, many=True).data
+
+
+def get_top_search_result_ids(normalized_search_term="", limit=0):
+    search_results = get_search_results(
+        normalized_search_term=normalized_search_term, search_filters={}
+    )
+
+    return [pin.id for pin in search_results[:limit]]
+
+
+def get_top_accounts(normalized_search_term=""):
+    # Each word must be found in the username or the display name (i.e. in
+    # the first name, last name or business name):
+    conditions = [
+        reduce(
+            lambda condition, field: condition | Q(**{f"{field}__icontains": word}),
+            ACCOUNT_NAME_FIELDS,
+            Q(),
+        )
+        for word in normalized_search_term.split()
+    ]
+
+    # Shortest usernames first, as they're the closest to the search term:
+    accounts = Account.objects.filter(reduce(and_, conditions)).order_by(
+        Length("username"), "username"
+    )
+
+    accounts = AccountBaseReadSerializer.setup_eager_loading(accounts)
+
+    top_accounts = accounts[: settings.UNIFIED_SEARCH_RESULTS_PER_TYPE]
+
+    return AccountBaseReadSerializer(top_accounts, many=True).data
+
+
+def get_top_boards(normalized_search_term=""):
+    conditions = [Q(name__icontains=word) for word in normalized_search_term.split()]
+
+    # Shortest names first, as they're the closest to the search term:
+    boards = Board.objects.filter(reduce(and_, conditions)).order_by(
+        Length("name"), "-created_at"
+    )
+
+    boards = BoardWithAuthorDetailsReadSerializer.setup_eager_loading(boards)
+
+    top_boards = boards[: settings.UNIFIED_SEARCH_RESULTS_PER_TYPE]
+
+    return BoardWithAuthorDetailsReadSerializer(top_boards, many=True).data